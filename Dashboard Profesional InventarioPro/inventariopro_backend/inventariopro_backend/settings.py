@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'dev-secret-key')
@@ -58,6 +60,22 @@ DATABASES = {
     }
 }
 
+# Perfil de conexión SQLite (ver ``inventory/sqlite.py``). Un valor vacío omite ese PRAGMA
+# y ``SQLITE_TUNING=false`` deja los valores por defecto de SQLite.
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'true').lower() == 'true'
+SQLITE_PRAGMAS = {
+    # WAL: las lecturas no bloquean a los escritores ni al revés.
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'wal'),
+    # NORMAL es seguro con WAL (solo puede perder la última transacción ante un corte de energía).
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'normal'),
+    # Milisegundos esperando el bloqueo antes de "database is locked".
+    'busy_timeout': os.environ.get('SQLITE_BUSY_TIMEOUT', '10000'),
+    'mmap_size': os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    # Negativo = KiB de caché de páginas por conexión.
+    'cache_size': os.environ.get('SQLITE_CACHE_SIZE', '-65536'),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'memory'),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -89,13 +107,56 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'inventory.renderers.FastJSONRenderer',
     ],
     'COERCE_DECIMAL_TO_STRING': False,
 }
 
 CURRENCY_CACHE_TIMEOUT = int(os.environ.get('CURRENCY_CACHE_TIMEOUT', 3600))
+# Segundos antes de expirar en que se refresca la tasa en segundo plano.
+CURRENCY_REFRESH_AHEAD = int(os.environ.get('CURRENCY_REFRESH_AHEAD', 300))
+# Cuánto tiempo se conserva una tasa vencida en la caché compartida si la API no responde.
+CURRENCY_MAX_STALE = int(os.environ.get('CURRENCY_MAX_STALE', 86400))
+CURRENCY_RETRY_AFTER = int(os.environ.get('CURRENCY_RETRY_AFTER', 60))
+CURRENCY_HTTP_TIMEOUT = float(os.environ.get('CURRENCY_HTTP_TIMEOUT', 5))
+CURRENCY_HTTP_POOL_SIZE = int(os.environ.get('CURRENCY_HTTP_POOL_SIZE', 4))
+CURRENCY_CACHE_ALIAS = 'default'
+# Guarda cada tasa obtenida en ``ExchangeRate`` para los reportes históricos.
+CURRENCY_RECORD_HISTORY = os.environ.get('CURRENCY_RECORD_HISTORY', 'true').lower() == 'true'
 EXCHANGE_API_KEY = os.environ.get('EXCHANGE_API_KEY', '')
 EXCHANGE_API_URL = os.environ.get('EXCHANGE_API_URL', 'https://v6.exchangerate-api.com/v6')
 USD_MXN_FALLBACK_RATE = os.environ.get('USD_MXN_FALLBACK_RATE', '18.0')
 FRONTEND_INDEX = BASE_DIR / 'frontend' / 'index.html'
+MOVEMENT_BULK_MAX_ITEMS = int(os.environ.get('MOVEMENT_BULK_MAX_ITEMS', 10000))
+MOVEMENT_EXPORT_CHUNK_SIZE = int(os.environ.get('MOVEMENT_EXPORT_CHUNK_SIZE', 2000))
+REPORT_BATCH_MAX_PRODUCTS = int(os.environ.get('REPORT_BATCH_MAX_PRODUCTS', 500))
+
+# Caché de reportes: ``file`` (por defecto, compartida entre workers) o ``locmem``.
+# Los tokens de invalidación viven en esta caché: con ``locmem`` una escritura en un
+# worker no invalida a los demás, así que solo sirve con un único proceso.
+_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+REPORT_CACHE_BACKEND = os.environ.get('REPORT_CACHE_BACKEND', 'file')
+if REPORT_CACHE_BACKEND not in _CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'REPORT_CACHE_BACKEND={REPORT_CACHE_BACKEND!r} no es válido; usa uno de: {", ".join(_CACHE_BACKENDS)}.'
+    )
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKENDS[REPORT_CACHE_BACKEND],
+        'LOCATION': os.environ.get(
+            'REPORT_CACHE_LOCATION',
+            str(BASE_DIR / '.cache' / 'reports') if REPORT_CACHE_BACKEND == 'file' else 'inventariopro-reports',
+        ),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 5000))},
+    },
+}
+REPORT_CACHE_ALIAS = 'default'
+REPORT_CACHE_TIMEOUT = int(os.environ.get('REPORT_CACHE_TIMEOUT', 600))
+# Máximo de puntos de la serie con ``granularity=auto``.
+REPORT_MAX_SERIES_POINTS = int(os.environ.get('REPORT_MAX_SERIES_POINTS', 120))
+
+# Hilos (y conexiones) para las consultas en paralelo de las vistas async de reportes.
+REPORT_QUERY_WORKERS = int(os.environ.get('REPORT_QUERY_WORKERS', 4))
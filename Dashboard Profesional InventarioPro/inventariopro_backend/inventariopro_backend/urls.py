@@ -5,11 +5,16 @@ from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from inventory.views import (
+    AsyncDashboardView,
+    AsyncReportsView,
     DashboardView,
     InventorySummaryView,
     MovementViewSet,
     ProductViewSet,
+    ReportBatchView,
+    ReportCacheStatsView,
     ReportsView,
+    TopProductsView,
     UsdRateView,
 )
 
@@ -28,8 +33,13 @@ def serve_frontend(request):
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('api/async/dashboard/', AsyncDashboardView.as_view(), name='dashboard-async'),
     path('api/inventory/', InventorySummaryView.as_view(), name='inventory-summary'),
     path('api/reports/', ReportsView.as_view(), name='reports'),
+    path('api/async/reports/', AsyncReportsView.as_view(), name='reports-async'),
+    path('api/reports/batch/', ReportBatchView.as_view(), name='reports-batch'),
+    path('api/reports/top-products/', TopProductsView.as_view(), name='reports-top-products'),
+    path('api/reports/cache/', ReportCacheStatsView.as_view(), name='report-cache-stats'),
     path('api/usd-rate/', UsdRateView.as_view(), name='usd-rate'),
     path('api/', include(router.urls)),
     re_path(r'^.*$', serve_frontend, name='frontend'),
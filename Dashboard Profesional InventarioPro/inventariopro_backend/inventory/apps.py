@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
     verbose_name = 'Inventario'
+
+    def ready(self):
+        from .sqlite import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid='inventory_sqlite_pragmas')
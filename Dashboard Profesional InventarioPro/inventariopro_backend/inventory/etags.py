@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import quote_etag
+from django.utils.http import parse_etags
+
+from services.async_reports import run_in_pool
+from services.currency import peek_usd_to_mxn_rate
+
+from .models import InventoryDataVersion
+
+
+class DataVersionETagMixin:
+    """ETag fuerte basado en ``InventoryDataVersion`` para vistas de solo lectura.
+
+    Si el cliente envía ``If-None-Match`` con la versión vigente se responde 304
+    con una sola consulta, sin recalcular agregados ni serializar.
+    """
+
+    # Las vistas con montos en USD dependen también del tipo de cambio.
+    etag_includes_rate = False
+
+    def get_data_etag(self, request) -> str:
+        parts = [
+            str(InventoryDataVersion.current()),
+            request.get_full_path(),
+            # Los rangos por defecto dependen de la fecha actual.
+            timezone.localdate().isoformat(),
+        ]
+        if self.etag_includes_rate:
+            # Sin red: si la tasa aún no está en caché, el siguiente ETag ya la incluirá.
+            parts.append(str(peek_usd_to_mxn_rate()))
+        digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+        return quote_etag(f'{parts[0]}-{digest}')
+
+    @staticmethod
+    def not_modified_response(request, etag: str):
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        # La versión se lee antes que los datos: si cambia en medio, el ETag queda viejo y no se reutiliza.
+        etag = self.get_data_etag(request)
+        not_modified = self.not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+
+class AsyncDataVersionETagMixin(DataVersionETagMixin):
+    """Variante de ``DataVersionETagMixin`` para vistas de Django con handlers ``async``.
+
+    La versión se lee en el pool de reportes, igual que las consultas de la vista.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Se salta el ``dispatch`` síncrono del mixin y se delega en el de ``View``.
+        view_dispatch = super(DataVersionETagMixin, self).dispatch
+        if request.method not in ('GET', 'HEAD'):
+            return await view_dispatch(request, *args, **kwargs)
+
+        etag = await run_in_pool(self.get_data_etag, request)
+        not_modified = self.not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = await view_dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
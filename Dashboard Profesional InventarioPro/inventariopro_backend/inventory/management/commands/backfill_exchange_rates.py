@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from inventory.models import ExchangeRate, Movement
+from services.currency import fetch_historical_rate
+
+
+class Command(BaseCommand):
+    help = 'Llena ExchangeRate con la tasa USD→MXN de cada día del rango que aún no la tenga.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Primer día (YYYY-MM-DD); por defecto, el primer movimiento')
+        parser.add_argument('--end', help='Último día (YYYY-MM-DD); por defecto, hoy')
+        parser.add_argument(
+            '--rate',
+            help='Usa esta tasa fija en lugar de consultar la API (cargas sin red o datos de prueba)',
+        )
+        parser.add_argument('--overwrite', action='store_true', help='Reemplaza también los días ya registrados')
+
+    def handle(self, *args, **options):
+        end = self._parse_day(options['end']) if options['end'] else timezone.localdate()
+        if options['start']:
+            start = self._parse_day(options['start'])
+        else:
+            start = Movement.objects.aggregate(first=Min('date'))['first'] or end
+        if start > end:
+            raise CommandError('El inicio del rango es posterior al final.')
+
+        fixed_rate = None
+        if options['rate']:
+            try:
+                fixed_rate = Decimal(options['rate'])
+            except InvalidOperation:
+                raise CommandError('Tasa inválida.')
+            # Una tasa en cero o negativa quedaría en el historial y rompería las conversiones.
+            if not fixed_rate.is_finite() or fixed_rate <= 0:
+                raise CommandError('La tasa debe ser mayor a cero.')
+
+        existing = set()
+        if not options['overwrite']:
+            existing = set(ExchangeRate.objects.filter(date__range=(start, end)).values_list('date', flat=True))
+
+        saved = failed = 0
+        day = start
+        while day <= end:
+            if day not in existing:
+                try:
+                    rate = fixed_rate if fixed_rate is not None else fetch_historical_rate(day)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{day.isoformat()}: {exc}')
+                else:
+                    ExchangeRate.record(day, rate)
+                    saved += 1
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'{saved} tasas guardadas, {failed} días sin tasa.'))
+
+    @staticmethod
+    def _parse_day(value: str):
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            # Formato correcto pero día imposible (p. ej. 2024-02-30).
+            parsed = None
+        if parsed is None:
+            raise CommandError(f'Fecha inválida: {value}')
+        return parsed
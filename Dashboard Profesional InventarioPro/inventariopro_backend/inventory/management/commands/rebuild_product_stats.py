@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from inventory.models import InventoryDataVersion, ProductStats
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye ProductStats desde los movimientos (programar a diario para mover la ventana de 30 días).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--windows-only',
+            action='store_true',
+            help='Solo recorre la ventana de 30 días y la última fecha, sin recalcular los totales',
+        )
+
+    def handle(self, *args, **options):
+        if options['windows_only']:
+            rows = ProductStats.refresh_windows()
+            message = f'Ventana de 30 días actualizada en {rows} productos.'
+        else:
+            self.stdout.write('Reconstruyendo estadísticas por producto...')
+            rows = ProductStats.rebuild()
+            message = f'Estadísticas reconstruidas para {rows} productos.'
+        # El listado de productos con ?expand=stats cambia: se invalida su ETag.
+        InventoryDataVersion.bump()
+        self.stdout.write(self.style.SUCCESS(message))
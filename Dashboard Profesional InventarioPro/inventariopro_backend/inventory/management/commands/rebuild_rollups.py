@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from inventory.models import DailyMovementRollup, InventoryDataVersion
+from services import report_cache
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el rollup diario de movimientos a partir de la tabla de movimientos.'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconstruyendo rollup diario de movimientos...')
+        rows = DailyMovementRollup.rebuild()
+        # Los reportes pueden cambiar si el rollup estaba desincronizado.
+        InventoryDataVersion.bump()
+        report_cache.invalidate_all()
+        self.stdout.write(self.style.SUCCESS(f'Rollup reconstruido con {rows} filas.'))
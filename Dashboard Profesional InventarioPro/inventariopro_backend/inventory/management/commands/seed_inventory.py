@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 import random
-from datetime import timedelta
+from datetime import date, timedelta
 from decimal import Decimal
+from itertools import islice
+from typing import Iterator
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 
-from inventory.models import Movement, Product
+from inventory.models import (
+    DailyMovementRollup,
+    InventoryDataVersion,
+    Movement,
+    Product,
+    ProductStats,
+    StockSnapshot,
+)
+from services import report_cache
 
 
 class Command(BaseCommand):
@@ -15,16 +26,151 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--movements', type=int, default=200, help='Número de movimientos a generar')
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=None,
+            help='Número de productos; por encima del catálogo base se sintetizan variantes',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Inserta con bulk_create por lotes (para datasets de capacidad)',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tamaño de lote en modo --bulk')
 
     def handle(self, *args, **options):
         movements_count = options['movements']
         self.stdout.write('Limpiando datos existentes...')
+        DailyMovementRollup.objects.all().delete()
+        StockSnapshot.objects.all().delete()
+        ProductStats.objects.all().delete()
         Movement.objects.all().delete()
         Product.objects.all().delete()
+        InventoryDataVersion.bump()
+        report_cache.invalidate_all()
 
         random.seed(42)
-        products: list[Product] = []
+        catalog = self._build_catalog(options['products'])
 
+        current_stock: dict[int, Decimal] = {}
+        product_data: dict[int, dict] = {}
+        initial_stocks = [Decimal(str(random.randint(8, 24))) for _ in catalog]
+        products = [
+            Product(
+                name=item['name'],
+                code=item['code'],
+                category=item['category'],
+                stock=initial_stock,
+                low_threshold=item['low_threshold'],
+                avg_cost=item['avg_cost'],
+                suggested_price=item['suggested_price'],
+            )
+            for item, initial_stock in zip(catalog, initial_stocks)
+        ]
+        if options['bulk']:
+            Product.objects.bulk_create(products, batch_size=options['batch_size'])
+            if any(product.pk is None for product in products):
+                ids_by_code = dict(Product.objects.values_list('code', 'id'))
+                for product in products:
+                    product.pk = ids_by_code[product.code]
+        else:
+            for product in products:
+                product.save()
+        for product, item in zip(products, catalog):
+            current_stock[product.id] = product.stock
+            product_data[product.id] = item
+
+        start_date = timezone.now().date() - timedelta(days=120)
+        movements = self._generate_movements(products, product_data, current_stock, movements_count, start_date)
+        if options['bulk']:
+            self._bulk_insert(movements, products, current_stock, options['batch_size'])
+        else:
+            for movement in movements:
+                movement.save()
+
+        self.stdout.write(self.style.SUCCESS('Datos de inventario generados correctamente.'))
+
+    def _bulk_insert(
+        self,
+        movements: Iterator[Movement],
+        products: list[Product],
+        current_stock: dict[int, Decimal],
+        batch_size: int,
+    ) -> None:
+        inserted = 0
+        with transaction.atomic():
+            while True:
+                batch = list(islice(movements, batch_size))
+                if not batch:
+                    break
+                Movement.objects.bulk_create(batch, batch_size=batch_size)
+                inserted += len(batch)
+                self.stdout.write(f'  {inserted} movimientos insertados...')
+
+            # El generador ya llevó el stock final de cada producto: se escribe una sola vez.
+            for product in products:
+                product.stock = current_stock[product.id]
+            Product.objects.bulk_update(products, ['stock'], batch_size=batch_size)
+            DailyMovementRollup.rebuild()
+            ProductStats.rebuild()
+            InventoryDataVersion.bump()
+            report_cache.invalidate_all()
+
+    def _generate_movements(
+        self,
+        products: list[Product],
+        product_data: dict[int, dict],
+        current_stock: dict[int, Decimal],
+        movements_count: int,
+        start_date: date,
+    ) -> Iterator[Movement]:
+        for _ in range(movements_count):
+            product = random.choice(products)
+            stock_now = current_stock[product.id]
+
+            if stock_now <= Decimal('5'):
+                movement_type = Movement.MovementType.IN
+            elif stock_now >= Decimal('28'):
+                movement_type = Movement.MovementType.OUT
+            else:
+                movement_type = random.choices(
+                    [Movement.MovementType.IN, Movement.MovementType.OUT],
+                    weights=[0.55, 0.45],
+                )[0]
+
+            if movement_type == Movement.MovementType.OUT:
+                max_qty = int(min(stock_now, Decimal('6')))
+                if max_qty <= 0:
+                    movement_type = Movement.MovementType.IN
+                else:
+                    quantity = Decimal(str(random.randint(1, max_qty)))
+            if movement_type == Movement.MovementType.IN:
+                quantity = Decimal(str(random.randint(1, 6)))
+
+            if movement_type == Movement.MovementType.OUT:
+                stock_now -= quantity
+            else:
+                stock_now += quantity
+            current_stock[product.id] = stock_now
+
+            metadata = product_data[product.id]
+            unit_price = metadata['avg_cost'] if movement_type == Movement.MovementType.IN else metadata['suggested_price']
+            price_variation = Decimal(str(random.uniform(-0.1, 0.1)))
+            unit_price = (unit_price * (Decimal('1') + price_variation)).quantize(Decimal('0.01'))
+            movement_date = start_date + timedelta(days=random.randint(0, 120))
+
+            yield Movement(
+                product=product,
+                movement_type=movement_type,
+                quantity=quantity,
+                unit_price=unit_price,
+                unit_cost=product.avg_cost,
+                date=movement_date,
+                note='Movimiento generado automáticamente',
+            )
+
+    def _build_catalog(self, products_count: int | None) -> list[dict]:
         catalog = [
             # Consolas
             {
@@ -233,67 +379,21 @@ class Command(BaseCommand):
             },
         ]
 
-        current_stock: dict[int, Decimal] = {}
-        product_data: dict[int, dict] = {}
+        if products_count is None:
+            return catalog
+        if products_count <= len(catalog):
+            return catalog[:products_count]
 
-        for item in catalog:
-            initial_stock = Decimal(str(random.randint(8, 24)))
-            product = Product.objects.create(
-                name=item['name'],
-                code=item['code'],
-                category=item['category'],
-                stock=initial_stock,
-                low_threshold=item['low_threshold'],
-                avg_cost=item['avg_cost'],
-                suggested_price=item['suggested_price'],
+        # Variantes sintéticas deterministas para catálogos grandes.
+        synthetic = []
+        for index in range(len(catalog), products_count):
+            template = catalog[index % len(catalog)]
+            variant = index // len(catalog)
+            synthetic.append(
+                {
+                    **template,
+                    'name': f"{template['name']} V{variant}-{index}",
+                    'code': f"{template['code']}-{index:06d}",
+                }
             )
-            products.append(product)
-            current_stock[product.id] = initial_stock
-            product_data[product.id] = item
-
-        start_date = timezone.now().date() - timedelta(days=120)
-        for _ in range(movements_count):
-            product = random.choice(products)
-            stock_now = current_stock[product.id]
-
-            if stock_now <= Decimal('5'):
-                movement_type = Movement.MovementType.IN
-            elif stock_now >= Decimal('28'):
-                movement_type = Movement.MovementType.OUT
-            else:
-                movement_type = random.choices(
-                    [Movement.MovementType.IN, Movement.MovementType.OUT],
-                    weights=[0.55, 0.45],
-                )[0]
-
-            if movement_type == Movement.MovementType.OUT:
-                max_qty = int(min(stock_now, Decimal('6')))
-                if max_qty <= 0:
-                    movement_type = Movement.MovementType.IN
-                else:
-                    quantity = Decimal(str(random.randint(1, max_qty)))
-            if movement_type == Movement.MovementType.IN:
-                quantity = Decimal(str(random.randint(1, 6)))
-
-            if movement_type == Movement.MovementType.OUT:
-                stock_now -= quantity
-            else:
-                stock_now += quantity
-            current_stock[product.id] = stock_now
-
-            metadata = product_data[product.id]
-            unit_price = metadata['avg_cost'] if movement_type == Movement.MovementType.IN else metadata['suggested_price']
-            price_variation = Decimal(str(random.uniform(-0.1, 0.1)))
-            unit_price = (unit_price * (Decimal('1') + price_variation)).quantize(Decimal('0.01'))
-            movement_date = start_date + timedelta(days=random.randint(0, 120))
-
-            Movement.objects.create(
-                product=product,
-                movement_type=movement_type,
-                quantity=quantity,
-                unit_price=unit_price,
-                date=movement_date,
-                note='Movimiento generado automáticamente',
-            )
-
-        self.stdout.write(self.style.SUCCESS('Datos de inventario generados correctamente.'))
+        return catalog + synthetic
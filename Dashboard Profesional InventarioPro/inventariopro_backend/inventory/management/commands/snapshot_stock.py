@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from services.stock import take_stock_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Guarda en StockSnapshot el stock de cada producto al cierre de un día (programar a diario).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Día del snapshot (YYYY-MM-DD); por defecto, ayer')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                day = parse_date(options['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                raise CommandError(f'Fecha inválida: {options["date"]}')
+        else:
+            day = timezone.localdate() - timedelta(days=1)
+
+        saved = take_stock_snapshots(day)
+        self.stdout.write(self.style.SUCCESS(f'{saved} snapshots de stock guardados para {day.isoformat()}.'))
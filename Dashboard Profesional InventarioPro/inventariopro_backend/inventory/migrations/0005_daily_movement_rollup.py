@@ -0,0 +1,91 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:24
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    Movement = apps.get_model("inventory", "Movement")
+    DailyMovementRollup = apps.get_model("inventory", "DailyMovementRollup")
+    totals = (
+        Movement.objects.values("product_id", "date", "movement_type")
+        .order_by()
+        .annotate(
+            total_quantity=Sum("quantity"),
+            total_value=Sum(F("quantity") * F("unit_price")),
+            total_count=Count("id"),
+        )
+    )
+    DailyMovementRollup.objects.bulk_create(
+        [
+            DailyMovementRollup(
+                product_id=item["product_id"],
+                date=item["date"],
+                movement_type=item["movement_type"],
+                quantity=item["total_quantity"],
+                value=item["total_value"],
+                movement_count=item["total_count"],
+            )
+            for item in totals.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_alter_service_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyMovementRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "movement_type",
+                    models.CharField(
+                        choices=[("IN", "Entrada"), ("OUT", "Salida")], max_length=3
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                (
+                    "value",
+                    models.DecimalField(decimal_places=4, default=0, max_digits=20),
+                ),
+                ("movement_count", models.IntegerField(default=0)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="inventory.product",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date", "product_id", "movement_type"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailymovementrollup",
+            constraint=models.UniqueConstraint(
+                fields=("date", "product", "movement_type"), name="unique_daily_rollup"
+            ),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0005_daily_movement_rollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dailymovementrollup",
+            index=models.Index(fields=["product", "date"], name="rollup_product_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="movement",
+            index=models.Index(fields=["-date", "-id"], name="movement_date_id_desc_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="movement",
+            index=models.Index(fields=["product", "-date", "-id"], name="movement_product_date_idx"),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    InventoryDataVersion = apps.get_model("inventory", "InventoryDataVersion")
+    InventoryDataVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_movement_report_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryDataVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+def check_no_negative_stock(apps, schema_editor):
+    # Antes de esta restricción un borrado de entradas o un PATCH de ``stock`` podía
+    # dejar stock negativo; en SQLite la reconstrucción de la tabla fallaría con un
+    # IntegrityError sin decir qué filas. No se corrige solo: el stock dejaría de
+    # cuadrar con los movimientos sin que nadie lo note.
+    Product = apps.get_model("inventory", "Product")
+    negative = list(
+        Product.objects.filter(stock__lt=0)
+        .order_by("code")
+        .values_list("code", "stock")
+    )
+    if negative:
+        listed = ", ".join(f"{code} ({stock})" for code, stock in negative)
+        raise RuntimeError(
+            f"Hay {len(negative)} productos con stock negativo: {listed}. "
+            "Corrige su stock (p. ej. con una entrada de ajuste) y vuelve a migrar."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0008_exchange_rate"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_negative_stock, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="product",
+            constraint=models.CheckConstraint(
+                check=models.Q(("stock__gte", 0)), name="product_stock_non_negative"
+            ),
+        ),
+    ]
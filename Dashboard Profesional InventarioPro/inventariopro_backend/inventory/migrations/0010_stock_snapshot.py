@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0009_product_stock_non_negative"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("stock", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("value", models.DecimalField(decimal_places=2, max_digits=18)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="inventory.product",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date", "product_id"],
+                "indexes": [
+                    models.Index(fields=["date"], name="stock_snapshot_date_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="stocksnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("product", "date"), name="unique_stock_snapshot"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 16:02
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_costs(apps, schema_editor):
+    # Sin historial de costos, los movimientos existentes toman el avg_cost actual.
+    Product = apps.get_model("inventory", "Product")
+    Movement = apps.get_model("inventory", "Movement")
+    DailyMovementRollup = apps.get_model("inventory", "DailyMovementRollup")
+    avg_cost = Subquery(
+        Product.objects.filter(pk=OuterRef("product_id")).values("avg_cost")[:1]
+    )
+    Movement.objects.update(unit_cost=avg_cost)
+    DailyMovementRollup.objects.update(cost=F("quantity") * avg_cost)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0010_stock_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movement",
+            name="unit_cost",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=12, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailymovementrollup",
+            name="cost",
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=20),
+        ),
+        migrations.RunPython(backfill_costs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="movement",
+            name="unit_cost",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:04
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import F, Max, Q, Sum
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def populate_product_stats(apps, schema_editor):
+    Movement = apps.get_model("inventory", "Movement")
+    ProductStats = apps.get_model("inventory", "ProductStats")
+    today = timezone.localdate()
+    is_in = Q(movement_type="IN")
+    is_out = Q(movement_type="OUT")
+    window = Q(date__gte=today - datetime.timedelta(days=29), date__lte=today)
+    totals = (
+        Movement.objects.values("product_id")
+        .order_by()
+        .annotate(
+            sum_in=Sum("quantity", filter=is_in),
+            sum_out=Sum("quantity", filter=is_out),
+            sum_revenue=Sum(F("quantity") * F("unit_price"), filter=is_out),
+            last_date=Max("date"),
+            sum_out_30d=Sum("quantity", filter=is_out & window),
+        )
+    )
+    ProductStats.objects.bulk_create(
+        [
+            ProductStats(
+                product_id=item["product_id"],
+                total_in=item["sum_in"] or 0,
+                total_out=item["sum_out"] or 0,
+                revenue=item["sum_revenue"] or 0,
+                last_movement_date=item["last_date"],
+                units_out_30d=item["sum_out_30d"] or 0,
+                window_end=today,
+            )
+            for item in totals.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0011_movement_unit_cost"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductStats",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="inventory.product",
+                    ),
+                ),
+                (
+                    "total_in",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                (
+                    "total_out",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=4, default=0, max_digits=20),
+                ),
+                ("last_movement_date", models.DateField(blank=True, null=True)),
+                (
+                    "units_out_30d",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("window_end", models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(populate_product_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0012_product_stats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("stock__lte", models.F("low_threshold"))),
+                fields=["name"],
+                name="product_low_stock_idx",
+            ),
+        ),
+    ]
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import datetime
+from collections import defaultdict
 from decimal import Decimal
+from typing import Iterable
 
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
-from django.db.models import F
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from services import report_cache
+
+# Condición de bajo stock. Compara dos columnas, así que ningún índice normal la
+# resuelve; el índice parcial ``product_low_stock_idx`` solo contiene esas filas.
+LOW_STOCK_CONDITION = Q(stock__lte=F('low_threshold'))
 
 
 class Product(models.Model):
@@ -30,6 +41,16 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Índice parcial: la base de datos lo mantiene en cada UPDATE de stock o del
+            # umbral (movimientos, carga masiva, edición de productos), sin una columna
+            # derivada que sincronizar. Sirve el conteo y el listado por nombre.
+            models.Index(fields=['name'], condition=LOW_STOCK_CONDITION, name='product_low_stock_idx'),
+        ]
+        constraints = [
+            # Última línea de defensa: ninguna escritura concurrente puede dejar stock negativo.
+            models.CheckConstraint(check=Q(stock__gte=0), name='product_stock_non_negative'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.code})"
@@ -38,6 +59,18 @@ class Product(models.Model):
     def is_low_stock(self) -> bool:
         return self.stock <= self.low_threshold
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            InventoryDataVersion.bump()
+            report_cache.invalidate_catalog()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            InventoryDataVersion.bump()
+            report_cache.invalidate_catalog()
+            return super().delete(*args, **kwargs)
+
 
 class Movement(models.Model):
     class MovementType(models.TextChoices):
@@ -48,12 +81,21 @@ class Movement(models.Model):
     movement_type = models.CharField(max_length=3, choices=MovementType.choices)
     quantity = models.DecimalField(max_digits=12, decimal_places=2)
     unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    # Costo promedio del producto al registrar el movimiento: los egresos históricos no
+    # cambian si después se edita ``avg_cost`` y los reportes no necesitan unir ``Product``.
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=2, blank=True)
     date = models.DateField()
     note = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['date', 'id']
+        indexes = [
+            # Listado de movimientos: ORDER BY -date, -id con o sin rango de fechas.
+            models.Index(fields=['-date', '-id'], name='movement_date_id_desc_idx'),
+            # Listado filtrado por producto con el mismo orden.
+            models.Index(fields=['product', '-date', '-id'], name='movement_product_date_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.get_movement_type_display()} {self.quantity} {self.product.code}"
@@ -62,58 +104,456 @@ class Movement(models.Model):
         multiplier = Decimal('1') if self.movement_type == self.MovementType.IN else Decimal('-1')
         return multiplier * self.quantity
 
-    def clean(self):
-        errors = {}
-        if self.quantity is not None and self.quantity <= 0:
-            errors['quantity'] = 'La cantidad debe ser mayor a cero.'
+    def get_total_value(self) -> Decimal:
+        return self.quantity * self.unit_price
 
-        # Validar que el stock nunca quede negativo al aplicar el movimiento.
-        if self.product_id:
-            old_delta = Decimal('0')
-            old_product_id = None
-            if self.pk:
-                previous = Movement.objects.get(pk=self.pk)
-                old_delta = previous.get_stock_delta()
-                old_product_id = previous.product_id
+    def get_total_cost(self) -> Decimal:
+        return self.quantity * self.unit_cost
 
-            new_delta = self.get_stock_delta()
-            product = Product.objects.get(pk=self.product_id)
-            projected_stock = product.stock - old_delta + new_delta
-            if projected_stock < 0:
-                errors['quantity'] = 'La operación dejaría el inventario en negativo.'
+    def _current_avg_cost(self) -> Decimal:
+        # El serializer ya cargó el producto; si no está en memoria se lee solo su costo.
+        if Movement.product.is_cached(self):
+            return self.product.avg_cost
+        avg_cost = Product.objects.filter(pk=self.product_id).values_list('avg_cost', flat=True).first()
+        return avg_cost if avg_cost is not None else Decimal('0')
 
-            if old_product_id and old_product_id != self.product_id:
-                previous_product = Product.objects.get(pk=old_product_id)
-                if previous_product.stock - old_delta < 0:
-                    errors['product'] = 'El cambio de producto no puede invalidar stock previo.'
+    def clean(self):
+        # Solo validaciones sin base de datos: el stock se valida al aplicarlo en ``save``.
+        if self.quantity is not None and self.quantity <= 0:
+            raise ValidationError({'quantity': 'La cantidad debe ser mayor a cero.'})
 
-        if errors:
-            raise ValidationError(errors)
+    @staticmethod
+    def _apply_stock_delta(product_id: int, delta: Decimal, field: str = 'quantity') -> None:
+        """Aplica ``delta`` al stock con un UPDATE condicional (``stock + delta >= 0``).
+
+        El mismo UPDATE bloquea la fila del producto y valida el stock, sin leerlo antes.
+        """
+        if not delta:
+            return
+        products = Product.objects.filter(pk=product_id)
+        if delta < 0:
+            products = products.filter(stock__gte=-delta)
+        if products.update(stock=F('stock') + delta):
+            return
+        if not Product.objects.filter(pk=product_id).exists():
+            raise ValidationError({'product': 'El producto no existe.'})
+        if field == 'product':
+            raise ValidationError({'product': 'El cambio de producto no puede invalidar stock previo.'})
+        raise ValidationError({field: 'La operación dejaría el inventario en negativo.'})
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        is_update = self.pk is not None
-        old_product_id = None
-        old_delta = Decimal('0')
-        if is_update:
-            old = Movement.objects.get(pk=self.pk)
-            old_product_id = old.product_id
-            old_delta = old.get_stock_delta()
+        # La existencia del producto la valida el UPDATE de stock, no una consulta previa.
+        self.full_clean(exclude=['product', 'unit_cost'], validate_unique=False, validate_constraints=False)
         with transaction.atomic():
-            super().save(*args, **kwargs)
+            old = None
+            if self.pk is not None:
+                old = Movement.objects.select_for_update().filter(pk=self.pk).first()
+
+            # El costo se fija al crear; solo se vuelve a tomar si el movimiento cambia de producto.
+            moved = old is not None and old.product_id != self.product_id and self.unit_cost == old.unit_cost
+            if self.unit_cost is None or moved:
+                self.unit_cost = self._current_avg_cost()
+
             new_delta = self.get_stock_delta()
-            if is_update and old_product_id and old_product_id != self.product_id:
-                Product.objects.select_for_update().filter(pk=old_product_id).update(stock=F('stock') - old_delta)
-                Product.objects.select_for_update().filter(pk=self.product_id).update(stock=F('stock') + new_delta)
+            if old is None:
+                self._apply_stock_delta(self.product_id, new_delta)
+            elif old.product_id != self.product_id:
+                self._apply_stock_delta(old.product_id, -old.get_stock_delta(), field='product')
+                self._apply_stock_delta(self.product_id, new_delta)
             else:
-                Product.objects.select_for_update().filter(pk=self.product_id).update(
-                    stock=F('stock') - old_delta + new_delta
+                self._apply_stock_delta(self.product_id, new_delta - old.get_stock_delta())
+            super().save(*args, **kwargs)
+
+            # El rollup diario se mantiene en la misma transacción que el stock.
+            if old is not None and DailyMovementRollup.key_for(old) == DailyMovementRollup.key_for(self):
+                DailyMovementRollup.apply(
+                    *DailyMovementRollup.key_for(self),
+                    self.quantity - old.quantity,
+                    self.get_total_value() - old.get_total_value(),
+                    self.get_total_cost() - old.get_total_cost(),
+                    0,
                 )
+            else:
+                if old is not None:
+                    DailyMovementRollup.remove_movement(old)
+                DailyMovementRollup.add_movement(self)
+            ProductStats.record(added=[self], removed=[old] if old is not None else [])
+            touched = [(self.product_id, self.date)]
+            if old is not None:
+                touched.append((old.product_id, old.date))
+            StockSnapshot.discard_from(touched)
+            InventoryDataVersion.bump()
+            report_cache.invalidate_dates([self.date] if old is None else [old.date, self.date])
 
     def delete(self, *args, **kwargs):
-        delta = self.get_stock_delta()
-        Product.objects.filter(pk=self.product_id).update(stock=F('stock') - delta)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            # Borrar una entrada ya vendida dejaría el stock negativo: se rechaza igual que una salida.
+            self._apply_stock_delta(self.product_id, -self.get_stock_delta())
+            DailyMovementRollup.remove_movement(self)
+            ProductStats.record(removed=[self])
+            StockSnapshot.discard_from([(self.product_id, self.date)])
+            InventoryDataVersion.bump()
+            report_cache.invalidate_dates([self.date])
+            return super().delete(*args, **kwargs)
+
+
+class DailyMovementRollup(models.Model):
+    """Totales por día, producto y tipo de movimiento usados por los reportes.
+
+    Se actualiza en ``Movement.save``/``Movement.delete`` y puede reconstruirse
+    completo con ``python manage.py rebuild_rollups``.
+    """
+
+    product = models.ForeignKey(Product, related_name='daily_rollups', on_delete=models.CASCADE)
+    date = models.DateField()
+    movement_type = models.CharField(max_length=3, choices=Movement.MovementType.choices)
+    quantity = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    value = models.DecimalField(max_digits=20, decimal_places=4, default=0)
+    # Suma de cantidad x ``Movement.unit_cost``.
+    cost = models.DecimalField(max_digits=20, decimal_places=4, default=0)
+    movement_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['date', 'product_id', 'movement_type']
+        # La restricción única (date, product, movement_type) sirve los rangos globales;
+        # este índice cubre los reportes filtrados por producto.
+        indexes = [
+            models.Index(fields=['product', 'date'], name='rollup_product_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'product', 'movement_type'],
+                name='unique_daily_rollup',
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - representación simple
+        return f"{self.date} {self.movement_type} {self.product_id}"
+
+    @classmethod
+    def apply(
+        cls,
+        product_id: int,
+        date,
+        movement_type: str,
+        quantity: Decimal,
+        value: Decimal,
+        cost: Decimal,
+        count: int,
+    ) -> None:
+        lookup = {'product_id': product_id, 'date': date, 'movement_type': movement_type}
+        updated = cls.objects.filter(**lookup).update(
+            quantity=F('quantity') + quantity,
+            value=F('value') + value,
+            cost=F('cost') + cost,
+            movement_count=F('movement_count') + count,
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(**lookup, quantity=quantity, value=value, cost=cost, movement_count=count)
+        except IntegrityError:
+            # Otro escritor creó la fila entre el UPDATE y el INSERT.
+            cls.objects.filter(**lookup).update(
+                quantity=F('quantity') + quantity,
+                value=F('value') + value,
+                cost=F('cost') + cost,
+                movement_count=F('movement_count') + count,
+            )
+
+    @staticmethod
+    def key_for(movement: Movement) -> tuple:
+        return movement.product_id, movement.date, movement.movement_type
+
+    @classmethod
+    def add_movement(cls, movement: Movement) -> None:
+        cls.apply(
+            movement.product_id,
+            movement.date,
+            movement.movement_type,
+            movement.quantity,
+            movement.get_total_value(),
+            movement.get_total_cost(),
+            1,
+        )
+
+    @classmethod
+    def remove_movement(cls, movement: Movement) -> None:
+        cls.apply(
+            movement.product_id,
+            movement.date,
+            movement.movement_type,
+            -movement.quantity,
+            -movement.get_total_value(),
+            -movement.get_total_cost(),
+            -1,
+        )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        totals = (
+            Movement.objects.values('product_id', 'date', 'movement_type')
+            .order_by()
+            .annotate(
+                total_quantity=Sum('quantity'),
+                total_value=Sum(F('quantity') * F('unit_price')),
+                total_cost=Sum(F('quantity') * F('unit_cost')),
+                total_count=Count('id'),
+            )
+        )
+        rows = [
+            cls(
+                product_id=item['product_id'],
+                date=item['date'],
+                movement_type=item['movement_type'],
+                quantity=item['total_quantity'],
+                value=item['total_value'],
+                cost=item['total_cost'],
+                movement_count=item['total_count'],
+            )
+            for item in totals.iterator()
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+class ProductStats(models.Model):
+    """Totales acumulados y velocidad de venta de cada producto para el listado.
+
+    ``Movement.save``/``Movement.delete`` (y la carga masiva) los actualizan en la
+    misma transacción: los totales con incrementos y la última fecha y la ventana
+    de 30 días desde el rollup diario, con búsquedas sobre ``rollup_product_date_idx``.
+    La ventana solo se mueve al escribir, así que ``rebuild_product_stats`` debe
+    correr a diario; también reconstruye todo desde la tabla de movimientos.
+    """
+
+    VELOCITY_WINDOW_DAYS = 30
+
+    product = models.OneToOneField(Product, primary_key=True, related_name='stats', on_delete=models.CASCADE)
+    total_in = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    total_out = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=20, decimal_places=4, default=0)
+    last_movement_date = models.DateField(null=True, blank=True)
+    # Unidades vendidas en los 30 días que terminan en ``window_end``.
+    units_out_30d = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    window_end = models.DateField(null=True, blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover - representación simple
+        return f"{self.product_id} out={self.total_out}"
+
+    @property
+    def velocity_30d(self) -> Decimal:
+        """Unidades vendidas por día en la ventana de 30 días."""
+        return (self.units_out_30d / self.VELOCITY_WINDOW_DAYS).quantize(Decimal('0.01'))
+
+    @classmethod
+    def _window_start(cls, today: datetime.date) -> datetime.date:
+        return today - datetime.timedelta(days=cls.VELOCITY_WINDOW_DAYS - 1)
+
+    @classmethod
+    def _derived_fields(cls, today: datetime.date) -> dict:
+        rollups = DailyMovementRollup.objects.filter(product=OuterRef('product_id')).order_by()
+        last_date = rollups.filter(movement_count__gt=0).order_by('-date').values('date')[:1]
+        sold = (
+            rollups.filter(
+                movement_type=Movement.MovementType.OUT,
+                date__gte=cls._window_start(today),
+                date__lte=today,
+            )
+            .values('product')
+            .annotate(total=Sum('quantity'))
+            .values('total')
+        )
+        quantity_field = models.DecimalField(max_digits=18, decimal_places=2)
+        return {
+            'last_movement_date': Subquery(last_date),
+            'units_out_30d': Coalesce(
+                Subquery(sold, output_field=quantity_field), Value(0), output_field=quantity_field
+            ),
+            'window_end': today,
+        }
+
+    @classmethod
+    def apply(cls, product_id: int, total_in: Decimal, total_out: Decimal, revenue: Decimal) -> None:
+        """Suma los deltas y recalcula la última fecha y la ventana (el rollup ya debe estar al día)."""
+        changes = {
+            'total_in': F('total_in') + total_in,
+            'total_out': F('total_out') + total_out,
+            'revenue': F('revenue') + revenue,
+            **cls._derived_fields(timezone.localdate()),
+        }
+        if cls.objects.filter(product_id=product_id).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(product_id=product_id)
+        except IntegrityError:
+            # Otro escritor creó la fila antes.
+            pass
+        cls.objects.filter(product_id=product_id).update(**changes)
+
+    @classmethod
+    def record(cls, added: Iterable[Movement] = (), removed: Iterable[Movement] = ()) -> None:
+        """Aplica movimientos agregados y quitados con un UPDATE por producto."""
+        deltas: dict[int, list[Decimal]] = defaultdict(lambda: [Decimal('0'), Decimal('0'), Decimal('0')])
+        for sign, movements in ((1, added), (-1, removed)):
+            for movement in movements:
+                entry = deltas[movement.product_id]
+                if movement.movement_type == Movement.MovementType.IN:
+                    entry[0] += sign * movement.quantity
+                else:
+                    entry[1] += sign * movement.quantity
+                    entry[2] += sign * movement.get_total_value()
+        for product_id, (total_in, total_out, revenue) in deltas.items():
+            cls.apply(product_id, total_in, total_out, revenue)
+
+    @classmethod
+    def refresh_windows(cls) -> int:
+        """Recorre la ventana de 30 días de todos los productos hasta hoy (un solo UPDATE)."""
+        return cls.objects.update(**cls._derived_fields(timezone.localdate()))
+
+    @classmethod
+    def rebuild(cls) -> int:
+        today = timezone.localdate()
+        is_in = Q(movement_type=Movement.MovementType.IN)
+        is_out = Q(movement_type=Movement.MovementType.OUT)
+        totals = (
+            Movement.objects.values('product_id')
+            .order_by()
+            .annotate(
+                sum_in=Sum('quantity', filter=is_in),
+                sum_out=Sum('quantity', filter=is_out),
+                sum_revenue=Sum(F('quantity') * F('unit_price'), filter=is_out),
+                last_date=Max('date'),
+                sum_out_30d=Sum('quantity', filter=is_out & Q(date__gte=cls._window_start(today), date__lte=today)),
+            )
+        )
+        rows = [
+            cls(
+                product_id=item['product_id'],
+                total_in=item['sum_in'] or 0,
+                total_out=item['sum_out'] or 0,
+                revenue=item['sum_revenue'] or 0,
+                last_movement_date=item['last_date'],
+                units_out_30d=item['sum_out_30d'] or 0,
+                window_end=today,
+            )
+            for item in totals.iterator()
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+class InventoryDataVersion(models.Model):
+    """Contador global que cambia con cada escritura de productos o movimientos.
+
+    Es una sola fila compartida por todos los procesos; las vistas de lectura lo
+    usan como ETag para responder 304 sin recalcular nada.
+    """
+
+    SINGLETON_ID = 1
+
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - representación simple
+        return f"v{self.version}"
+
+    @classmethod
+    def bump(cls) -> None:
+        if not cls.objects.filter(pk=cls.SINGLETON_ID).update(version=F('version') + 1):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(pk=cls.SINGLETON_ID, version=1)
+            except IntegrityError:
+                cls.objects.filter(pk=cls.SINGLETON_ID).update(version=F('version') + 1)
+
+    @classmethod
+    def current(cls) -> int:
+        version = cls.objects.filter(pk=cls.SINGLETON_ID).values_list('version', flat=True).first()
+        return version or 0
+
+
+class StockSnapshot(models.Model):
+    """Stock y valor de cada producto al cierre de un día.
+
+    Los llena ``python manage.py snapshot_stock`` (programado a diario) y sirven de
+    punto de partida para ``/api/inventory/?as_of=``: el stock de una fecha pasada es
+    el del último snapshot más los movimientos posteriores, sin recorrer todo el
+    historial. Un movimiento con fecha igual o anterior a un snapshot lo deja viejo,
+    así que ``Movement.save``/``delete`` lo borra (``discard_from``).
+    """
+
+    product = models.ForeignKey(Product, related_name='stock_snapshots', on_delete=models.CASCADE)
+    date = models.DateField()
+    stock = models.DecimalField(max_digits=12, decimal_places=2)
+    value = models.DecimalField(max_digits=18, decimal_places=2)
+
+    class Meta:
+        ordering = ['date', 'product_id']
+        indexes = [
+            models.Index(fields=['date'], name='stock_snapshot_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='unique_stock_snapshot'),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - representación simple
+        return f"{self.date} {self.product_id} {self.stock}"
+
+    @classmethod
+    def discard_from(cls, product_dates: Iterable[tuple[int, datetime.date]]) -> None:
+        """Borra los snapshots de cada producto con fecha igual o posterior a la dada."""
+        earliest: dict[int, datetime.date] = {}
+        for product_id, day in product_dates:
+            if product_id not in earliest or day < earliest[product_id]:
+                earliest[product_id] = day
+        condition = Q()
+        for product_id, day in earliest.items():
+            condition |= Q(product_id=product_id, date__gte=day)
+        if condition:
+            cls.objects.filter(condition).delete()
+
+
+class ExchangeRate(models.Model):
+    """Tasa USD→MXN por día; los reportes convierten cada día de la serie con la suya.
+
+    La llena el servicio de divisas al obtener la tasa del día y el comando
+    ``backfill_exchange_rates`` para fechas pasadas.
+    """
+
+    date = models.DateField(unique=True)
+    rate = models.DecimalField(max_digits=12, decimal_places=4)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self) -> str:  # pragma: no cover - representación simple
+        return f"{self.date} {self.rate}"
+
+    @classmethod
+    def record(cls, date, rate: Decimal) -> bool:
+        """Guarda la tasa del día; devuelve ``True`` si cambió algo."""
+        rate = Decimal(rate).quantize(Decimal('0.0001'))
+        changed = cls.objects.filter(date=date).exclude(rate=rate).update(rate=rate)
+        if not changed:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(date=date, rate=rate)
+                changed = 1
+            except IntegrityError:
+                # Ya existía con la misma tasa.
+                pass
+        if changed:
+            # La tasa de un día aplica a los días siguientes hasta la próxima registrada.
+            report_cache.invalidate_from(date)
+            # Cambian los montos en USD de los reportes: el ETag también debe cambiar.
+            InventoryDataVersion.bump()
+        return bool(changed)
 
 
 class Service(models.Model):
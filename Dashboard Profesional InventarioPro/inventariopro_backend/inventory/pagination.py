@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class MovementKeysetPagination(BasePagination):
+    """Paginación por cursor sobre el orden ``(-date, -id)`` de movimientos.
+
+    El cursor codifica la última ``(date, id)`` entregada y la siguiente página se
+    obtiene con un rango sobre el índice, sin ``COUNT(*)`` ni ``OFFSET``: el costo
+    es el mismo en la primera página que a un millón de filas de profundidad.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = 50
+    page_size_query_params = ('page_size', 'limit')
+    max_page_size = 500
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            last_date, last_id = position
+            # date <= d acota el rango sobre el índice; el OR solo descarta empates del mismo día.
+            queryset = queryset.filter(date__lte=last_date).filter(Q(date__lt=last_date) | Q(id__lt=last_id))
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        page = results[: self.page_size]
+        self.next_position = self._position(page[-1]) if self.has_next else None
+        return page
+
+    @staticmethod
+    def _position(item) -> tuple[date, int]:
+        # Admite instancias de modelo y filas de ``.values()`` (ruta rápida del listado).
+        if isinstance(item, dict):
+            return item['date'], item['id']
+        return item.date, item.id
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        for param in self.page_size_query_params:
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    size = int(value)
+                except (TypeError, ValueError):
+                    continue
+                if size > 0:
+                    return min(size, self.max_page_size)
+        return self.page_size
+
+    def get_next_link(self) -> str | None:
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def encode_cursor(self, position: tuple[date, int]) -> str:
+        last_date, last_id = position
+        raw = json.dumps([last_date.isoformat(), last_id], separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request) -> tuple[date, int] | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            last_date, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return date.fromisoformat(last_date), int(last_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
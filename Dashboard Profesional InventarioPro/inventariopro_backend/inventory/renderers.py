@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:  # pragma: no cover - depende del entorno
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+_DRF_ENCODER = JSONEncoder()
+
+
+def encode_default(obj):
+    """Convierte en una sola pasada los tipos que ``json`` no conoce.
+
+    ``Decimal`` sale como número (igual que hacía ``normalize_payload``) y las fechas
+    con el mismo formato que el encoder de DRF; el resto se delega a DRF.
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return _DRF_ENCODER.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` que serializa con orjson si está instalado y con ``json`` si no.
+
+    Las respuestas con sangría (``Accept: application/json; indent=2``) siguen por
+    la ruta estándar de DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if orjson is not None:
+            ret = orjson.dumps(
+                data,
+                default=encode_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+            return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+        ret = json.dumps(
+            data,
+            default=encode_default,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=(',', ':'),
+        )
+        # Igual que DRF: U+2028/U+2029 son válidos en JSON pero no en JavaScript.
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
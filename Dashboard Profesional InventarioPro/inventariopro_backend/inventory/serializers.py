@@ -1,12 +1,72 @@
 from __future__ import annotations
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Movement, Product
+from .models import Movement, Product, ProductStats
 
 
-class ProductSerializer(serializers.ModelSerializer):
+def parse_list_param(request, name: str) -> set[str] | None:
+    """Lee parámetros tipo ``?fields=a,b`` y devuelve el conjunto o ``None`` si no vienen."""
+    if request is None:
+        return None
+    raw = request.query_params.get(name)
+    if raw is None:
+        return None
+    return {item.strip() for item in raw.split(',') if item.strip()}
+
+
+class SparseFieldsMixin:
+    """Permite ``?fields=`` y ``?expand=`` en el serializer raíz.
+
+    Los campos listados en ``expandable_fields`` solo se incluyen si se piden en
+    ``?expand=`` (sin request, como serializer anidado, nunca). ``?fields=``
+    recorta la salida en lecturas (GET); en escrituras se conservan todos los
+    campos para no perder validaciones.
+    """
+
+    expandable_fields: dict[str, str] = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        expand = parse_list_param(request, 'expand') or set()
+        for field_name, expand_key in self.expandable_fields.items():
+            if expand_key not in expand:
+                self.fields.pop(field_name, None)
+        if request is None:
+            return
+
+        requested = parse_list_param(request, 'fields')
+        if requested and request.method == 'GET':
+            for field_name in set(self.fields) - requested:
+                self.fields.pop(field_name)
+
+
+class ProductStatsSerializer(serializers.ModelSerializer):
+    velocity_30d = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ProductStats
+        fields = [
+            'total_in',
+            'total_out',
+            'revenue',
+            'last_movement_date',
+            'units_out_30d',
+            'velocity_30d',
+            'window_end',
+        ]
+        read_only_fields = fields
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_low_stock = serializers.SerializerMethodField()
+    # ``null`` si el producto aún no tiene movimientos.
+    stats = ProductStatsSerializer(read_only=True)
+    expandable_fields = {'stats': 'stats'}
 
     class Meta:
         model = Product
@@ -21,15 +81,30 @@ class ProductSerializer(serializers.ModelSerializer):
             'suggested_price',
             'created_at',
             'is_low_stock',
+            'stats',
         ]
-        read_only_fields = ['created_at', 'is_low_stock']
+        read_only_fields = ['created_at', 'is_low_stock', 'stats']
 
     def get_is_low_stock(self, obj: Product) -> bool:
         return obj.is_low_stock
 
+    def validate_stock(self, value):
+        if value < 0:
+            raise serializers.ValidationError('El stock no puede ser negativo.')
+        return value
+
+    def update(self, instance, validated_data):
+        # Solo se escriben los campos enviados: un PATCH de nombre o precio no debe
+        # pisar con un valor leído antes el stock que los movimientos cambian en paralelo.
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 
-class MovementSerializer(serializers.ModelSerializer):
+class MovementSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product_detail = ProductSerializer(source='product', read_only=True)
+    expandable_fields = {'product_detail': 'product'}
 
     class Meta:
         model = Movement
@@ -40,28 +115,129 @@ class MovementSerializer(serializers.ModelSerializer):
             'movement_type',
             'quantity',
             'unit_price',
+            'unit_cost',
             'date',
             'note',
             'created_at',
         ]
-        read_only_fields = ['created_at', 'product_detail']
+        # El costo unitario lo fija Movement.save con el avg_cost del producto.
+        read_only_fields = ['unit_cost', 'created_at', 'product_detail']
 
     def validate_quantity(self, value):
         if value <= 0:
             raise serializers.ValidationError('La cantidad debe ser mayor a cero.')
         return value
 
-    def validate(self, attrs):
-        product = attrs.get('product') or getattr(self.instance, 'product', None)
-        movement_type = attrs.get('movement_type') or getattr(self.instance, 'movement_type', None)
-        quantity = attrs.get('quantity') or getattr(self.instance, 'quantity', None)
+    def save(self, **kwargs):
+        # El stock se valida dentro de la escritura (UPDATE condicional en Movement.save);
+        # aquí solo se traduce el error del modelo a un 400 de DRF.
+        try:
+            return super().save(**kwargs)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(serializers.as_serializer_error(exc))
+
+
+_MOVEMENT_VALUE_FIELDS = {
+    'id': 'id',
+    'product': 'product_id',
+    'movement_type': 'movement_type',
+    'quantity': 'quantity',
+    'unit_price': 'unit_price',
+    'unit_cost': 'unit_cost',
+    'date': 'date',
+    'note': 'note',
+    'created_at': 'created_at',
+}
+_PRODUCT_VALUE_FIELDS = (
+    'id',
+    'name',
+    'code',
+    'category',
+    'stock',
+    'low_threshold',
+    'avg_cost',
+    'suggested_price',
+    'created_at',
+)
+
 
-        if product and movement_type == Movement.MovementType.OUT and quantity is not None:
-            current_stock = product.stock
-            if self.instance and self.instance.product_id == product.id:
-                current_stock -= self.instance.get_stock_delta()
-            projected = current_stock - quantity
-            if projected < 0:
-                raise serializers.ValidationError({'quantity': 'La salida dejaría el inventario en negativo.'})
-        return attrs
+def _format_datetime(value, tz) -> str | None:
+    # Equivalente a DateTimeField.to_representation (ISO 8601 en la zona activa) sin resolverla por fila.
+    if value is None:
+        return None
+    if tz is not None:
+        value = value.astimezone(tz)
+    formatted = value.isoformat()
+    if formatted.endswith('+00:00'):
+        formatted = formatted[:-6] + 'Z'
+    return formatted
 
+
+class FlatMovementSerializer:
+    """Ruta rápida de solo lectura para listar movimientos.
+
+    Produce la misma salida que ``MovementSerializer`` a partir de filas de
+    ``.values()``, sin instanciar modelos ni campos DRF por fila. Los decimales
+    llegan ya cuantizados por el convertidor de la base de datos.
+    """
+
+    def __init__(self, fields: set[str] | None = None, expand_product: bool = False):
+        self.output = [
+            name
+            for name in MovementSerializer.Meta.fields
+            if (fields is None or name in fields) and (name != 'product_detail' or expand_product)
+        ]
+        # id y date siempre se leen: la paginación por cursor los necesita.
+        columns = {'id', 'date'}
+        columns |= {_MOVEMENT_VALUE_FIELDS[name] for name in self.output if name in _MOVEMENT_VALUE_FIELDS}
+        if 'product_detail' in self.output:
+            columns |= {f'product__{name}' for name in _PRODUCT_VALUE_FIELDS}
+        self.columns = sorted(columns)
+
+    def values(self, queryset):
+        return queryset.values(*self.columns)
+
+    def _product(self, values: dict, tz) -> dict:
+        product = {name: values[f'product__{name}'] for name in _PRODUCT_VALUE_FIELDS}
+        product['created_at'] = _format_datetime(product['created_at'], tz)
+        product['is_low_stock'] = product['stock'] <= product['low_threshold']
+        return product
+
+    def serialize(self, rows) -> list[dict]:
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        products: dict[int, dict] = {}
+        data = []
+        for values in rows:
+            item = {}
+            for name in self.output:
+                if name == 'product_detail':
+                    product_id = values['product__id']
+                    if product_id not in products:
+                        products[product_id] = self._product(values, tz)
+                    item[name] = products[product_id]
+                elif name == 'date':
+                    item[name] = values['date'].isoformat()
+                elif name == 'created_at':
+                    item[name] = _format_datetime(values['created_at'], tz)
+                else:
+                    item[name] = values[_MOVEMENT_VALUE_FIELDS[name]]
+            data.append(item)
+        return data
+
+
+class MovementBulkItemSerializer(serializers.ModelSerializer):
+    """Valida una fila de la carga masiva sin consultar el producto.
+
+    El producto y el stock proyectado se validan en lote en ``services.movements``.
+    """
+
+    product = serializers.IntegerField()
+
+    class Meta:
+        model = Movement
+        fields = ['product', 'movement_type', 'quantity', 'unit_price', 'date', 'note']
+
+    def validate_quantity(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('La cantidad debe ser mayor a cero.')
+        return value
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Solo se aceptan estos PRAGMAs y valores simples: se interpolan en el SQL.
+ALLOWED_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size', 'temp_store')
+_PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def get_pragmas() -> dict[str, str]:
+    """PRAGMAs a aplicar según ``SQLITE_PRAGMAS``; los valores vacíos se omiten."""
+    if not settings.SQLITE_TUNING:
+        return {}
+    pragmas = {}
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        if value in (None, ''):
+            continue
+        value = str(value).strip()
+        if name not in ALLOWED_PRAGMAS or not _PRAGMA_VALUE.match(value):
+            raise ImproperlyConfigured(f'PRAGMA de SQLite no válido: {name}={value!r}')
+        pragmas[name] = value
+    return pragmas
+
+
+def configure_connection(sender, connection, **kwargs) -> None:
+    """Receptor de ``connection_created``: ajusta cada conexión SQLite nueva."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_pragmas()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
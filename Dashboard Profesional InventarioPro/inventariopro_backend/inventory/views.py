@@ -1,33 +1,80 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from itertools import chain
 
-from django.db.models import F
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils.dateparse import parse_date
+from django.views import View
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
+from services.async_reports import get_cached_dashboard_metrics_async, get_cached_range_report_async
 from services.currency import get_usd_to_mxn_rate
-from services.reports import get_dashboard_metrics, get_range_report
+from services.exports import EXPORT_FORMATS, stream_movement_rows
+from services.movements import BULK_MODE_ATOMIC, BULK_MODES, bulk_create_movements
+from services.stock import products_as_of
+from services import report_cache
+from services.reports import (
+    SERIES_GRANULARITIES,
+    TOP_PRODUCT_METRICS,
+    get_cached_batch_range_report,
+    get_cached_dashboard_metrics,
+    get_cached_range_report,
+    get_cached_top_products,
+    get_category_totals,
+)
 
-from .models import Movement, Product
-from .serializers import MovementSerializer, ProductSerializer
+from .etags import AsyncDataVersionETagMixin, DataVersionETagMixin
+from .models import LOW_STOCK_CONDITION, Movement, Product
+from .pagination import MovementKeysetPagination
+from .renderers import FastJSONRenderer
+from .serializers import FlatMovementSerializer, MovementSerializer, ProductSerializer, parse_list_param
 
 
-def normalize_payload(data):
-    if isinstance(data, Decimal):
-        return float(data)
-    if isinstance(data, dict):
-        return {key: normalize_payload(value) for key, value in data.items()}
-    if isinstance(data, list):
-        return [normalize_payload(item) for item in data]
-    return data
+def parse_date_range(params) -> tuple[date, date] | None:
+    """Rango ``from``/``to`` de la query (últimos 30 días si falta); ``None`` si es inválido."""
+    start_param = params.get('from')
+    end_param = params.get('to')
+    if start_param and end_param:
+        start_date = parse_date(start_param)
+        end_date = parse_date(end_param)
+        if not start_date or not end_date:
+            return None
+    else:
+        end_date = datetime.today().date()
+        start_date = end_date - timedelta(days=30)
+    if start_date > end_date:
+        return None
+    return start_date, end_date
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+def parse_granularity(params) -> str | None:
+    """``granularity`` de la query (``day`` por defecto); ``None`` si no es válida."""
+    granularity = params.get('granularity') or 'day'
+    return granularity if granularity in SERIES_GRANULARITIES else None
+
+
+def _positive_int(value, default: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    return number if number > 0 else default
+
+
+def _json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    # Las vistas async no pasan por DRF: se serializa con el mismo renderer por defecto.
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status_code)
+
+
+class ProductViewSet(DataVersionETagMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all().order_by('name')
     serializer_class = ProductSerializer
 
@@ -42,16 +89,19 @@ class ProductViewSet(viewsets.ModelViewSet):
         if category:
             queryset = queryset.filter(category=category)
         if low_stock is not None:
-            queryset = queryset.filter(stock__lte=F('low_threshold'))
+            queryset = queryset.filter(LOW_STOCK_CONDITION)
+        if 'stats' in (parse_list_param(self.request, 'expand') or set()):
+            # Un JOIN 1:1 con ProductStats: sin recorrer el historial de movimientos.
+            queryset = queryset.select_related('stats')
         return queryset
 
 
 class MovementViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = Movement.objects.select_related('product').order_by('-date', '-id')
     serializer_class = MovementSerializer
+    pagination_class = MovementKeysetPagination
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
+    def filter_movements(self, queryset):
         product_id = self.request.query_params.get('product')
         start = self.request.query_params.get('start')
         end = self.request.query_params.get('end')
@@ -61,89 +111,135 @@ class MovementViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.G
             queryset = queryset.filter(date__gte=start)
         if end:
             queryset = queryset.filter(date__lte=end)
-        limit = self.request.query_params.get('limit') or self.request.query_params.get('page_size')
-        if limit:
-            try:
-                return queryset[: int(limit)]
-            except (TypeError, ValueError):
-                return queryset
         return queryset
 
+    def get_queryset(self):
+        return self.filter_movements(super().get_queryset())
+
+    def list(self, request, *args, **kwargs):
+        # Lectura sin DRF fields: filas desde .values() con la misma forma que MovementSerializer.
+        fields = parse_list_param(request, 'fields')
+        expand = parse_list_param(request, 'expand') or set()
+        flat = FlatMovementSerializer(fields=fields, expand_product='product' in expand)
+        queryset = flat.values(self.filter_movements(Movement.objects.order_by('-date', '-id')))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(flat.serialize(page))
+        return Response(flat.serialize(queryset))
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response({'detail': 'Formato de exportación inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            queryset = self.filter_movements(Movement.objects.order_by('-date', '-id'))
+            rows = stream_movement_rows(queryset, output, chunk_size=settings.MOVEMENT_EXPORT_CHUNK_SIZE)
+            first_chunk = next(rows)
+        except (ValueError, DjangoValidationError):
+            return Response({'detail': 'Filtros inválidos.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type, extension = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(chain([first_chunk], rows), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="movimientos.{extension}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        payload = request.data
+        mode = request.query_params.get('mode', BULK_MODE_ATOMIC)
+        if isinstance(payload, dict):
+            mode = payload.get('mode', mode)
+            payload = payload.get('movements')
+
+        if not isinstance(payload, list) or not payload:
+            return Response({'detail': 'Se espera una lista de movimientos.'}, status=status.HTTP_400_BAD_REQUEST)
+        if mode not in BULK_MODES:
+            return Response({'detail': 'Modo inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = settings.MOVEMENT_BULK_MAX_ITEMS
+        if len(payload) > max_items:
+            return Response(
+                {'detail': f'La carga admite como máximo {max_items} movimientos.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = bulk_create_movements(payload, mode=mode)
+        response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
+
+class DashboardView(DataVersionETagMixin, APIView):
+    etag_includes_rate = True
 
-class DashboardView(APIView):
     def get(self, request, *args, **kwargs):
-        start_param = request.query_params.get('from')
-        end_param = request.query_params.get('to')
-
-        if start_param and end_param:
-            start_date = parse_date(start_param)
-            end_date = parse_date(end_param)
-            if not start_date or not end_date:
-                return Response({'detail': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            end_date = datetime.today().date()
-            start_date = end_date - timedelta(days=30)
-
-        if start_date > end_date:
+        date_range = parse_date_range(request.query_params)
+        if date_range is None:
             return Response({'detail': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
+        start_date, end_date = date_range
 
-        metrics = get_dashboard_metrics(start_date, end_date)
-        return Response(normalize_payload(metrics))
+        metrics = get_cached_dashboard_metrics(start_date, end_date)
+        return Response(metrics)
 
 
-class InventorySummaryView(APIView):
-    def get(self, request, *args, **kwargs):
-        queryset = Product.objects.all().order_by('name')
-        serializer = ProductSerializer(queryset, many=True)
-
-        products_list = list(queryset)
-        total_stock = Decimal('0')
-        inventory_value = Decimal('0')
-        category_totals = defaultdict(
-            lambda: {
-                'category': '',
-                'products': 0,
-                'stock': Decimal('0'),
-                'inventory_value_mxn': Decimal('0'),
-            }
-        )
+class InventorySummaryView(DataVersionETagMixin, APIView):
+    products_page_size = 100
+    max_products_page_size = 500
 
-        for product in products_list:
-            total_stock += product.stock
-            inventory_value += product.stock * product.avg_cost
-            entry = category_totals[product.category]
-            entry['category'] = product.category
-            entry['products'] += 1
-            entry['stock'] += product.stock
-            entry['inventory_value_mxn'] += product.stock * product.avg_cost
+    def get(self, request, *args, **kwargs):
+        as_of = None
+        as_of_param = request.query_params.get('as_of')
+        if as_of_param:
+            try:
+                as_of = parse_date(as_of_param)
+            except ValueError:
+                as_of = None
+            if as_of is None:
+                return Response({'detail': 'Invalid as_of date'}, status=status.HTTP_400_BAD_REQUEST)
 
+        categories = get_category_totals(as_of=as_of)
+        total_products = sum(entry['products'] for entry in categories)
         response = {
-            'total_products': len(products_list),
-            'total_stock_units': total_stock,
-            'inventory_value_mxn': inventory_value,
-            'categories': [category_totals[key] for key in sorted(category_totals.keys())],
-            'products': serializer.data,
+            'as_of': as_of.isoformat() if as_of else None,
+            'total_products': total_products,
+            'total_stock_units': sum((entry['stock'] for entry in categories), Decimal('0')),
+            'inventory_value_mxn': sum((entry['inventory_value_mxn'] for entry in categories), Decimal('0')),
+            'categories': categories,
         }
-        return Response(normalize_payload(response))
+
+        if request.query_params.get('include_products', 'true').lower() not in ('false', '0', 'no'):
+            page = _positive_int(request.query_params.get('products_page'), 1)
+            page_size = min(
+                _positive_int(request.query_params.get('products_page_size'), self.products_page_size),
+                self.max_products_page_size,
+            )
+            offset = (page - 1) * page_size
+            # El total ya viene del agregado: no hace falta un COUNT(*) para saber si hay más páginas.
+            products = Product.objects.order_by('name', 'id')
+            if as_of is not None:
+                products = products_as_of(as_of, products)
+            products = list(products[offset : offset + page_size])
+            if as_of is not None:
+                # Solo para serializar: ``is_low_stock`` y ``stock`` reflejan la fecha pedida.
+                for product in products:
+                    product.stock = product.stock_as_of
+            has_next = offset + page_size < total_products
+            response['products'] = ProductSerializer(products, many=True, context={'request': request}).data
+            response['products_next'] = (
+                replace_query_param(request.build_absolute_uri(), 'products_page', page + 1) if has_next else None
+            )
+        return Response(response)
 
 
-class ReportsView(APIView):
+class ReportsView(DataVersionETagMixin, APIView):
+    etag_includes_rate = True
+
     def get(self, request, *args, **kwargs):
-        start_param = request.query_params.get('from')
-        end_param = request.query_params.get('to')
         product_param = request.query_params.get('product')
 
-        if start_param and end_param:
-            start_date = parse_date(start_param)
-            end_date = parse_date(end_param)
-            if not start_date or not end_date:
-                return Response({'detail': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            end_date = datetime.today().date()
-            start_date = end_date - timedelta(days=30)
-
-        if start_date > end_date:
+        date_range = parse_date_range(request.query_params)
+        if date_range is None:
             return Response({'detail': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
+        start_date, end_date = date_range
 
         product_id = None
         if product_param:
@@ -152,8 +248,125 @@ class ReportsView(APIView):
             except (TypeError, ValueError):
                 return Response({'detail': 'Invalid product id'}, status=status.HTTP_400_BAD_REQUEST)
 
-        report = get_range_report(start_date, end_date, product_id=product_id)
-        return Response(normalize_payload(report))
+        granularity = parse_granularity(request.query_params)
+        if granularity is None:
+            return Response({'detail': 'Invalid granularity'}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = get_cached_range_report(start_date, end_date, product_id=product_id, granularity=granularity)
+        return Response(report)
+
+
+class ReportBatchView(DataVersionETagMixin, APIView):
+    """Reportes de rango por producto para ``products=1,2,...`` y/o ``categories=a,b``."""
+
+    etag_includes_rate = True
+
+    def get(self, request, *args, **kwargs):
+        date_range = parse_date_range(request.query_params)
+        if date_range is None:
+            return Response({'detail': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
+
+        product_ids = parse_list_param(request, 'products') or set()
+        categories = parse_list_param(request, 'categories') or set()
+        if not product_ids and not categories:
+            return Response(
+                {'detail': 'Indica productos (products=1,2) o categorías (categories=a,b).'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            product_ids = {int(product_id) for product_id in product_ids}
+        except ValueError:
+            return Response({'detail': 'Invalid product id'}, status=status.HTTP_400_BAD_REQUEST)
+        max_products = settings.REPORT_BATCH_MAX_PRODUCTS
+        if len(product_ids) > max_products:
+            return Response(
+                {'detail': f'El reporte admite como máximo {max_products} productos por consulta.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        invalid_categories = categories - set(Product.ProductCategory.values)
+        if invalid_categories:
+            return Response(
+                {'detail': f'Categorías inválidas: {", ".join(sorted(invalid_categories))}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        granularity = parse_granularity(request.query_params)
+        if granularity is None:
+            return Response({'detail': 'Invalid granularity'}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = get_cached_batch_range_report(
+            *date_range, product_ids=product_ids, categories=categories, granularity=granularity
+        )
+        return Response(report)
+
+
+class TopProductsView(DataVersionETagMixin, APIView):
+    """Mejores y peores productos vendidos del rango por ``metric`` (ingresos, egresos, units, margin)."""
+
+    default_limit = 10
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        date_range = parse_date_range(request.query_params)
+        if date_range is None:
+            return Response({'detail': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
+        metric = request.query_params.get('metric') or 'ingresos'
+        if metric not in TOP_PRODUCT_METRICS:
+            return Response(
+                {'detail': f'Métrica inválida; usa una de: {", ".join(TOP_PRODUCT_METRICS)}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(_positive_int(request.query_params.get('limit'), self.default_limit), self.max_limit)
+        return Response(get_cached_top_products(*date_range, metric=metric, limit=limit))
+
+
+class AsyncDashboardView(AsyncDataVersionETagMixin, View):
+    """Variante async de ``DashboardView``: agregados y tasa en paralelo (servir con ASGI)."""
+
+    etag_includes_rate = True
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        date_range = parse_date_range(request.GET)
+        if date_range is None:
+            return _json_response({'detail': 'Invalid date range'}, status.HTTP_400_BAD_REQUEST)
+        return _json_response(await get_cached_dashboard_metrics_async(*date_range))
+
+
+class AsyncReportsView(AsyncDataVersionETagMixin, View):
+    """Variante async de ``ReportsView``: totales, serie y tasa al cierre en paralelo."""
+
+    etag_includes_rate = True
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        date_range = parse_date_range(request.GET)
+        if date_range is None:
+            return _json_response({'detail': 'Invalid date range'}, status.HTTP_400_BAD_REQUEST)
+
+        product_id = None
+        product_param = request.GET.get('product')
+        if product_param:
+            try:
+                product_id = int(product_param)
+            except (TypeError, ValueError):
+                return _json_response({'detail': 'Invalid product id'}, status.HTTP_400_BAD_REQUEST)
+
+        granularity = parse_granularity(request.GET)
+        if granularity is None:
+            return _json_response({'detail': 'Invalid granularity'}, status.HTTP_400_BAD_REQUEST)
+
+        report = await get_cached_range_report_async(*date_range, product_id=product_id, granularity=granularity)
+        return _json_response(report)
+
+
+class ReportCacheStatsView(APIView):
+    def get(self, request, *args, **kwargs):
+        return Response(report_cache.get_stats())
+
+    def delete(self, request, *args, **kwargs):
+        report_cache.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class UsdRateView(APIView):
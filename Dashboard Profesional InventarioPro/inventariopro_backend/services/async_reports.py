@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from functools import partial
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import report_cache, reports
+
+# Las consultas de las vistas async corren en un pool acotado propio: el ORM no es
+# async y ``sync_to_async`` (thread_sensitive) las serializaría en un único hilo.
+# Cada hilo del pool tiene su propia conexión, así que ``REPORT_QUERY_WORKERS``
+# también limita cuántas conexiones abren los reportes a la vez.
+#
+# La tasa se pide vía ``reports.get_usd_to_mxn_rate``: el mismo punto que usa (y que
+# se sustituye en pruebas para) la versión síncrona.
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=settings.REPORT_QUERY_WORKERS,
+                thread_name_prefix='report-query',
+            )
+        return _EXECUTOR
+
+
+def _call_with_connection(func: Callable[..., Any], *args, **kwargs) -> Any:
+    # Igual que en un ciclo de petición: se descartan conexiones vencidas o rotas
+    # antes y después, respetando ``CONN_MAX_AGE``.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Ejecuta ``func`` (código síncrono, p. ej. ORM) en el pool de reportes."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(_call_with_connection, func, *args, **kwargs))
+
+
+async def get_dashboard_metrics_async(
+    start: date | None = None, end: date | None = None, rate: Decimal | None = None
+) -> dict[str, Decimal | int]:
+    """``get_dashboard_metrics`` con los dos agregados y la tasa en paralelo."""
+    pending = [
+        run_in_pool(reports._dashboard_movement_aggregates, start, end),
+        run_in_pool(reports._dashboard_product_aggregates),
+    ]
+    if rate is None:
+        pending.append(run_in_pool(reports.get_usd_to_mxn_rate))
+    movement_aggregates, product_aggregates, *fetched = await asyncio.gather(*pending)
+    if rate is None:
+        rate = fetched[0]
+    return reports.build_dashboard_metrics(movement_aggregates, product_aggregates, rate)
+
+
+async def get_range_report_async(
+    start: date,
+    end: date,
+    product_id: int | None = None,
+    rate: Decimal | None = None,
+    granularity: str = 'day',
+) -> dict:
+    """``get_range_report`` con totales, serie y tasa al cierre en paralelo."""
+    granularity = reports.resolve_granularity(start, end, granularity)
+    totals, series_rows, end_rate = await asyncio.gather(
+        run_in_pool(reports._range_totals, start, end, product_id),
+        run_in_pool(reports._range_series_rows, start, end, product_id, granularity),
+        run_in_pool(reports._range_end_rate, end),
+    )
+    # La tasa actual solo hace falta para días sin historial; se pide una vez, fuera del loop.
+    if rate is None and (end_rate is None or reports.needs_current_rate(series_rows)):
+        rate = await run_in_pool(reports.get_usd_to_mxn_rate)
+    return reports.build_range_report(start, end, totals, series_rows, end_rate, lambda: rate, granularity)
+
+
+async def _get_or_compute_async(kind: str, params, start: date, end: date, compute, include_stock: bool = False):
+    def cached():
+        key = report_cache.cache_key(kind, params, start, end, include_stock)
+        return key, report_cache.lookup(key)
+
+    key, result = await run_in_pool(cached)
+    if result is None:
+        result = await compute()
+        await run_in_pool(report_cache.store, key, result)
+    return result
+
+
+async def _get_or_compute_rated_async(kind: str, params, start: date, end: date, compute):
+    def cached():
+        return report_cache.lookup_rated(
+            kind, params, start, end, lambda: reports.uses_current_rate(start), reports.get_usd_to_mxn_rate
+        )
+
+    key, result, rate = await run_in_pool(cached)
+    if result is None:
+        result = await compute(rate)
+        await run_in_pool(report_cache.store, key, result)
+    return result
+
+
+async def get_cached_dashboard_metrics_async(start: date, end: date) -> dict[str, Decimal | int]:
+    """Equivalente async de ``reports.get_cached_dashboard_metrics`` (misma llave de caché)."""
+    rate = await run_in_pool(reports.get_usd_to_mxn_rate)
+    return await _get_or_compute_async(
+        'dashboard',
+        (start.isoformat(), end.isoformat(), rate),
+        start,
+        end,
+        lambda: get_dashboard_metrics_async(start, end, rate=rate),
+        include_stock=True,
+    )
+
+
+async def get_cached_range_report_async(
+    start: date, end: date, product_id: int | None = None, granularity: str = 'day'
+) -> dict:
+    """Equivalente async de ``reports.get_cached_range_report`` (misma llave de caché)."""
+    granularity = reports.resolve_granularity(start, end, granularity)
+    return await _get_or_compute_rated_async(
+        'range',
+        (start.isoformat(), end.isoformat(), product_id or 'all', granularity),
+        start,
+        end,
+        lambda rate: get_range_report_async(start, end, product_id=product_id, rate=rate, granularity=granularity),
+    )
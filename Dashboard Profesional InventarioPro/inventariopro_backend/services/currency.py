@@ -1,52 +1,207 @@
 from __future__ import annotations
 
+import logging
 import threading
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Optional
 
 import requests
 from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from inventory.models import ExchangeRate
+
+logger = logging.getLogger(__name__)
+
+# Caché en dos niveles: ``_CACHE`` vive en el proceso y evita tocar la caché de
+# Django en cada petición; la caché de Django (``CURRENCY_CACHE_ALIAS``) comparte la
+# última tasa entre workers para que, normalmente, solo uno de ellos consulte la API
+# (ver ``_schedule_refresh`` sobre la atomicidad del candado).
+RATE_CACHE_KEY = 'currency:usd_mxn'
+REFRESH_LOCK_KEY = 'currency:usd_mxn:refresh'
 
 _CACHE_LOCK = threading.Lock()
+_FETCH_LOCK = threading.Lock()
 _CACHE: dict[str, Optional[Decimal | datetime]] = {
     'rate': None,
     'timestamp': None,
+    'last_failure': None,
 }
+_SESSION: Optional[requests.Session] = None
+_REFRESH_THREAD: Optional[threading.Thread] = None
+
+
+def _shared_cache():
+    return caches[settings.CURRENCY_CACHE_ALIAS]
+
 
+def _get_session() -> requests.Session:
+    global _SESSION
+    with _CACHE_LOCK:
+        if _SESSION is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.CURRENCY_HTTP_POOL_SIZE)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _age(timestamp: datetime) -> timedelta:
+    return datetime.utcnow() - timestamp
 
-def _is_cache_valid() -> bool:
-    timestamp = _CACHE.get('timestamp')
+
+def _needs_refresh(timestamp: Optional[datetime]) -> bool:
+    # Se refresca un poco antes de expirar para que nadie vea la tasa vencida.
     if not timestamp:
-        return False
-    return datetime.utcnow() - timestamp < timedelta(seconds=settings.CURRENCY_CACHE_TIMEOUT)
+        return True
+    ahead = settings.CURRENCY_CACHE_TIMEOUT - settings.CURRENCY_REFRESH_AHEAD
+    return _age(timestamp) >= timedelta(seconds=max(ahead, 0))
 
 
-def _get_api_endpoint() -> str:
+def _get_api_endpoint(day: date | None = None) -> str:
     base_url = (getattr(settings, 'EXCHANGE_API_URL', 'https://v6.exchangerate-api.com/v6') or '').rstrip('/')
     api_key = getattr(settings, 'EXCHANGE_API_KEY', '')
+    if day is not None:
+        return f"{base_url}/{api_key}/history/USD/{day.year}/{day.month}/{day.day}"
     return f"{base_url}/{api_key}/latest/USD"
 
 
-def get_usd_to_mxn_rate() -> Decimal:
+def _fallback_rate() -> Decimal:
+    return Decimal(getattr(settings, 'USD_MXN_FALLBACK_RATE', '18.0'))
+
+
+def _load_cached() -> tuple[Optional[Decimal], Optional[datetime]]:
+    """Devuelve la tasa más reciente entre la caché del proceso y la compartida."""
     with _CACHE_LOCK:
-        if _CACHE['rate'] is not None and _is_cache_valid():
-            return _CACHE['rate']  # type: ignore[return-value]
+        rate, timestamp = _CACHE['rate'], _CACHE['timestamp']
+    if rate is not None and not _needs_refresh(timestamp):  # type: ignore[arg-type]
+        return rate, timestamp  # type: ignore[return-value]
+
+    shared = _shared_cache().get(RATE_CACHE_KEY)
+    if shared is not None:
+        shared_rate, shared_timestamp = shared
+        if timestamp is None or shared_timestamp > timestamp:
+            with _CACHE_LOCK:
+                _CACHE['rate'] = shared_rate
+                _CACHE['timestamp'] = shared_timestamp
+            return shared_rate, shared_timestamp
+    return rate, timestamp  # type: ignore[return-value]
 
-    fallback_rate = Decimal(getattr(settings, 'USD_MXN_FALLBACK_RATE', '18.0'))
-    try:
-        response = requests.get(_get_api_endpoint(), timeout=10)
-        response.raise_for_status()
-        payload = response.json()
-        rate = Decimal(str(payload['conversion_rates']['MXN']))
-    except Exception:
-        with _CACHE_LOCK:
-            cached_rate = _CACHE.get('rate')
-        if cached_rate is not None:
-            return cached_rate  # type: ignore[return-value]
-        return fallback_rate
 
+def _store(rate: Decimal) -> None:
+    timestamp = datetime.utcnow()
     with _CACHE_LOCK:
         _CACHE['rate'] = rate
-        _CACHE['timestamp'] = datetime.utcnow()
+        _CACHE['timestamp'] = timestamp
+        _CACHE['last_failure'] = None
+    _shared_cache().set(RATE_CACHE_KEY, (rate, timestamp), settings.CURRENCY_MAX_STALE)
+    if settings.CURRENCY_RECORD_HISTORY:
+        _record_history(rate)
+
+
+def _record_history(rate: Decimal) -> None:
+    # El historial es secundario: un fallo de base de datos no debe tumbar la tasa.
+    try:
+        ExchangeRate.record(timezone.localdate(), rate)
+    except Exception:
+        logger.warning('No se pudo guardar la tasa USD/MXN del día.', exc_info=True)
+
+
+def _request_rate(day: date | None = None) -> Decimal:
+    response = _get_session().get(_get_api_endpoint(day), timeout=settings.CURRENCY_HTTP_TIMEOUT)
+    response.raise_for_status()
+    payload = response.json()
+    return Decimal(str(payload['conversion_rates']['MXN']))
+
+
+def _fetch_and_store() -> Decimal:
+    rate = _request_rate()
+    _store(rate)
     return rate
+
+
+def fetch_historical_rate(day: date) -> Decimal:
+    """Consulta la tasa de un día pasado (endpoint ``history`` de la API); lanza si falla."""
+    return _request_rate(day)
+
+
+def _refresh_in_background() -> None:
+    try:
+        _fetch_and_store()
+    except Exception:
+        # El candado compartido se deja expirar solo: hace de espera antes de reintentar.
+        logger.warning('No se pudo refrescar la tasa USD/MXN; se mantiene la anterior.', exc_info=True)
+        return
+    finally:
+        # Conexión propia del hilo (historial de tasas).
+        connection.close()
+    _shared_cache().delete(REFRESH_LOCK_KEY)
+
+
+def _schedule_refresh() -> None:
+    """Lanza un refresco en segundo plano si nadie (en ningún proceso) lo está haciendo ya.
+
+    Dentro de un proceso el hilo vivo y ``_CACHE_LOCK`` garantizan un solo refresco.
+    Entre procesos el candado es ``cache.add``, que solo es atómico en backends como
+    redis o memcached: con ``FileBasedCache`` (el valor por defecto) ``add`` revisa y
+    luego escribe, así que dos workers pueden refrescar a la vez. Es un candado de
+    mejor esfuerzo; el peor caso es una consulta extra a la API, no un valor erróneo.
+    """
+    global _REFRESH_THREAD
+    with _CACHE_LOCK:
+        if _REFRESH_THREAD is not None and _REFRESH_THREAD.is_alive():
+            return
+        if not _shared_cache().add(REFRESH_LOCK_KEY, True, settings.CURRENCY_RETRY_AFTER):
+            return
+        _REFRESH_THREAD = threading.Thread(target=_refresh_in_background, name='usd-mxn-refresh', daemon=True)
+        _REFRESH_THREAD.start()
+
+
+def peek_usd_to_mxn_rate() -> Optional[Decimal]:
+    """Devuelve la tasa en caché sin consultar la red (``None`` si no hay)."""
+    with _CACHE_LOCK:
+        return _CACHE['rate']  # type: ignore[return-value]
+
+
+def clear_cached_rate() -> None:
+    with _CACHE_LOCK:
+        _CACHE['rate'] = None
+        _CACHE['timestamp'] = None
+        _CACHE['last_failure'] = None
+    _shared_cache().delete_many([RATE_CACHE_KEY, REFRESH_LOCK_KEY])
+
+
+def get_usd_to_mxn_rate() -> Decimal:
+    """Tasa USD→MXN sin bloquear la petición mientras exista algún valor en caché.
+
+    Cerca de expirar (o ya vencida) se sirve la tasa guardada y se refresca en un
+    hilo aparte. Solo sin ningún valor previo se consulta la API en línea, y aun
+    así una sola vez por proceso: las peticiones concurrentes esperan ese resultado.
+    """
+    rate, timestamp = _load_cached()
+    if rate is not None:
+        if _needs_refresh(timestamp):
+            _schedule_refresh()
+        return rate
+
+    with _FETCH_LOCK:
+        rate, _ = _load_cached()
+        if rate is not None:
+            return rate
+        with _CACHE_LOCK:
+            last_failure: Optional[datetime] = _CACHE['last_failure']  # type: ignore[assignment]
+        # Tras un fallo reciente no se vuelve a esperar a la API en cada petición.
+        if last_failure and _age(last_failure) < timedelta(seconds=settings.CURRENCY_RETRY_AFTER):
+            return _fallback_rate()
+        try:
+            return _fetch_and_store()
+        except Exception:
+            logger.warning('No se pudo obtener la tasa USD/MXN; se usa la tasa de respaldo.', exc_info=True)
+            with _CACHE_LOCK:
+                _CACHE['last_failure'] = datetime.utcnow()
+            return _fallback_rate()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import Iterator
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+EXPORT_COLUMNS = (
+    'id',
+    'date',
+    'movement_type',
+    'product_id',
+    'product_code',
+    'product_name',
+    'quantity',
+    'unit_price',
+    'total',
+    'note',
+)
+_QUERY_FIELDS = (
+    'id',
+    'date',
+    'movement_type',
+    'product_id',
+    'product__code',
+    'product__name',
+    'quantity',
+    'unit_price',
+    'note',
+)
+
+# Filas por bloque enviado al cliente: evita un write() por fila sin acumular el rango completo.
+ROWS_PER_BLOCK = 500
+
+
+def _export_row(values: tuple) -> tuple:
+    movement_id, movement_date, movement_type, product_id, code, name, quantity, unit_price, note = values
+    return (
+        movement_id,
+        movement_date.isoformat(),
+        movement_type,
+        product_id,
+        code,
+        name,
+        quantity,
+        unit_price,
+        quantity * unit_price,
+        note,
+    )
+
+
+def _csv_blocks(rows: Iterator[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= ROWS_PER_BLOCK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    yield buffer.getvalue()
+
+
+def _ndjson_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Tipo no serializable: {type(value)!r}')
+
+
+def _ndjson_blocks(rows: Iterator[tuple]) -> Iterator[str]:
+    lines: list[str] = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_ndjson_default, ensure_ascii=False))
+        if len(lines) >= ROWS_PER_BLOCK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    yield '\n'.join(lines) + '\n' if lines else ''
+
+
+def stream_movement_rows(queryset, output: str, chunk_size: int = 2000) -> Iterator[str]:
+    """Genera el export de movimientos por bloques con memoria constante.
+
+    La consulta se ejecuta antes de emitir el primer bloque para que los filtros
+    inválidos fallen antes de iniciar la respuesta.
+    """
+    values = queryset.values_list(*_QUERY_FIELDS).iterator(chunk_size=chunk_size)
+    first = next(values, None)
+
+    def rows() -> Iterator[tuple]:
+        if first is None:
+            return
+        yield _export_row(first)
+        for item in values:
+            yield _export_row(item)
+
+    blocks = _csv_blocks(rows()) if output == 'csv' else _ndjson_blocks(rows())
+    yield from blocks
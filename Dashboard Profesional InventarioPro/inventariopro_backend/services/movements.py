@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from inventory.models import (
+    DailyMovementRollup,
+    InventoryDataVersion,
+    Movement,
+    Product,
+    ProductStats,
+    StockSnapshot,
+)
+from inventory.serializers import MovementBulkItemSerializer
+
+from . import report_cache
+
+BULK_MODE_ATOMIC = 'atomic'
+BULK_MODE_BEST_EFFORT = 'best_effort'
+BULK_MODES = (BULK_MODE_ATOMIC, BULK_MODE_BEST_EFFORT)
+
+
+def _validate_rows(rows: list) -> tuple[list[tuple[int, dict]], list[dict]]:
+    valid: list[tuple[int, dict]] = []
+    errors: list[dict] = []
+    for index, row in enumerate(rows):
+        serializer = MovementBulkItemSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+    return valid, errors
+
+
+def _project_stock(
+    valid: list[tuple[int, dict]], products: dict[int, Product]
+) -> tuple[list[tuple[int, dict]], list[dict]]:
+    """Aplica las filas en orden sobre el stock en memoria y descarta las que lo dejarían negativo."""
+    projected = {product_id: product.stock for product_id, product in products.items()}
+    accepted: list[tuple[int, dict]] = []
+    errors: list[dict] = []
+    for index, data in valid:
+        product_id = data['product']
+        if product_id not in projected:
+            errors.append({'index': index, 'errors': {'product': ['El producto no existe.']}})
+            continue
+        delta = data['quantity'] if data['movement_type'] == Movement.MovementType.IN else -data['quantity']
+        if projected[product_id] + delta < 0:
+            errors.append({'index': index, 'errors': {'quantity': ['La salida dejaría el inventario en negativo.']}})
+            continue
+        projected[product_id] += delta
+        accepted.append((index, data))
+    return accepted, errors
+
+
+class _StockConflict(Exception):
+    """Otro escritor consumió el stock entre la proyección y el UPDATE condicional."""
+
+    def __init__(self, product_id: int):
+        super().__init__(product_id)
+        self.product_id = product_id
+
+
+def _conflict_errors(rows: list[tuple[int, dict]]) -> list[dict]:
+    return [
+        {'index': index, 'errors': {'quantity': ['La salida dejaría el inventario en negativo.']}} for index, _ in rows
+    ]
+
+
+def bulk_create_movements(rows: list, mode: str = BULK_MODE_ATOMIC) -> dict:
+    """Registra muchos movimientos con un INSERT por lote y un UPDATE de stock por producto.
+
+    En modo ``atomic`` cualquier fila inválida cancela toda la carga; en modo
+    ``best_effort`` se guardan las filas válidas y se reportan los errores por índice
+    (un conflicto de stock solo rechaza las filas de ese producto).
+    """
+    valid, errors = _validate_rows(rows)
+    if errors and mode == BULK_MODE_ATOMIC:
+        return {'created': 0, 'ids': [], 'errors': errors}
+
+    try:
+        return _bulk_insert(valid, errors, mode)
+    except _StockConflict as conflict:
+        # Solo en modo atomic: la transacción ya se revirtió y se reportan las filas del producto en conflicto.
+        conflict_errors = _conflict_errors(
+            [(index, data) for index, data in valid if data['product'] == conflict.product_id]
+        )
+        return {'created': 0, 'ids': [], 'errors': sorted(errors + conflict_errors, key=lambda item: item['index'])}
+
+
+def _insert_product_rows(product: Product, rows: list[tuple[int, dict]]) -> list[tuple[int, Movement]]:
+    """Inserta las filas de un producto y aplica su stock y su rollup; ``_StockConflict`` si no alcanza."""
+    movements = [
+        (
+            index,
+            Movement(
+                product_id=product.pk,
+                movement_type=data['movement_type'],
+                quantity=data['quantity'],
+                unit_price=data['unit_price'],
+                unit_cost=product.avg_cost,
+                date=data['date'],
+                note=data.get('note', ''),
+            ),
+        )
+        for index, data in rows
+    ]
+    Movement.objects.bulk_create([movement for _, movement in movements], batch_size=500)
+
+    delta = sum((movement.get_stock_delta() for _, movement in movements), Decimal('0'))
+    # Condicional como en Movement.save: no depende de que select_for_update bloquee.
+    products = Product.objects.filter(pk=product.pk)
+    if delta < 0:
+        products = products.filter(stock__gte=-delta)
+    if delta and not products.update(stock=F('stock') + delta):
+        raise _StockConflict(product.pk)
+
+    rollup_deltas: dict[tuple, list] = defaultdict(lambda: [Decimal('0'), Decimal('0'), Decimal('0'), 0])
+    for _, movement in movements:
+        entry = rollup_deltas[(movement.date, movement.movement_type)]
+        entry[0] += movement.quantity
+        entry[1] += movement.get_total_value()
+        entry[2] += movement.get_total_cost()
+        entry[3] += 1
+    for (movement_date, movement_type), totals in rollup_deltas.items():
+        DailyMovementRollup.apply(product.pk, movement_date, movement_type, *totals)
+    return movements
+
+
+def _bulk_insert(valid: list[tuple[int, dict]], errors: list[dict], mode: str) -> dict:
+    with transaction.atomic():
+        product_ids = {data['product'] for _, data in valid}
+        products = Product.objects.select_for_update().in_bulk(product_ids)
+        accepted, stock_errors = _project_stock(valid, products)
+        errors = errors + stock_errors
+        if (errors and mode == BULK_MODE_ATOMIC) or not accepted:
+            return {'created': 0, 'ids': [], 'errors': sorted(errors, key=lambda item: item['index'])}
+
+        rows_by_product: dict[int, list[tuple[int, dict]]] = defaultdict(list)
+        for index, data in accepted:
+            rows_by_product[data['product']].append((index, data))
+
+        inserted: list[tuple[int, Movement]] = []
+        for product_id, rows in rows_by_product.items():
+            if mode == BULK_MODE_ATOMIC:
+                # Un conflicto revierte toda la carga (ver bulk_create_movements).
+                inserted.extend(_insert_product_rows(products[product_id], rows))
+                continue
+            # En best_effort cada producto va en su savepoint: un conflicto solo
+            # rechaza las filas de ese producto.
+            try:
+                with transaction.atomic():
+                    inserted.extend(_insert_product_rows(products[product_id], rows))
+            except _StockConflict:
+                errors = errors + _conflict_errors(rows)
+
+        errors = sorted(errors, key=lambda item: item['index'])
+        if not inserted:
+            return {'created': 0, 'ids': [], 'errors': errors}
+        movements = [movement for _, movement in sorted(inserted, key=lambda item: item[0])]
+        ProductStats.record(added=movements)
+        StockSnapshot.discard_from((movement.product_id, movement.date) for movement in movements)
+        InventoryDataVersion.bump()
+        report_cache.invalidate_dates({movement.date for movement in movements})
+
+    return {
+        'created': len(movements),
+        'ids': [movement.pk for movement in movements if movement.pk is not None],
+        'errors': errors,
+    }
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+# Cada resultado se guarda bajo una llave que incluye los "tokens de generación" de
+# todo lo que lo afecta: los meses del rango, el catálogo y, para el dashboard, el
+# stock. Una escritura cambia solo los tokens que toca y las entradas viejas quedan
+# huérfanas hasta expirar; no hace falta borrarlas ni conocerlas.
+KEY_PREFIX = 'reports'
+GLOBAL_GENERATION = f'{KEY_PREFIX}:gen:all'
+CATALOG_GENERATION = f'{KEY_PREFIX}:gen:catalog'
+STOCK_GENERATION = f'{KEY_PREFIX}:gen:stock'
+MOVEMENTS_GENERATION = f'{KEY_PREFIX}:gen:movements'
+STATS_KEYS = {'hits': f'{KEY_PREFIX}:stats:hits', 'misses': f'{KEY_PREFIX}:stats:misses'}
+# Marca guardada en la llave base de un reporte que usa la tasa actual: el resultado
+# vive bajo esa llave más la tasa (ver ``lookup_rated``).
+RATE_DEPENDENT = 'rate-dependent'
+
+# Rangos más largos usan un token único de movimientos en lugar de uno por mes.
+MAX_TRACKED_MONTHS = 36
+
+
+def _cache():
+    return caches[settings.REPORT_CACHE_ALIAS]
+
+
+def _month_generation(value: date) -> str:
+    return f'{KEY_PREFIX}:gen:month:{value.year:04d}-{value.month:02d}'
+
+
+def _month_generations(start: date, end: date) -> list[str]:
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+    if months > MAX_TRACKED_MONTHS:
+        return [MOVEMENTS_GENERATION]
+    keys = []
+    year, month = start.year, start.month
+    for _ in range(months):
+        keys.append(f'{KEY_PREFIX}:gen:month:{year:04d}-{month:02d}')
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _generation_tokens(keys: list[str]) -> list[str]:
+    cache = _cache()
+    tokens = cache.get_many(keys)
+    missing = [key for key in keys if key not in tokens]
+    for key in missing:
+        # Un token desalojado nunca vuelve a un valor previo: se emite uno nuevo.
+        cache.add(key, _new_token(), None)
+    if missing:
+        tokens.update(cache.get_many(missing))
+    return [str(tokens.get(key, '')) for key in keys]
+
+
+def _bump(keys: Iterable[str]) -> None:
+    keys = list(keys)
+
+    def apply():
+        _cache().set_many({key: _new_token() for key in keys}, None)
+
+    # Se invalida de inmediato (lecturas dentro de la misma transacción) y otra vez
+    # al confirmar, para descartar lo que un lector concurrente haya calculado con
+    # los datos previos al commit.
+    apply()
+    transaction.on_commit(apply)
+
+
+def invalidate_dates(dates: Iterable[date]) -> None:
+    """Invalida los reportes cuyos rangos incluyen alguna de ``dates`` y el dashboard."""
+    months = {_month_generation(value) for value in dates}
+    _bump([*sorted(months), MOVEMENTS_GENERATION, STOCK_GENERATION])
+
+
+def invalidate_from(start: date) -> None:
+    """Invalida los meses desde ``start`` en adelante (p. ej. al registrar una tasa de cambio).
+
+    Los rangos que terminan en el futuro también dependen de la última tasa, así que
+    se cubre hasta un año después de hoy.
+    """
+    end = timezone.localdate() + timedelta(days=366)
+    months = _month_generations(min(start, end), end)
+    if months == [MOVEMENTS_GENERATION]:
+        invalidate_all()
+        return
+    _bump([*months, MOVEMENTS_GENERATION])
+
+
+def invalidate_catalog() -> None:
+    """Los costos promedio y el stock de productos afectan a todos los reportes."""
+    _bump([CATALOG_GENERATION])
+
+
+def invalidate_all() -> None:
+    _bump([GLOBAL_GENERATION])
+
+
+def _count(outcome: str) -> None:
+    cache = _cache()
+    key = STATS_KEYS[outcome]
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_key(kind: str, params: Iterable[Any], start: date, end: date, include_stock: bool = False) -> str:
+    """Llave vigente para ``kind``/``params``: cambia cuando cambia algún token del rango."""
+    generation_keys = [GLOBAL_GENERATION, CATALOG_GENERATION, *_month_generations(start, end)]
+    if include_stock:
+        generation_keys.append(STOCK_GENERATION)
+    digest = hashlib.sha1('|'.join(_generation_tokens(generation_keys)).encode('ascii')).hexdigest()[:20]
+    return ':'.join([KEY_PREFIX, kind, *(str(part) for part in params), digest])
+
+
+def lookup(key: str) -> Any:
+    """Resultado guardado bajo ``key`` (``None`` si no hay); cuenta el acierto o el fallo."""
+    result = _cache().get(key)
+    _count('hits' if result is not None else 'misses')
+    return result
+
+
+def store(key: str, result: Any) -> None:
+    _cache().set(key, result, settings.REPORT_CACHE_TIMEOUT)
+
+
+def get_or_compute(
+    kind: str,
+    params: Iterable[Any],
+    start: date,
+    end: date,
+    compute: Callable[[], Any],
+    include_stock: bool = False,
+) -> Any:
+    """Devuelve el resultado en caché para ``kind``/``params`` o lo calcula y lo guarda."""
+    key = cache_key(kind, params, start, end, include_stock)
+    result = lookup(key)
+    if result is None:
+        result = compute()
+        store(key, result)
+    return result
+
+
+def lookup_rated(
+    kind: str,
+    params: Iterable[Any],
+    start: date,
+    end: date,
+    uses_current_rate: Callable[[], bool],
+    current_rate: Callable[[], Decimal],
+) -> tuple[str, Any, Decimal | None]:
+    """Como ``lookup`` para reportes que pueden convertir días con la tasa actual.
+
+    Los días sin historial de tasas se convierten con la tasa actual, que cambia sin
+    pasar por ``invalidate_from``: en esos reportes la tasa forma parte de la llave.
+    Devuelve ``(llave, resultado, tasa)``; en un fallo la llave es donde guardar el
+    resultado y la tasa la que debe usar el cálculo (``None`` si no la necesita).
+    """
+    cache = _cache()
+    base_key = cache_key(kind, params, start, end)
+    key, result, rate = base_key, cache.get(base_key), None
+    if result == RATE_DEPENDENT:
+        rate = current_rate()
+        key = f'{base_key}:{rate}'
+        result = cache.get(key)
+    _count('hits' if result is not None else 'misses')
+    if result is None and rate is None and uses_current_rate():
+        rate = current_rate()
+        cache.set(base_key, RATE_DEPENDENT, settings.REPORT_CACHE_TIMEOUT)
+        key = f'{base_key}:{rate}'
+    return key, result, rate
+
+
+def get_or_compute_rated(
+    kind: str,
+    params: Iterable[Any],
+    start: date,
+    end: date,
+    compute: Callable[[Decimal | None], Any],
+    uses_current_rate: Callable[[], bool],
+    current_rate: Callable[[], Decimal],
+) -> Any:
+    """``get_or_compute`` con la tasa actual en la llave cuando el reporte la usa."""
+    key, result, rate = lookup_rated(kind, params, start, end, uses_current_rate, current_rate)
+    if result is None:
+        result = compute(rate)
+        store(key, result)
+    return result
+
+
+def get_stats() -> dict[str, Any]:
+    values = _cache().get_many(list(STATS_KEYS.values()))
+    hits = int(values.get(STATS_KEYS['hits'], 0))
+    misses = int(values.get(STATS_KEYS['misses'], 0))
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+        'backend': settings.CACHES[settings.REPORT_CACHE_ALIAS]['BACKEND'].rsplit('.', 1)[-1],
+    }
+
+
+def reset_stats() -> None:
+    _cache().delete_many(list(STATS_KEYS.values()))
@@ -1,58 +1,81 @@
 from __future__ import annotations
 
-from datetime import date
+import hashlib
+from datetime import date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Iterable
 
-from django.db.models import Case, DecimalField, ExpressionWrapper, F, Sum, Value, When
-from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, TruncMonth, TruncQuarter, TruncWeek, TruncYear
 
-from inventory.models import Movement, Product
+from inventory.models import LOW_STOCK_CONDITION, DailyMovementRollup, ExchangeRate, Movement, Product
+from . import report_cache
 from .currency import get_usd_to_mxn_rate
+from .stock import products_as_of
 
 MONEY_FIELD = DecimalField(max_digits=18, decimal_places=2)
 
 
-def _movement_value_expression() -> ExpressionWrapper:
+def _movement_value_expression(model=Movement) -> ExpressionWrapper:
+    # El rollup ya guarda la suma de cantidad x precio unitario por día.
+    if model is DailyMovementRollup:
+        return ExpressionWrapper(F('value'), output_field=MONEY_FIELD)
     return ExpressionWrapper(F('quantity') * F('unit_price'), output_field=MONEY_FIELD)
 
 
-def _movement_cost_expression() -> ExpressionWrapper:
-    return ExpressionWrapper(F('quantity') * F('product__avg_cost'), output_field=MONEY_FIELD)
+def _movement_cost_expression(model=Movement) -> ExpressionWrapper:
+    # Costo registrado al escribir cada movimiento (``unit_cost``): sin JOIN a ``Product``.
+    if model is DailyMovementRollup:
+        return ExpressionWrapper(F('cost'), output_field=MONEY_FIELD)
+    return ExpressionWrapper(F('quantity') * F('unit_cost'), output_field=MONEY_FIELD)
 
 
 def _quantize(value: Decimal, places: str = '0.01') -> Decimal:
     return value.quantize(Decimal(places), rounding=ROUND_HALF_UP)
 
 
-def calculate_totals(movements) -> dict[str, Decimal]:
-    sale_value = _movement_value_expression()
-    cost_value = _movement_cost_expression()
-    aggregates = movements.aggregate(
-        ingresos=Coalesce(
-            Sum(
-                Case(
-                    When(movement_type=Movement.MovementType.OUT, then=sale_value),
-                    default=Value(0),
-                    output_field=MONEY_FIELD,
-                )
-            ),
-            Value(0),
-            output_field=MONEY_FIELD,
-        ),
-        egresos=Coalesce(
-            Sum(
-                Case(
-                    When(movement_type=Movement.MovementType.OUT, then=cost_value),
-                    default=Value(0),
-                    output_field=MONEY_FIELD,
-                )
-            ),
-            Value(0),
-            output_field=MONEY_FIELD,
+def _rollup_queryset(start: date | None = None, end: date | None = None, product_id: int | None = None):
+    rollups = DailyMovementRollup.objects.filter(movement_count__gt=0)
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+    if product_id:
+        rollups = rollups.filter(product_id=product_id)
+    return rollups
+
+
+def _sum_for_type(movement_type: str, expression) -> Coalesce:
+    return Coalesce(
+        Sum(
+            Case(
+                When(movement_type=movement_type, then=expression),
+                default=Value(0),
+                output_field=MONEY_FIELD,
+            )
         ),
+        Value(0),
+        output_field=MONEY_FIELD,
     )
-    ingresos = aggregates['ingresos'] or Decimal('0')
-    egresos = aggregates['egresos'] or Decimal('0')
+
+
+def _build_totals(ingresos: Decimal | None, egresos: Decimal | None) -> dict[str, Decimal]:
+    ingresos = ingresos or Decimal('0')
+    egresos = egresos or Decimal('0')
     balance = ingresos - egresos
     return {
         'ingresos_mxn': _quantize(ingresos),
@@ -61,40 +84,43 @@ def calculate_totals(movements) -> dict[str, Decimal]:
     }
 
 
+def calculate_totals(movements) -> dict[str, Decimal]:
+    """Totales de ingresos/egresos para un queryset de ``Movement`` o de ``DailyMovementRollup``."""
+    aggregates = movements.aggregate(
+        ingresos=_sum_for_type(Movement.MovementType.OUT, _movement_value_expression(movements.model)),
+        egresos=_sum_for_type(Movement.MovementType.OUT, _movement_cost_expression(movements.model)),
+    )
+    return _build_totals(aggregates['ingresos'], aggregates['egresos'])
+
+
+def _rate_as_of(day) -> Subquery:
+    """Última tasa registrada en o antes de ``day`` (índice único sobre ``ExchangeRate.date``)."""
+    return Subquery(
+        ExchangeRate.objects.filter(date__lte=day).order_by('-date').values('rate')[:1],
+        output_field=DecimalField(max_digits=12, decimal_places=4),
+    )
+
+
 def _convert_mxn_to_usd(amount: Decimal, usd_to_mxn_rate: Decimal) -> Decimal:
     if usd_to_mxn_rate <= 0:
         return Decimal('0')
     return _quantize(amount / usd_to_mxn_rate)
 
 
-def get_dashboard_metrics(start: date | None = None, end: date | None = None) -> dict[str, Decimal | int]:
-    movements = Movement.objects.all()
-    if start:
-        movements = movements.filter(date__gte=start)
-    if end:
-        movements = movements.filter(date__lte=end)
-
-    sale_value = _movement_value_expression()
-    purchase_cost_value = _movement_cost_expression()
-    purchases_aggregates = movements.filter(movement_type=Movement.MovementType.IN).aggregate(
-        purchases=Coalesce(Sum(purchase_cost_value), Value(0), output_field=MONEY_FIELD)
+def _dashboard_movement_aggregates(start: date | None = None, end: date | None = None) -> dict[str, Decimal]:
+    # Una sola pasada con agregación condicional sobre el rollup.
+    movements = _rollup_queryset(start, end)
+    cost_value = _movement_cost_expression(movements.model)
+    return movements.aggregate(
+        purchases=_sum_for_type(Movement.MovementType.IN, cost_value),
+        ingresos=_sum_for_type(Movement.MovementType.OUT, _movement_value_expression(movements.model)),
+        costo_ventas=_sum_for_type(Movement.MovementType.OUT, cost_value),
     )
 
-    sales_aggregates = movements.filter(movement_type=Movement.MovementType.OUT).aggregate(
-        ingresos=Coalesce(Sum(sale_value), Value(0), output_field=MONEY_FIELD),
-        costo_ventas=Coalesce(Sum(purchase_cost_value), Value(0), output_field=MONEY_FIELD),
-    )
-    ingresos_total = sales_aggregates['ingresos'] or Decimal('0')
-    costo_ventas_total = sales_aggregates['costo_ventas'] or Decimal('0')
-    utilidad_mxn = ingresos_total - costo_ventas_total
-    profit_margin = Decimal('0')
-    if costo_ventas_total > 0:
-        profit_margin = (utilidad_mxn / costo_ventas_total) * Decimal('100')
 
-    totals = calculate_totals(movements)
-    low_stock_count = Product.objects.filter(stock__lte=F('low_threshold')).count()
-    product_count = Product.objects.count()
-    product_totals = Product.objects.aggregate(
+def _dashboard_product_aggregates() -> dict[str, Decimal | int]:
+    aggregates = Product.objects.aggregate(
+        product_count=Count('id'),
         total_stock=Coalesce(Sum('stock'), Value(0), output_field=MONEY_FIELD),
         inventory_value=Coalesce(
             Sum(ExpressionWrapper(F('stock') * F('avg_cost'), output_field=MONEY_FIELD)),
@@ -102,9 +128,24 @@ def get_dashboard_metrics(start: date | None = None, end: date | None = None) ->
             output_field=MONEY_FIELD,
         ),
     )
-    rate = get_usd_to_mxn_rate()
+    # Aparte del agregado: así el conteo solo recorre el índice parcial de bajo stock.
+    aggregates['low_stock_count'] = Product.objects.filter(LOW_STOCK_CONDITION).count()
+    return aggregates
+
 
-    purchases_mxn = _quantize(purchases_aggregates['purchases'] or Decimal('0'))
+def build_dashboard_metrics(
+    movement_aggregates: dict, product_aggregates: dict, rate: Decimal
+) -> dict[str, Decimal | int]:
+    """Arma el dashboard a partir de los dos agregados y la tasa (sin consultas)."""
+    ingresos_total = movement_aggregates['ingresos'] or Decimal('0')
+    costo_ventas_total = movement_aggregates['costo_ventas'] or Decimal('0')
+    utilidad_mxn = ingresos_total - costo_ventas_total
+    profit_margin = Decimal('0')
+    if costo_ventas_total > 0:
+        profit_margin = (utilidad_mxn / costo_ventas_total) * Decimal('100')
+
+    totals = _build_totals(ingresos_total, costo_ventas_total)
+    purchases_mxn = _quantize(movement_aggregates['purchases'] or Decimal('0'))
     purchases_usd = _convert_mxn_to_usd(purchases_mxn, rate)
 
     ingresos_usd = _convert_mxn_to_usd(totals['ingresos_mxn'], rate)
@@ -113,10 +154,10 @@ def get_dashboard_metrics(start: date | None = None, end: date | None = None) ->
 
     return {
         **totals,
-        'low_stock_count': low_stock_count,
-        'product_count': product_count,
-        'total_stock_units': _quantize(product_totals['total_stock'] or Decimal('0'), '0.01'),
-        'inventory_value_mxn': _quantize(product_totals['inventory_value'] or Decimal('0')),
+        'low_stock_count': product_aggregates['low_stock_count'],
+        'product_count': product_aggregates['product_count'],
+        'total_stock_units': _quantize(product_aggregates['total_stock'] or Decimal('0'), '0.01'),
+        'inventory_value_mxn': _quantize(product_aggregates['inventory_value'] or Decimal('0')),
         'usd_rate': _quantize(rate, '0.0001'),
         'ingresos_usd': ingresos_usd,
         'egresos_usd': egresos_usd,
@@ -127,64 +168,419 @@ def get_dashboard_metrics(start: date | None = None, end: date | None = None) ->
     }
 
 
-def get_range_report(start: date, end: date, product_id: int | None = None) -> dict:
-    movements = Movement.objects.filter(date__gte=start, date__lte=end)
-    if product_id:
-        movements = movements.filter(product_id=product_id)
-    totals = calculate_totals(movements)
-    rate = get_usd_to_mxn_rate()
+def get_dashboard_metrics(
+    start: date | None = None, end: date | None = None, rate: Decimal | None = None
+) -> dict[str, Decimal | int]:
+    movement_aggregates = _dashboard_movement_aggregates(start, end)
+    product_aggregates = _dashboard_product_aggregates()
+    if rate is None:
+        rate = get_usd_to_mxn_rate()
+    return build_dashboard_metrics(movement_aggregates, product_aggregates, rate)
 
-    # Egresos se calculan usando el costo de compra (avg_cost) multiplicado por la cantidad de salidas.
-    series_qs = (
-        movements.values('date')
-        .order_by('date')
+
+def get_category_totals(as_of: date | None = None) -> list[dict]:
+    """Productos, stock y valor de inventario por categoría en un solo ``GROUP BY``.
+
+    Con ``as_of`` usa el stock reconstruido a esa fecha (``services.stock``),
+    valorizado al costo promedio actual.
+    """
+    products, stock = Product.objects.all(), 'stock'
+    if as_of is not None:
+        products, stock = products_as_of(as_of), 'stock_as_of'
+    rows = (
+        products.values('category')
+        .order_by('category')
         .annotate(
-            ingresos=Coalesce(
-                Sum(
-                    Case(
-                        When(movement_type=Movement.MovementType.OUT, then=_movement_value_expression()),
-                        default=Value(0),
-                        output_field=MONEY_FIELD,
-                    )
-                ),
+            product_count=Count('id'),
+            total_stock=Coalesce(Sum(stock), Value(0), output_field=MONEY_FIELD),
+            inventory_value=Coalesce(
+                Sum(ExpressionWrapper(F(stock) * F('avg_cost'), output_field=MONEY_FIELD)),
                 Value(0),
                 output_field=MONEY_FIELD,
             ),
-            egresos=Coalesce(
-                Sum(
-                    Case(
-                        When(movement_type=Movement.MovementType.OUT, then=_movement_cost_expression()),
-                        default=Value(0),
-                        output_field=MONEY_FIELD,
-                    )
-                ),
-                Value(0),
+        )
+    )
+    return [
+        {
+            'category': row['category'],
+            'products': row['product_count'],
+            'stock': row['total_stock'],
+            'inventory_value_mxn': row['inventory_value'],
+        }
+        for row in rows
+    ]
+
+
+# Granularidades de la serie. ``auto`` elige la más fina que no pase de
+# ``REPORT_MAX_SERIES_POINTS`` puntos, subiendo a trimestre o año en rangos muy largos.
+SERIES_GRANULARITIES = ('day', 'week', 'month', 'auto')
+_AUTO_GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+_BUCKET_TRUNCS = {'week': TruncWeek, 'month': TruncMonth, 'quarter': TruncQuarter, 'year': TruncYear}
+
+
+def _bucket_count(start: date, end: date, granularity: str) -> int:
+    if granularity == 'day':
+        return (end - start).days + 1
+    if granularity == 'week':
+        return (end - (start - timedelta(days=start.weekday()))).days // 7 + 1
+    if granularity == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    if granularity == 'quarter':
+        return (end.year - start.year) * 4 + (end.month - 1) // 3 - (start.month - 1) // 3 + 1
+    return end.year - start.year + 1
+
+
+def resolve_granularity(start: date, end: date, granularity: str = 'day') -> str:
+    if granularity != 'auto':
+        return granularity
+    for candidate in _AUTO_GRANULARITIES:
+        if _bucket_count(start, end, candidate) <= settings.REPORT_MAX_SERIES_POINTS:
+            return candidate
+    return 'year'
+
+
+def _sum_out_when(condition: Q, expression) -> Coalesce:
+    return Coalesce(
+        Sum(
+            Case(
+                When(Q(movement_type=Movement.MovementType.OUT) & condition, then=expression),
                 output_field=MONEY_FIELD,
-            ),
+            )
+        ),
+        Value(0),
+        output_field=MONEY_FIELD,
+    )
+
+
+def _series_values(movements, granularity: str, group_by: tuple[str, ...] = ()):
+    """Serie agrupada por día o por periodo (``TruncWeek``/``TruncMonth``...) en la base de datos."""
+    value = _movement_value_expression(movements.model)
+    # Egresos: cantidad de salidas por el costo unitario registrado en cada movimiento.
+    cost = _movement_cost_expression(movements.model)
+    if granularity == 'day':
+        return (
+            movements.values(*group_by, 'date')
+            .order_by(*group_by, 'date')
+            .annotate(
+                ingresos=_sum_for_type(Movement.MovementType.OUT, value),
+                egresos=_sum_for_type(Movement.MovementType.OUT, cost),
+                usd_rate=_rate_as_of(OuterRef('date')),
+            )
+        )
+
+    # En un periodo cada día conserva su propia tasa: se suma en USD fila por fila.
+    # Los días anteriores al historial de tasas se suman aparte en MXN y se
+    # convierten después con la tasa actual, igual que en la serie diaria.
+    first_rate_date = Coalesce(
+        Subquery(ExchangeRate.objects.order_by('date').values('date')[:1]),
+        Value(date.max),
+    )
+    rated = Q(date__gte=first_rate_date)
+    # Como ``float``: en SQLite un monto entero entre una tasa entera trunca la división.
+    day_rate = Cast(_rate_as_of(OuterRef('date')), output_field=FloatField())
+    return (
+        movements.annotate(bucket=_BUCKET_TRUNCS[granularity]('date'))
+        .values(*group_by, 'bucket')
+        .order_by(*group_by, 'bucket')
+        .annotate(
+            ingresos=_sum_for_type(Movement.MovementType.OUT, value),
+            egresos=_sum_for_type(Movement.MovementType.OUT, cost),
+            ingresos_usd=_sum_out_when(rated, ExpressionWrapper(value / day_rate, output_field=MONEY_FIELD)),
+            egresos_usd=_sum_out_when(rated, ExpressionWrapper(cost / day_rate, output_field=MONEY_FIELD)),
+            unrated_ingresos=_sum_out_when(~rated, value),
+            unrated_egresos=_sum_out_when(~rated, cost),
         )
     )
 
+
+def _range_totals(start: date, end: date, product_id: int | None = None) -> dict[str, Decimal]:
+    return calculate_totals(_rollup_queryset(start, end, product_id))
+
+
+def _range_series_rows(
+    start: date, end: date, product_id: int | None = None, granularity: str = 'day'
+) -> list[dict]:
+    return list(_series_values(_rollup_queryset(start, end, product_id), granularity))
+
+
+def _range_end_rate(end: date) -> Decimal | None:
+    return ExchangeRate.objects.filter(date__lte=end).order_by('-date').values_list('rate', flat=True).first()
+
+
+def uses_current_rate(start: date) -> bool:
+    """Si un rango desde ``start`` puede tener días sin historial de tasas."""
+    first_rate_date = ExchangeRate.objects.order_by('date').values_list('date', flat=True).first()
+    return first_rate_date is None or first_rate_date > start
+
+
+def needs_current_rate(series_rows: list[dict]) -> bool:
+    """Si algún punto de la serie cae antes del historial de tasas."""
+    for item in series_rows:
+        if 'bucket' in item:
+            if item['unrated_ingresos'] or item['unrated_egresos']:
+                return True
+        elif item['usd_rate'] is None:
+            return True
+    return False
+
+
+def _bucket_usd(rated_usd: Decimal | None, unrated_mxn: Decimal | None, current_rate: Callable[[], Decimal]) -> Decimal:
+    amount = rated_usd or Decimal('0')
+    if unrated_mxn:
+        rate = current_rate()
+        if rate > 0:
+            amount += unrated_mxn / rate
+    return amount
+
+
+def _build_series(series_rows, current_rate: Callable[[], Decimal]) -> tuple[list[dict], dict[str, Decimal]]:
+    """Serie en MXN y USD (cada día con su tasa) y la suma de los montos en USD.
+
+    En series por periodo ``date`` es el inicio del periodo y ``usd_rate`` la tasa
+    efectiva (MXN/USD de sus montos), o ``None`` si no hubo salidas.
+    """
     series = []
-    for item in series_qs:
-        ingresos = item['ingresos'] or Decimal('0')
-        egresos = item['egresos'] or Decimal('0')
-        balance = ingresos - egresos
-        series.append(
-            {
-                'date': item['date'].isoformat(),
-                'ingresos_mxn': _quantize(ingresos),
-                'egresos_mxn': _quantize(egresos),
-                'balance_mxn': _quantize(balance),
+    usd_totals = {'ingresos_usd': Decimal('0'), 'egresos_usd': Decimal('0'), 'balance_usd': Decimal('0')}
+    for item in series_rows:
+        day_totals = _build_totals(item['ingresos'], item['egresos'])
+        if 'bucket' in item:
+            ingresos_usd = _bucket_usd(item['ingresos_usd'], item['unrated_ingresos'], current_rate)
+            egresos_usd = _bucket_usd(item['egresos_usd'], item['unrated_egresos'], current_rate)
+            flows_usd = ingresos_usd + egresos_usd
+            entry = {
+                'date': item['bucket'].isoformat(),
+                **day_totals,
+                'usd_rate': (
+                    _quantize((item['ingresos'] + item['egresos']) / flows_usd, '0.0001') if flows_usd > 0 else None
+                ),
+                'ingresos_usd': _quantize(ingresos_usd),
+                'egresos_usd': _quantize(egresos_usd),
+                'balance_usd': _quantize(ingresos_usd - egresos_usd),
             }
-        )
+        else:
+            day_rate = item['usd_rate'] or current_rate()
+            entry = {'date': item['date'].isoformat(), **day_totals, 'usd_rate': _quantize(day_rate, '0.0001')}
+            for currency_key in usd_totals:
+                entry[currency_key] = _convert_mxn_to_usd(day_totals[currency_key.replace('_usd', '_mxn')], day_rate)
+        for currency_key in usd_totals:
+            usd_totals[currency_key] += entry[currency_key]
+        series.append(entry)
+    return series, usd_totals
+
 
-    report = {
+def build_range_report(
+    start: date,
+    end: date,
+    totals: dict[str, Decimal],
+    series_rows: list[dict],
+    end_rate: Decimal | None,
+    current_rate: Callable[[], Decimal],
+    granularity: str = 'day',
+) -> dict:
+    """Arma el reporte de rango; ``current_rate`` solo se llama si falta historial de tasas."""
+    series, usd_totals = _build_series(series_rows, current_rate)
+    return {
         'range': {'from': start.isoformat(), 'to': end.isoformat()},
+        'granularity': granularity,
         **totals,
-        'usd_rate': _quantize(rate, '0.0001'),
-        'ingresos_usd': _convert_mxn_to_usd(totals['ingresos_mxn'], rate),
-        'egresos_usd': _convert_mxn_to_usd(totals['egresos_mxn'], rate),
-        'balance_usd': _convert_mxn_to_usd(totals['balance_mxn'], rate),
+        'usd_rate': _quantize(end_rate or current_rate(), '0.0001'),
+        **usd_totals,
         'series': series,
     }
-    return report
+
+
+def get_range_report(
+    start: date,
+    end: date,
+    product_id: int | None = None,
+    rate: Decimal | None = None,
+    granularity: str = 'day',
+) -> dict:
+    """Totales y serie del rango; cada día se convierte a USD con su propia tasa.
+
+    La tasa de cada día sale de ``ExchangeRate`` en la misma consulta de la serie.
+    Solo los días sin historial previo usan la tasa actual (``rate``), así que un
+    rango ya cubierto por el historial no consulta la API y no cambia con el tiempo.
+    ``granularity`` (``day``, ``week``, ``month`` o ``auto``) agrupa la serie en la
+    base de datos; los totales no cambian.
+    """
+    granularity = resolve_granularity(start, end, granularity)
+    totals = _range_totals(start, end, product_id)
+    series_rows = _range_series_rows(start, end, product_id, granularity)
+    end_rate = _range_end_rate(end)
+
+    def current_rate() -> Decimal:
+        nonlocal rate
+        if rate is None:
+            rate = get_usd_to_mxn_rate()
+        return rate
+
+    return build_range_report(start, end, totals, series_rows, end_rate, current_rate, granularity)
+
+
+def get_batch_range_report(
+    start: date,
+    end: date,
+    product_ids: Iterable[int] = (),
+    categories: Iterable[str] = (),
+    rate: Decimal | None = None,
+    granularity: str = 'day',
+) -> dict:
+    """Reporte de rango por producto para varios productos o categorías a la vez.
+
+    Equivale a llamar ``get_range_report`` por cada producto, pero con una sola
+    consulta agrupada por ``product_id`` y fecha (o periodo) sobre el rollup: el
+    número de consultas no depende de cuántos productos se pidan. Los productos
+    sin movimientos en el rango aparecen con totales en cero y serie vacía.
+    """
+    granularity = resolve_granularity(start, end, granularity)
+    product_filter = Q()
+    if product_ids:
+        product_filter |= Q(id__in=list(product_ids))
+    if categories:
+        product_filter |= Q(category__in=list(categories))
+    products = []
+    if product_filter:
+        products = list(Product.objects.filter(product_filter).order_by('id').values('id', 'name', 'code', 'category'))
+    rows_by_product: dict[int, list[dict]] = {product['id']: [] for product in products}
+    movements = _rollup_queryset(start, end).filter(product_id__in=list(rows_by_product))
+    for row in _series_values(movements, granularity, group_by=('product_id',)):
+        rows_by_product[row['product_id']].append(row)
+
+    def current_rate() -> Decimal:
+        nonlocal rate
+        if rate is None:
+            rate = get_usd_to_mxn_rate()
+        return rate
+
+    breakdowns = []
+    for product in products:
+        series_rows = rows_by_product[product['id']]
+        # Suma de los montos por punto sin redondear: mismo resultado que ``calculate_totals``.
+        totals = _build_totals(
+            sum((row['ingresos'] for row in series_rows), Decimal('0')),
+            sum((row['egresos'] for row in series_rows), Decimal('0')),
+        )
+        series, usd_totals = _build_series(series_rows, current_rate)
+        breakdowns.append({'product': product, **totals, **usd_totals, 'series': series})
+
+    end_rate = _range_end_rate(end)
+    return {
+        'range': {'from': start.isoformat(), 'to': end.isoformat()},
+        'granularity': granularity,
+        'usd_rate': _quantize(end_rate or current_rate(), '0.0001'),
+        'products': breakdowns,
+    }
+
+
+# Criterios del ranking de productos: columna por la que se ordena cada lista.
+TOP_PRODUCT_METRICS = ('ingresos', 'egresos', 'units', 'margin')
+
+
+def _top_products_queryset(start: date, end: date):
+    sales = _rollup_queryset(start, end).filter(movement_type=Movement.MovementType.OUT)
+    return sales.values('product_id').annotate(
+        name=F('product__name'),
+        code=F('product__code'),
+        category=F('product__category'),
+        units=Sum('quantity'),
+        ingresos=Sum(_movement_value_expression(sales.model)),
+        egresos=Sum(_movement_cost_expression(sales.model)),
+        margin=ExpressionWrapper(F('ingresos') - F('egresos'), output_field=MONEY_FIELD),
+    )
+
+
+def _top_product_entry(row: dict) -> dict:
+    ingresos = row['ingresos'] or Decimal('0')
+    egresos = row['egresos'] or Decimal('0')
+    margin_pct = (ingresos - egresos) / egresos * Decimal('100') if egresos > 0 else Decimal('0')
+    return {
+        'product': {'id': row['product_id'], 'name': row['name'], 'code': row['code'], 'category': row['category']},
+        'units': _quantize(row['units'] or Decimal('0')),
+        'ingresos_mxn': _quantize(ingresos),
+        'egresos_mxn': _quantize(egresos),
+        'margin_mxn': _quantize(ingresos - egresos),
+        'margin_pct': _quantize(margin_pct),
+    }
+
+
+def get_top_products(start: date, end: date, metric: str = 'ingresos', limit: int = 10) -> dict:
+    """Los ``limit`` productos con más y con menos ``metric`` vendidos en el rango.
+
+    Cada lista es un solo ``GROUP BY product_id ... ORDER BY ... LIMIT`` sobre las
+    salidas del rollup, con las mismas expresiones de valor y costo que el resto de
+    los reportes. Solo entran productos con ventas en el rango.
+    """
+    rows = _top_products_queryset(start, end)
+    return {
+        'range': {'from': start.isoformat(), 'to': end.isoformat()},
+        'metric': metric,
+        'limit': limit,
+        'top': [_top_product_entry(row) for row in rows.order_by(f'-{metric}', 'product_id')[:limit]],
+        'bottom': [_top_product_entry(row) for row in rows.order_by(metric, 'product_id')[:limit]],
+    }
+
+
+def get_cached_dashboard_metrics(start: date, end: date) -> dict[str, Decimal | int]:
+    """``get_dashboard_metrics`` memorizado por rango y tasa; ver ``services.report_cache``."""
+    rate = get_usd_to_mxn_rate()
+    return report_cache.get_or_compute(
+        'dashboard',
+        (start.isoformat(), end.isoformat(), rate),
+        start,
+        end,
+        lambda: get_dashboard_metrics(start, end, rate=rate),
+        include_stock=True,
+    )
+
+
+def get_cached_range_report(
+    start: date, end: date, product_id: int | None = None, granularity: str = 'day'
+) -> dict:
+    # El historial de tasas invalida sus meses al registrarse (``ExchangeRate.record``);
+    # la tasa actual solo entra en la llave si el rango tiene días sin historial.
+    granularity = resolve_granularity(start, end, granularity)
+    return report_cache.get_or_compute_rated(
+        'range',
+        (start.isoformat(), end.isoformat(), product_id or 'all', granularity),
+        start,
+        end,
+        lambda rate: get_range_report(start, end, product_id=product_id, rate=rate, granularity=granularity),
+        lambda: uses_current_rate(start),
+        get_usd_to_mxn_rate,
+    )
+
+
+def get_cached_batch_range_report(
+    start: date,
+    end: date,
+    product_ids: Iterable[int] = (),
+    categories: Iterable[str] = (),
+    granularity: str = 'day',
+) -> dict:
+    product_ids = sorted(set(product_ids))
+    categories = sorted(set(categories))
+    granularity = resolve_granularity(start, end, granularity)
+    # La selección puede ser larga: en la llave va solo su digest.
+    selection = f'{",".join(map(str, product_ids))}|{",".join(categories)}'
+    return report_cache.get_or_compute_rated(
+        'range-batch',
+        (start.isoformat(), end.isoformat(), hashlib.sha1(selection.encode('utf-8')).hexdigest()[:20], granularity),
+        start,
+        end,
+        lambda rate: get_batch_range_report(
+            start, end, product_ids=product_ids, categories=categories, rate=rate, granularity=granularity
+        ),
+        lambda: uses_current_rate(start),
+        get_usd_to_mxn_rate,
+    )
+
+
+def get_cached_top_products(start: date, end: date, metric: str = 'ingresos', limit: int = 10) -> dict:
+    return report_cache.get_or_compute(
+        'top-products',
+        (start.isoformat(), end.isoformat(), metric, limit),
+        start,
+        end,
+        lambda: get_top_products(start, end, metric=metric, limit=limit),
+    )
@@ -0,0 +1,25 @@
+import pytest
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_report_cache():
+    # La caché por defecto es de archivos en BASE_DIR/.cache: las pruebas usan una en
+    # memoria para no leer ni borrar la del desarrollador ni chocar entre corridas paralelas.
+    cache_settings = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'inventariopro-tests',
+        },
+    }
+    with override_settings(CACHES=cache_settings):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_report_cache(isolated_report_cache):
+    # La caché de reportes vive fuera de la base de datos de pruebas: se limpia por prueba.
+    for cache in caches.all():
+        cache.clear()
+    yield
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import ExchangeRate, Movement, Product
+from services import reports
+from services.async_reports import get_dashboard_metrics_async, get_range_report_async
+
+
+# TransactionTestCase: las consultas corren en los hilos del pool, con otra conexión,
+# y solo ven datos confirmados.
+class AsyncReportViewsTests(TransactionTestCase):
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        rate_patcher.start()
+
+        self.product = Product.objects.create(
+            name='Producto Async',
+            code='ASY1',
+            category=Product.ProductCategory.GAMING_PCS,
+            stock=Decimal('0'),
+            low_threshold=Decimal('5'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        self.today = timezone.localdate()
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('10'),
+            unit_price=Decimal('10'),
+            date=self.today - timedelta(days=3),
+        )
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.OUT,
+            quantity=Decimal('4'),
+            unit_price=Decimal('20'),
+            date=self.today - timedelta(days=2),
+        )
+
+    def test_async_views_match_sync_views(self):
+        query = f'?from={self.today - timedelta(days=7)}&to={self.today}'
+        for sync_name, async_name, extra in (
+            ('dashboard', 'dashboard-async', ''),
+            ('reports', 'reports-async', ''),
+            ('reports', 'reports-async', f'&product={self.product.id}'),
+        ):
+            async_response = self.client.get(reverse(async_name) + query + extra)
+            # Misma llave de caché en ambas variantes: se limpia para que cada una calcule.
+            caches['default'].clear()
+            sync_response = self.client.get(reverse(sync_name) + query + extra)
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_async_views_reject_invalid_params(self):
+        response = self.client.get(reverse('dashboard-async'), {'from': '2024-02-01', 'to': '2024-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse('reports-async'), {'product': 'abc'}).status_code, 400)
+
+    async def test_async_view_answers_not_modified_with_etag(self):
+        first = await self.async_client.get(reverse('dashboard-async'))
+        self.assertEqual(first.status_code, 200)
+        second = await self.async_client.get(reverse('dashboard-async'), headers={'If-None-Match': first['ETag']})
+        self.assertEqual(second.status_code, 304)
+
+    def test_dashboard_aggregates_and_rate_run_concurrently(self):
+        # Cada parte espera a las otras dos: si corrieran en serie, la barrera vencería.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def waiting(func):
+            def wrapper(*args, **kwargs):
+                barrier.wait()
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        movement_aggregates = waiting(reports._dashboard_movement_aggregates)
+        product_aggregates = waiting(reports._dashboard_product_aggregates)
+        with patch.object(reports, '_dashboard_movement_aggregates', movement_aggregates), patch.object(
+            reports, '_dashboard_product_aggregates', product_aggregates
+        ), patch('services.reports.get_usd_to_mxn_rate', waiting(lambda: Decimal('18.00'))):
+            metrics = async_to_sync(get_dashboard_metrics_async)(self.today - timedelta(days=7), self.today)
+
+        self.assertEqual(metrics, reports.get_dashboard_metrics(self.today - timedelta(days=7), self.today))
+
+    def test_range_report_skips_rate_lookup_when_history_covers_range(self):
+        ExchangeRate.record(self.today - timedelta(days=30), Decimal('17.5'))
+        with patch('services.reports.get_usd_to_mxn_rate') as current_rate:
+            report = async_to_sync(get_range_report_async)(self.today - timedelta(days=7), self.today)
+        current_rate.assert_not_called()
+        self.assertEqual(report['usd_rate'], Decimal('17.5000'))
+        self.assertEqual(report['series'][0]['usd_rate'], Decimal('17.5000'))
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import DailyMovementRollup, Movement, Product
+from services import movements
+
+
+class BulkMovementTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('movement-bulk')
+        self.day = date(2024, 5, 1)
+        self.console = Product.objects.create(
+            name='Consola Bulk',
+            code='BULK1',
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('5'),
+            low_threshold=Decimal('1'),
+            avg_cost=Decimal('100'),
+            suggested_price=Decimal('150'),
+        )
+        self.mouse = Product.objects.create(
+            name='Mouse Bulk',
+            code='BULK2',
+            category=Product.ProductCategory.PERIPHERALS,
+            stock=Decimal('0'),
+            low_threshold=Decimal('1'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('20'),
+        )
+
+    def _row(self, product, movement_type, quantity, unit_price='10', day=None):
+        return {
+            'product': product.id,
+            'movement_type': movement_type,
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'date': (day or self.day).isoformat(),
+        }
+
+    def test_bulk_insert_applies_net_stock_and_rollups(self):
+        rows = [
+            self._row(self.console, Movement.MovementType.OUT, '5', '150'),
+            self._row(self.console, Movement.MovementType.IN, '10', '100'),
+            self._row(self.mouse, Movement.MovementType.IN, '7', '10'),
+            self._row(self.mouse, Movement.MovementType.OUT, '2', '20', self.day + timedelta(days=1)),
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        payload = response.json()
+        self.assertEqual(payload['created'], 4)
+        self.assertEqual(payload['errors'], [])
+        self.assertEqual(len(payload['ids']), 4)
+
+        self.console.refresh_from_db()
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.console.stock, Decimal('10'))
+        self.assertEqual(self.mouse.stock, Decimal('5'))
+        rollup = DailyMovementRollup.objects.get(
+            product=self.mouse, date=self.day + timedelta(days=1), movement_type=Movement.MovementType.OUT
+        )
+        self.assertEqual(rollup.quantity, Decimal('2'))
+        self.assertEqual(rollup.value, Decimal('40'))
+        self.assertEqual(rollup.cost, Decimal('20'))
+        self.assertEqual(
+            set(Movement.objects.filter(product=self.console).values_list('unit_cost', flat=True)), {Decimal('100')}
+        )
+
+    def test_atomic_mode_rejects_whole_batch(self):
+        rows = [
+            self._row(self.mouse, Movement.MovementType.IN, '3'),
+            self._row(self.mouse, Movement.MovementType.OUT, '4'),
+            self._row(self.console, Movement.MovementType.IN, '-1'),
+        ]
+        response = self.client.post(self.url, {'movements': rows}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [2])
+        self.assertEqual(Movement.objects.count(), 0)
+
+        response = self.client.post(self.url, {'movements': rows[:2]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['errors'][0]['index'], 1)
+        self.assertEqual(Movement.objects.count(), 0)
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.mouse.stock, Decimal('0'))
+
+    def test_best_effort_mode_keeps_valid_rows(self):
+        rows = [
+            self._row(self.mouse, Movement.MovementType.IN, '3'),
+            self._row(self.mouse, Movement.MovementType.OUT, '4'),
+            {**self._row(self.mouse, Movement.MovementType.IN, '1'), 'product': 999999},
+            self._row(self.mouse, Movement.MovementType.OUT, '2'),
+        ]
+        response = self.client.post(self.url, {'movements': rows, 'mode': 'best_effort'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        payload = response.json()
+        self.assertEqual(payload['created'], 2)
+        self.assertEqual([error['index'] for error in payload['errors']], [1, 2])
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.mouse.stock, Decimal('1'))
+
+    def _post_with_concurrent_sale(self, mode):
+        rows = [
+            self._row(self.console, Movement.MovementType.OUT, '5', '150'),
+            self._row(self.mouse, Movement.MovementType.IN, '7'),
+            self._row(self.mouse, Movement.MovementType.OUT, '2', '20'),
+        ]
+        project_stock = movements._project_stock
+
+        def project_then_sell(valid, products):
+            result = project_stock(valid, products)
+            # Otro escritor vende consolas entre la proyección y el UPDATE condicional.
+            Product.objects.filter(pk=self.console.pk).update(stock=Decimal('1'))
+            return result
+
+        with patch('services.movements._project_stock', project_then_sell):
+            return self.client.post(self.url, {'movements': rows, 'mode': mode}, format='json').json()
+
+    def test_best_effort_stock_conflict_only_rejects_that_product(self):
+        payload = self._post_with_concurrent_sale('best_effort')
+        self.assertEqual(payload['created'], 2)
+        self.assertEqual([error['index'] for error in payload['errors']], [0])
+
+        self.console.refresh_from_db()
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.console.stock, Decimal('1'))
+        self.assertEqual(self.mouse.stock, Decimal('5'))
+        self.assertFalse(Movement.objects.filter(product=self.console).exists())
+        self.assertFalse(DailyMovementRollup.objects.filter(product=self.console).exists())
+        self.assertEqual(Movement.objects.filter(product=self.mouse).count(), 2)
+
+    def test_atomic_stock_conflict_rejects_whole_batch(self):
+        payload = self._post_with_concurrent_sale('atomic')
+        self.assertEqual(payload['created'], 0)
+        self.assertEqual([error['index'] for error in payload['errors']], [0])
+        self.assertEqual(Movement.objects.count(), 0)
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.mouse.stock, Decimal('0'))
+
+    def _non_insert_queries(self, rows) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return sum(
+            1 for query in context.captured_queries if not query['sql'].startswith('INSERT INTO "inventory_movement"')
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        small = self._non_insert_queries([self._row(self.mouse, Movement.MovementType.IN, '1') for _ in range(10)])
+        large = self._non_insert_queries([self._row(self.mouse, Movement.MovementType.IN, '1') for _ in range(500)])
+        self.assertLessEqual(large, small)
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.mouse.stock, Decimal('510'))
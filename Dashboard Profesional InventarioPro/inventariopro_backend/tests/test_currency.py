@@ -1,27 +1,34 @@
 from __future__ import annotations
 
+import json
+import threading
+import time
+from datetime import datetime, timedelta
 from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 
 from services import currency
 
 
+@override_settings(CURRENCY_RECORD_HISTORY=False)
 class CurrencyServiceTests(SimpleTestCase):
     def setUp(self):
-        currency._CACHE['rate'] = None
-        currency._CACHE['timestamp'] = None
+        currency.clear_cached_rate()
 
-    @mock.patch('services.currency.requests.get')
-    def test_currency_client_returns_rate(self, mock_get):
+    @mock.patch('services.currency._get_session')
+    def test_currency_client_returns_rate(self, mock_session):
+        mock_get = mock_session.return_value.get
         mock_get.return_value.json.return_value = {'conversion_rates': {'MXN': 17.5678}}
         mock_get.return_value.raise_for_status.return_value = None
         rate = currency.get_usd_to_mxn_rate()
         self.assertEqual(rate, Decimal('17.5678'))
 
-    @mock.patch('services.currency.requests.get')
-    def test_currency_client_returns_cached_on_error(self, mock_get):
+    @mock.patch('services.currency._get_session')
+    def test_currency_client_returns_cached_on_error(self, mock_session):
+        mock_get = mock_session.return_value.get
         mock_get.return_value.json.return_value = {'conversion_rates': {'MXN': 18.1234}}
         mock_get.return_value.raise_for_status.return_value = None
         first_rate = currency.get_usd_to_mxn_rate()
@@ -30,3 +37,83 @@ class CurrencyServiceTests(SimpleTestCase):
         mock_get.side_effect = Exception('network error')
         cached_rate = currency.get_usd_to_mxn_rate()
         self.assertEqual(cached_rate, Decimal('18.1234'))
+
+    @mock.patch('services.currency._get_session')
+    def test_failure_without_cache_uses_fallback_and_backs_off(self, mock_session):
+        mock_get = mock_session.return_value.get
+        mock_get.side_effect = Exception('network error')
+        self.assertEqual(currency.get_usd_to_mxn_rate(), Decimal('18.0'))
+        self.assertEqual(currency.get_usd_to_mxn_rate(), Decimal('18.0'))
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class _StubRateHandler(BaseHTTPRequestHandler):
+    rate = 17.0
+    delay = 0.0
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        time.sleep(self.delay)
+        body = json.dumps({'conversion_rates': {'MXN': type(self).rate}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CURRENCY_RECORD_HISTORY=False)
+class CurrencyStubServerTests(SimpleTestCase):
+    def setUp(self):
+        handler = type('Handler', (_StubRateHandler,), {'rate': 17.0, 'delay': 0.0, 'requests_seen': 0})
+        self.handler = handler
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings_override = override_settings(
+            EXCHANGE_API_URL=f'http://127.0.0.1:{self.server.server_address[1]}', EXCHANGE_API_KEY='test'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        currency.clear_cached_rate()
+
+    def test_concurrent_cold_requests_share_one_fetch(self):
+        self.handler.delay = 0.2
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(currency.get_usd_to_mxn_rate())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [Decimal('17.0')] * 8)
+        self.assertEqual(self.handler.requests_seen, 1)
+
+    def test_stale_rate_is_served_while_refreshing_in_background(self):
+        currency.get_usd_to_mxn_rate()
+        self.handler.rate = 19.5
+        self.handler.delay = 0.5
+        # Se envejece la tasa más allá de su vigencia.
+        currency._CACHE['timestamp'] = datetime.utcnow() - timedelta(hours=2)
+        currency._shared_cache().delete(currency.RATE_CACHE_KEY)
+
+        started = time.perf_counter()
+        self.assertEqual(currency.get_usd_to_mxn_rate(), Decimal('17.0'))
+        self.assertLess(time.perf_counter() - started, 0.2)
+
+        currency._REFRESH_THREAD.join(timeout=5)
+        self.assertEqual(currency.get_usd_to_mxn_rate(), Decimal('19.5'))
+        self.assertEqual(self.handler.requests_seen, 2)
+
+    def test_rate_is_shared_between_processes_through_django_cache(self):
+        currency.get_usd_to_mxn_rate()
+        # Simula otro worker: caché del proceso vacía, caché compartida intacta.
+        currency._CACHE.update(rate=None, timestamp=None)
+        self.assertEqual(currency.get_usd_to_mxn_rate(), Decimal('17.0'))
+        self.assertEqual(self.handler.requests_seen, 1)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory.models import Movement, Product
+
+
+class DataVersionETagTests(TestCase):
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        rate_patcher.start()
+
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Producto ETag',
+            code='ETAG1',
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('2'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+
+    def _create_movement(self):
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('3'),
+            unit_price=Decimal('10'),
+            date=date(2024, 1, 5),
+        )
+
+    def test_unchanged_data_returns_304_with_one_query(self):
+        for url in (reverse('dashboard'), reverse('reports'), reverse('inventory-summary'), reverse('product-list')):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(first.status_code, 200)
+                etag = first['ETag']
+                self.assertTrue(etag.startswith('"'))
+                with self.assertNumQueries(1):
+                    second = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second['ETag'], etag)
+                self.assertEqual(second.content, b'')
+
+    def test_movement_write_changes_etag(self):
+        etag = self.client.get(reverse('dashboard'))['ETag']
+        self._create_movement()
+        response = self.client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_product_write_changes_etag(self):
+        etag = self.client.get(reverse('product-list'))['ETag']
+        self.client.patch(
+            reverse('product-detail', args=[self.product.id]), {'low_threshold': '5'}, format='json'
+        )
+        self.assertNotEqual(self.client.get(reverse('product-list'))['ETag'], etag)
+
+    def test_etag_depends_on_query_string(self):
+        base = self.client.get(reverse('reports'), {'from': '2024-01-01', 'to': '2024-01-31'})['ETag']
+        other = self.client.get(reverse('reports'), {'from': '2024-01-01', 'to': '2024-02-29'})['ETag']
+        self.assertNotEqual(base, other)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import ExchangeRate, Movement, Product
+from services import currency, reports
+
+
+class ExchangeRateReportTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Producto Tasa',
+            code='RATE1',
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('2'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('50'),
+            unit_price=Decimal('10'),
+            date=date(2024, 3, 1),
+        )
+        for day in (1, 2, 4):
+            Movement.objects.create(
+                product=self.product,
+                movement_type=Movement.MovementType.OUT,
+                quantity=Decimal('2'),
+                unit_price=Decimal('40'),
+                date=date(2024, 3, day),
+            )
+
+    def test_series_days_use_their_own_rate_without_network(self):
+        ExchangeRate.record(date(2024, 3, 1), Decimal('16'))
+        ExchangeRate.record(date(2024, 3, 4), Decimal('20'))
+
+        with patch('services.reports.get_usd_to_mxn_rate', side_effect=AssertionError('sin red')):
+            # Totales, serie con su tasa por día y la tasa al final del rango.
+            with self.assertNumQueries(3):
+                report = reports.get_range_report(date(2024, 3, 1), date(2024, 3, 31))
+
+        by_day = {item['date']: item for item in report['series']}
+        self.assertEqual(by_day['2024-03-01']['usd_rate'], Decimal('16.0000'))
+        # El 2 de marzo no tiene tasa propia: usa la última anterior.
+        self.assertEqual(by_day['2024-03-02']['usd_rate'], Decimal('16.0000'))
+        self.assertEqual(by_day['2024-03-04']['usd_rate'], Decimal('20.0000'))
+        self.assertEqual(by_day['2024-03-04']['ingresos_usd'], Decimal('4.00'))
+        self.assertEqual(report['ingresos_usd'], Decimal('14.00'))
+        self.assertEqual(report['usd_rate'], Decimal('20.0000'))
+
+    def test_days_before_history_use_current_rate(self):
+        ExchangeRate.record(date(2024, 3, 4), Decimal('20'))
+        with patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('16')) as current:
+            report = reports.get_range_report(date(2024, 3, 1), date(2024, 3, 31))
+        self.assertEqual(current.call_count, 1)
+        self.assertEqual([item['usd_rate'] for item in report['series']], [Decimal('16.0000')] * 2 + [Decimal('20.0000')])
+
+    def test_recording_a_rate_invalidates_cached_reports(self):
+        ExchangeRate.record(date(2024, 3, 1), Decimal('16'))
+        first = reports.get_cached_range_report(date(2024, 3, 1), date(2024, 3, 31))
+        self.assertFalse(ExchangeRate.record(date(2024, 3, 1), Decimal('16')))
+        self.assertTrue(ExchangeRate.record(date(2024, 3, 2), Decimal('32')))
+        second = reports.get_cached_range_report(date(2024, 3, 1), date(2024, 3, 31))
+        self.assertNotEqual(first['ingresos_usd'], second['ingresos_usd'])
+
+    def test_backfill_changes_report_etag(self):
+        ExchangeRate.record(date(2024, 3, 1), Decimal('16'))
+        params = {'from': '2024-03-01', 'to': '2024-03-31'}
+        first = self.client.get(reverse('reports'), params)
+        self.assertEqual(self.client.get(reverse('reports'), params, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        call_command(
+            'backfill_exchange_rates', '--rate', '32', '--start', '2024-03-02', '--end', '2024-03-04', stdout=StringIO()
+        )
+        second = self.client.get(reverse('reports'), params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertNotEqual(second.json()['ingresos_usd'], first.json()['ingresos_usd'])
+
+    def test_backfill_command_fills_only_missing_days(self):
+        ExchangeRate.record(date(2024, 3, 2), Decimal('17.5'))
+        call_command('backfill_exchange_rates', '--rate', '18.25', '--end', '2024-03-05', stdout=StringIO())
+        rates = dict(ExchangeRate.objects.values_list('date', 'rate'))
+        self.assertEqual(len(rates), 5)
+        self.assertEqual(rates[date(2024, 3, 2)], Decimal('17.5000'))
+        self.assertEqual(rates[date(2024, 3, 5)], Decimal('18.2500'))
+
+    def test_backfill_command_rejects_invalid_dates_and_rates(self):
+        for args in (
+            ('--rate', '18', '--start', '2024-02-30'),
+            ('--rate', '18', '--end', 'ayer'),
+            ('--rate', '0', '--end', '2024-03-05'),
+            ('--rate', '-17.5', '--end', '2024-03-05'),
+            ('--rate', 'NaN', '--end', '2024-03-05'),
+        ):
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                call_command('backfill_exchange_rates', *args, stdout=StringIO())
+        self.assertFalse(ExchangeRate.objects.exists())
+
+    def test_backfill_command_fetches_history_endpoint(self):
+        with patch('inventory.management.commands.backfill_exchange_rates.fetch_historical_rate') as fetch:
+            fetch.return_value = Decimal('17.1')
+            call_command(
+                'backfill_exchange_rates', '--start', '2024-03-01', '--end', '2024-03-02', stdout=StringIO()
+            )
+        self.assertEqual([call.args[0] for call in fetch.call_args_list], [date(2024, 3, 1), date(2024, 3, 2)])
+        self.assertIn('/history/USD/2024/3/1', currency._get_api_endpoint(date(2024, 3, 1)))
+
+    def test_currency_service_records_todays_rate(self):
+        currency._store(Decimal('17.8'))
+        self.addCleanup(currency.clear_cached_rate)
+        self.assertEqual(ExchangeRate.objects.get(date=timezone.localdate()).rate, Decimal('17.8000'))
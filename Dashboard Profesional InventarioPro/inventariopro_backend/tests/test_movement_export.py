@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import Movement, Product
+from services.exports import EXPORT_COLUMNS
+
+
+class MovementExportTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('movement-export')
+        self.day = date(2024, 6, 1)
+        self.product = Product.objects.create(
+            name='Audífonos, edición "Pro"',
+            code='EXP1',
+            category=Product.ProductCategory.PERIPHERALS,
+            stock=Decimal('0'),
+            low_threshold=Decimal('1'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('20'),
+        )
+        self.other = Product.objects.create(
+            name='Otro producto',
+            code='EXP2',
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('1'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('20'),
+        )
+        for offset in range(3):
+            Movement.objects.create(
+                product=self.product,
+                movement_type=Movement.MovementType.IN,
+                quantity=Decimal('2'),
+                unit_price=Decimal('10.50'),
+                date=self.day + timedelta(days=offset),
+            )
+        Movement.objects.create(
+            product=self.other,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('1'),
+            unit_price=Decimal('5'),
+            date=self.day,
+        )
+
+    def _content(self, response) -> str:
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export_streams_filtered_rows(self):
+        response = self.client.get(
+            self.url, {'product': self.product.id, 'start': (self.day + timedelta(days=1)).isoformat()}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual([row['date'] for row in rows], ['2024-06-03', '2024-06-02'])
+        self.assertEqual(rows[0]['product_name'], 'Audífonos, edición "Pro"')
+        self.assertEqual(Decimal(rows[0]['total']), Decimal('21.00'))
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url, {'output': 'ndjson', 'end': self.day.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual({line['product_code'] for line in lines}, {'EXP1', 'EXP2'})
+        self.assertEqual(lines[0]['quantity'], 1.0)
+
+    def test_empty_range_returns_header_only(self):
+        response = self.client.get(self.url, {'start': '2030-01-01'})
+        self.assertEqual(tuple(self._content(response).strip().split(',')), EXPORT_COLUMNS)
+
+    def test_invalid_filters_are_rejected_before_streaming(self):
+        self.assertEqual(self.client.get(self.url, {'start': 'ayer'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'output': 'xlsx'}).status_code, status.HTTP_400_BAD_REQUEST)
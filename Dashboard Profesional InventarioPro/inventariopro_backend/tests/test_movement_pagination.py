@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventory.models import Movement, Product
+
+
+class MovementKeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Producto Paginado',
+            code='PAGE1',
+            category=Product.ProductCategory.ACCESSORIES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('1'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('20'),
+        )
+        start = date(2024, 1, 1)
+        # Varios movimientos por día para ejercitar los empates en la fecha.
+        for offset in range(23):
+            Movement.objects.create(
+                product=cls.product,
+                movement_type=Movement.MovementType.IN,
+                quantity=Decimal('1'),
+                unit_price=Decimal('10'),
+                date=start + timedelta(days=offset // 4),
+            )
+        cls.expected_ids = list(Movement.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+    def test_walking_cursors_returns_every_row_once_in_order(self):
+        url = reverse('movement-list') + '?page_size=5'
+        seen: list[int] = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            payload = response.json()
+            seen.extend(item['id'] for item in payload['results'])
+            url = payload['next']
+            pages += 1
+        self.assertEqual(seen, self.expected_ids)
+        self.assertEqual(pages, 5)
+
+    def test_limit_alias_and_max_page_size(self):
+        response = self.client.get(reverse('movement-list'), {'limit': 3})
+        self.assertEqual(len(response.json()['results']), 3)
+        response = self.client.get(reverse('movement-list'), {'page_size': 100000})
+        self.assertEqual(len(response.json()['results']), len(self.expected_ids))
+        self.assertIsNone(response.json()['next'])
+
+    def test_deep_page_uses_no_count_or_offset(self):
+        first = self.client.get(reverse('movement-list'), {'page_size': 20}).json()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(first['next'])
+        self.assertEqual([item['id'] for item in response.json()['results']], self.expected_ids[20:])
+        for query in context.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('movement-list'), {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
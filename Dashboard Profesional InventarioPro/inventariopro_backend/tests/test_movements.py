@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from decimal import Decimal
 
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -92,3 +94,130 @@ class MovementTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.product.refresh_from_db()
         self.assertEqual(self.product.stock, Decimal('7'))
+
+    def test_out_movement_without_stock_is_rejected_by_the_write(self):
+        url = reverse('movement-list')
+        payload = {
+            'product': self.product.id,
+            'movement_type': Movement.MovementType.OUT,
+            'quantity': '1',
+            'unit_price': '14.00',
+            'date': timezone.now().date().isoformat(),
+        }
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('quantity', response.json())
+        self.assertFalse(Movement.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, Decimal('0'))
+
+    def test_moving_movement_to_another_product_checks_both_stocks(self):
+        other = Product.objects.create(name='Otro', code='TEST2', stock=Decimal('0'))
+        entry = Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('5'),
+            unit_price=Decimal('10'),
+            date=timezone.now().date(),
+        )
+        entry.product = other
+        entry.save()
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.product.stock, other.stock), (Decimal('0'), Decimal('5')))
+
+    def test_sale_with_stale_product_read_cannot_oversell(self):
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('3'),
+            unit_price=Decimal('10'),
+            date=timezone.now().date(),
+        )
+        stale_product = Product.objects.get(pk=self.product.pk)
+        # Otra venta concurrente consume el stock después de la lectura.
+        Product.objects.filter(pk=self.product.pk).update(stock=Decimal('1'))
+        sale = Movement(
+            product=stale_product,
+            movement_type=Movement.MovementType.OUT,
+            quantity=Decimal('3'),
+            unit_price=Decimal('20'),
+            date=timezone.now().date(),
+        )
+        with self.assertRaises(ValidationError):
+            sale.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, Decimal('1'))
+
+    def test_database_rejects_negative_stock(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Product.objects.filter(pk=self.product.pk).update(stock=Decimal('-1'))
+
+    def test_deleting_sold_entry_is_rejected(self):
+        entry = Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('5'),
+            unit_price=Decimal('10'),
+            date=timezone.now().date(),
+        )
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.OUT,
+            quantity=Decimal('4'),
+            unit_price=Decimal('20'),
+            date=timezone.now().date(),
+        )
+        with self.assertRaises(ValidationError):
+            entry.delete()
+        self.assertTrue(Movement.objects.filter(pk=entry.pk).exists())
+
+
+class MovementWriteQueryBudgetTests(APITestCase):
+    """Presupuesto fijo de consultas por escritura (con el rollup del día ya creado)."""
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Producto Budget', code='BUDGET1', stock=Decimal('0'))
+        self.today = timezone.now().date()
+        self.movement = Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('50'),
+            unit_price=Decimal('10'),
+            date=self.today,
+        )
+
+    def test_create_through_api(self):
+        payload = {
+            'product': self.product.id,
+            'movement_type': Movement.MovementType.IN,
+            'quantity': '2',
+            'unit_price': '10',
+            'date': self.today.isoformat(),
+        }
+        # Producto del serializer, savepoint, UPDATE de stock, INSERT, rollup, estadísticas, snapshots,
+        # versión, release.
+        with self.assertNumQueries(9):
+            response = self.client.post(reverse('movement-list'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update_same_day(self):
+        self.movement.quantity = Decimal('40')
+        # Savepoint, movimiento previo, UPDATE de stock, UPDATE del movimiento, rollup, estadísticas,
+        # snapshots, versión, release.
+        with self.assertNumQueries(9):
+            self.movement.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, Decimal('40'))
+
+    def test_rejected_out_rolls_back_after_one_update(self):
+        sale = Movement(
+            product=self.product,
+            movement_type=Movement.MovementType.OUT,
+            quantity=Decimal('51'),
+            unit_price=Decimal('20'),
+            date=self.today,
+        )
+        # Savepoint, UPDATE condicional sin filas, comprobación de existencia, rollback y release.
+        with self.assertNumQueries(5), self.assertRaises(ValidationError):
+            sale.save()
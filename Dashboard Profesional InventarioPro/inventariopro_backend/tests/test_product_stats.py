@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from inventory.models import Movement, Product, ProductStats
+
+STATS_FIELDS = ('total_in', 'total_out', 'revenue', 'last_movement_date', 'units_out_30d')
+
+
+class ProductStatsTests(APITestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.console = self._product('Consola Stats', 'STATS1')
+        self.mouse = self._product('Mouse Stats', 'STATS2')
+
+    def _product(self, name, code):
+        return Product.objects.create(
+            name=name,
+            code=code,
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('2'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+
+    def _move(self, product, movement_type, quantity, unit_price, days_ago=0):
+        return Movement.objects.create(
+            product=product,
+            movement_type=movement_type,
+            quantity=Decimal(quantity),
+            unit_price=Decimal(unit_price),
+            date=self.today - timedelta(days=days_ago),
+        )
+
+    def _stats(self):
+        return {
+            stats.product_id: tuple(getattr(stats, name) for name in STATS_FIELDS)
+            for stats in ProductStats.objects.all()
+        }
+
+    def test_incremental_stats_match_rebuild(self):
+        self._move(self.console, Movement.MovementType.IN, '20', '10', days_ago=60)
+        old_sale = self._move(self.console, Movement.MovementType.OUT, '4', '20', days_ago=45)
+        recent_sale = self._move(self.console, Movement.MovementType.OUT, '3', '25', days_ago=2)
+        self._move(self.mouse, Movement.MovementType.IN, '5', '10', days_ago=1)
+
+        recent_sale.quantity = Decimal('5')
+        recent_sale.save()
+        old_sale.product = self.mouse
+        old_sale.save()
+
+        stats = ProductStats.objects.get(product=self.console)
+        self.assertEqual(stats.total_in, Decimal('20'))
+        self.assertEqual(stats.total_out, Decimal('5'))
+        self.assertEqual(stats.revenue, Decimal('125'))
+        self.assertEqual(stats.units_out_30d, Decimal('5'))
+        self.assertEqual(stats.velocity_30d, Decimal('0.17'))
+
+        incremental = self._stats()
+        ProductStats.rebuild()
+        self.assertEqual(incremental, self._stats())
+
+    def test_delete_recomputes_last_movement_date(self):
+        self._move(self.console, Movement.MovementType.IN, '10', '10', days_ago=5)
+        latest = self._move(self.console, Movement.MovementType.OUT, '2', '20', days_ago=1)
+        self.assertEqual(ProductStats.objects.get(product=self.console).last_movement_date, latest.date)
+
+        latest.delete()
+        stats = ProductStats.objects.get(product=self.console)
+        self.assertEqual(stats.last_movement_date, self.today - timedelta(days=5))
+        self.assertEqual(stats.total_out, Decimal('0'))
+        self.assertEqual(stats.revenue, Decimal('0'))
+
+    def test_bulk_insert_updates_stats(self):
+        rows = [
+            {'product': self.console.id, 'movement_type': movement_type, 'quantity': quantity, 'unit_price': price,
+             'date': self.today.isoformat()}
+            for movement_type, quantity, price in (('IN', '8', '10'), ('OUT', '3', '30'))
+        ]
+        self.assertEqual(self.client.post(reverse('movement-bulk'), rows, format='json').status_code, 201)
+        stats = ProductStats.objects.get(product=self.console)
+        self.assertEqual((stats.total_in, stats.total_out, stats.revenue), (Decimal('8'), Decimal('3'), Decimal('90')))
+
+    def test_product_list_expands_stats_with_one_query(self):
+        self._move(self.console, Movement.MovementType.IN, '10', '10')
+        self._move(self.console, Movement.MovementType.OUT, '4', '20')
+
+        rows = self.client.get(reverse('product-list')).json()
+        self.assertNotIn('stats', rows[0])
+
+        with CaptureQueriesContext(connection) as captured:
+            rows = {row['code']: row for row in self.client.get(reverse('product-list'), {'expand': 'stats'}).json()}
+        self.assertEqual(len([query for query in captured if 'inventory_productstats' in query['sql']]), 1)
+        self.assertEqual(Decimal(str(rows['STATS1']['stats']['total_out'])), Decimal('4'))
+        self.assertEqual(rows['STATS1']['stats']['last_movement_date'], self.today.isoformat())
+        self.assertIsNone(rows['STATS2']['stats'])
+
+    def test_rebuild_command_and_window_refresh(self):
+        self._move(self.console, Movement.MovementType.IN, '10', '10', days_ago=40)
+        self._move(self.console, Movement.MovementType.OUT, '6', '20', days_ago=29)
+        ProductStats.objects.all().delete()
+
+        call_command('rebuild_product_stats', stdout=StringIO())
+        self.assertEqual(ProductStats.objects.get(product=self.console).units_out_30d, Decimal('6'))
+
+        # --windows-only recalcula la ventana desde el rollup sin tocar los totales.
+        ProductStats.objects.update(units_out_30d=Decimal('99'))
+        call_command('rebuild_product_stats', '--windows-only', stdout=StringIO())
+        stats = ProductStats.objects.get(product=self.console)
+        self.assertEqual((stats.units_out_30d, stats.window_end), (Decimal('6'), self.today))
@@ -1,4 +1,5 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.urls import reverse
 from rest_framework import status
@@ -110,3 +111,52 @@ class ProductAPITests(APITestCase):
             Product.ProductCategory.ACCESSORIES,
         }
         self.assertTrue(expected_categories.issubset(category_slugs))
+
+    def test_inventory_summary_without_products_is_one_aggregate(self):
+        Product.objects.filter(code='TST-PS5').update(stock=Decimal('3'))
+        # Versión de datos para el ETag + un solo GROUP BY por categoría.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('inventory-summary'), {'include_products': 'false'})
+        payload = response.json()
+        self.assertNotIn('products', payload)
+        self.assertEqual(payload['total_stock_units'], 43.0)
+        self.assertEqual(payload['inventory_value_mxn'], sum(item['inventory_value_mxn'] for item in payload['categories']))
+        consoles = next(item for item in payload['categories'] if item['category'] == Product.ProductCategory.CONSOLES)
+        self.assertEqual(consoles['products'], 1)
+        self.assertEqual(consoles['inventory_value_mxn'], 35400.0)
+
+    def test_inventory_summary_paginates_products(self):
+        url = reverse('inventory-summary')
+        first = self.client.get(url, {'products_page_size': 2}).json()
+        self.assertEqual(len(first['products']), 2)
+        self.assertIn('products_page=2', first['products_next'])
+
+        names = [item['name'] for item in first['products']]
+        page = 2
+        next_url = first['products_next']
+        while next_url:
+            payload = self.client.get(url, {'products_page_size': 2, 'products_page': page}).json()
+            names += [item['name'] for item in payload['products']]
+            next_url = payload['products_next']
+            page += 1
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(names), first['total_products'])
+
+    def test_patch_does_not_overwrite_concurrent_stock_changes(self):
+        product = Product.objects.get(code='TST-PS5')
+        url = reverse('product-detail', args=[product.id])
+        # La vista trabaja con la lectura previa; una venta cambia el stock antes del guardado.
+        Product.objects.filter(pk=product.id).update(stock=Decimal('7'))
+        with patch('inventory.views.ProductViewSet.get_object', return_value=product):
+            response = self.client.patch(url, {'suggested_price': '14999.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, Decimal('7'))
+
+    def test_negative_stock_is_rejected(self):
+        product = Product.objects.get(code='TST-PS5')
+        response = self.client.patch(
+            reverse('product-detail', args=[product.id]), {'stock': '-1'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('stock', response.json())
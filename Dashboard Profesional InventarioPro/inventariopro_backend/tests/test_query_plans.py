@@ -0,0 +1,187 @@
+"""
+Regresión de planes de consulta para los filtros calientes de movimientos.
+
+Ejecuta ``EXPLAIN QUERY PLAN`` sobre las consultas reales de los reportes y del
+listado de movimientos y falla si alguna recorre completa la tabla de
+movimientos o la del rollup diario en lugar de usar un índice. En el listado
+también falla si el orden ``-date, -id`` requiere un ordenamiento temporal.
+El conteo y el listado de bajo stock deben salir del índice parcial de productos.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.models import LOW_STOCK_CONDITION, Movement, Product
+from inventory.pagination import MovementKeysetPagination
+from services import reports
+
+HOT_TABLES = ('inventory_movement', 'inventory_dailymovementrollup')
+# Cualquier SCAN (también ``USING INDEX``: recorre el índice completo) cuenta como
+# barrido; solo un SEARCH acota las filas por índice.
+FULL_SCAN = re.compile(r'\bSCAN (%s)\b' % '|'.join(HOT_TABLES))
+# Excepción: la primera página sin filtros recorre el índice en orden y corta en el LIMIT.
+INDEX_WALK = re.compile(r'\bSCAN (%s) USING (?:COVERING )?INDEX\b' % '|'.join(HOT_TABLES))
+LIMIT = re.compile(r'\bLIMIT \d+\s*$')
+SORT_STEP = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY')
+
+
+class _QueryRecorder:
+    def __init__(self):
+        self.queries: list[tuple[str, tuple]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT') and any(table in sql for table in HOT_TABLES):
+            self.queries.append((sql, tuple(params or ())))
+        return execute(sql, params, many, context)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN es específico de SQLite')
+class MovementQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Producto Plan',
+            code='PLAN1',
+            category=Product.ProductCategory.COMPONENTS,
+            stock=Decimal('0'),
+            low_threshold=Decimal('1'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        cls.start = date(2024, 1, 1)
+        cls.end = cls.start + timedelta(days=30)
+        for offset in range(10):
+            Movement.objects.create(
+                product=cls.product,
+                movement_type=Movement.MovementType.IN if offset % 2 == 0 else Movement.MovementType.OUT,
+                quantity=Decimal('2') if offset % 2 == 0 else Decimal('1'),
+                unit_price=Decimal('12'),
+                date=cls.start + timedelta(days=offset),
+            )
+
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        rate_patcher.start()
+
+    def _full_scans(self, run, allow_sort: bool = True) -> list[str]:
+        recorder = _QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            run()
+        self.assertTrue(recorder.queries, 'No se capturaron consultas sobre movimientos')
+
+        offenders = []
+        with connection.cursor() as cursor:
+            for sql, params in recorder.queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+                bounded_walk = LIMIT.search(sql) and not SORT_STEP.search(plan)
+                scans = [
+                    line
+                    for line in plan.splitlines()
+                    if FULL_SCAN.search(line) and not (bounded_walk and INDEX_WALK.search(line))
+                ]
+                if scans or (not allow_sort and SORT_STEP.search(plan)):
+                    offenders.append(f'{sql}\n{plan}')
+        return offenders
+
+    def test_dashboard_metrics_use_indexes(self):
+        self.assertEqual(self._full_scans(lambda: reports.get_dashboard_metrics(self.start, self.end)), [])
+
+    def test_range_report_uses_indexes(self):
+        self.assertEqual(self._full_scans(lambda: reports.get_range_report(self.start, self.end)), [])
+
+    def test_product_range_report_uses_indexes(self):
+        self.assertEqual(
+            self._full_scans(lambda: reports.get_range_report(self.start, self.end, product_id=self.product.id)),
+            [],
+        )
+
+    def _cursor(self, last_date: date) -> str:
+        last_id = Movement.objects.filter(date=last_date).values_list('id', flat=True).first()
+        return MovementKeysetPagination().encode_cursor((last_date, last_id))
+
+    def test_movement_list_filters_use_indexes(self):
+        url = reverse('movement-list')
+        for params in (
+            {},
+            {'start': self.start.isoformat(), 'end': self.end.isoformat()},
+            {'product': self.product.id},
+            {'product': self.product.id, 'start': self.start.isoformat()},
+            {'cursor': self._cursor(self.start + timedelta(days=5))},
+            {'product': self.product.id, 'cursor': self._cursor(self.start + timedelta(days=5))},
+        ):
+            with self.subTest(params=params):
+                # El orden (-date, -id) debe salir del índice, sin ordenamiento temporal.
+                self.assertEqual(self._full_scans(lambda: self.client.get(url, params), allow_sort=False), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN es específico de SQLite')
+class LowStockQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(6):
+            Product.objects.create(
+                name=f'Producto Bajo {index}',
+                code=f'LOW{index}',
+                stock=Decimal(index),
+                low_threshold=Decimal('2'),
+            )
+
+    def _low_stock_plans(self, run) -> list[str]:
+        queries = []
+
+        def recorder(execute, sql, params, many, context):
+            if '"stock" <= ' in sql:
+                queries.append((sql, tuple(params or ())))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(recorder):
+            result = run()
+        self.assertTrue(queries, 'No se capturaron consultas de bajo stock')
+        with connection.cursor() as cursor:
+            plans = []
+            for sql, params in queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plans.append('\n'.join(str(row[-1]) for row in cursor.fetchall()))
+        return result, plans
+
+    def test_low_stock_count_and_list_use_partial_index(self):
+        with patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00')):
+            metrics, plans = self._low_stock_plans(lambda: reports.get_dashboard_metrics())
+        self.assertEqual(metrics['low_stock_count'], 3)
+        response, list_plans = self._low_stock_plans(
+            lambda: self.client.get(reverse('product-list'), {'low_stock': '1'})
+        )
+        self.assertEqual([row['code'] for row in response.json()], ['LOW0', 'LOW1', 'LOW2'])
+
+        for plan in plans + list_plans:
+            self.assertIn('product_low_stock_idx', plan)
+            # El orden por nombre también sale del índice.
+            self.assertNotRegex(plan, SORT_STEP)
+
+    def test_index_follows_stock_and_threshold_writes(self):
+        product = Product.objects.get(code='LOW5')
+        Movement.objects.create(
+            product=product,
+            movement_type=Movement.MovementType.OUT,
+            quantity=Decimal('4'),
+            unit_price=Decimal('10'),
+            date=date(2024, 1, 1),
+        )
+        edited = Product.objects.get(code='LOW3')
+        response = self.client.patch(
+            reverse('product-detail', args=[edited.id]), {'low_threshold': '5'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        codes = list(Product.objects.filter(LOW_STOCK_CONDITION).values_list('code', flat=True))
+        self.assertEqual(codes, ['LOW0', 'LOW1', 'LOW2', 'LOW3', 'LOW5'])
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from inventory import renderers
+from inventory.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    'total': Decimal('1234.50'),
+    'rate': Decimal('18.0000'),
+    'day': date(2024, 3, 10),
+    'created_at': datetime(2024, 3, 10, 12, 30, tzinfo=timezone.utc),
+    'series': [{'date': '2024-03-10', 'ingresos_mxn': Decimal('10.25')}],
+    'name': 'Consola edición ñ',
+    'count': 3,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def _assert_matches_drf(self):
+        rendered = FastJSONRenderer().render(PAYLOAD, 'application/json')
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(PAYLOAD, 'application/json')))
+        decoded = json.loads(rendered)
+        self.assertEqual(decoded['total'], 1234.5)
+        self.assertEqual(decoded['day'], '2024-03-10')
+        self.assertEqual(decoded['created_at'], '2024-03-10T12:30:00Z')
+        self.assertIn('ñ', rendered.decode())
+
+    def test_stdlib_backend_matches_drf_output(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self._assert_matches_drf()
+
+    @skipUnless(renderers.orjson is not None, 'orjson no está instalado')
+    def test_orjson_backend_matches_drf_output(self):
+        self._assert_matches_drf()
+
+    def test_indent_uses_drf_path(self):
+        rendered = FastJSONRenderer().render({'a': Decimal('1')}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1.0\n}')
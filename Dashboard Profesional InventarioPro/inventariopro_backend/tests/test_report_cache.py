@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory.models import ExchangeRate, Movement, Product
+from services import report_cache, reports
+
+
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        self.rate = rate_patcher.start()
+
+        self.product = Product.objects.create(
+            name='Producto Caché',
+            code='CACHE1',
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('2'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        self._create(Movement.MovementType.IN, '20', '10', date(2024, 3, 5))
+        self._create(Movement.MovementType.OUT, '5', '20', date(2024, 3, 6))
+
+    def _create(self, movement_type, quantity, unit_price, day):
+        return Movement.objects.create(
+            product=self.product,
+            movement_type=movement_type,
+            quantity=Decimal(quantity),
+            unit_price=Decimal(unit_price),
+            date=day,
+        )
+
+    def test_repeated_report_is_served_from_cache(self):
+        first = reports.get_cached_range_report(date(2024, 3, 1), date(2024, 3, 31))
+        with self.assertNumQueries(0):
+            second = reports.get_cached_range_report(date(2024, 3, 1), date(2024, 3, 31))
+        self.assertEqual(first, second)
+        self.assertEqual(report_cache.get_stats()['hits'], 1)
+        self.assertEqual(report_cache.get_stats()['misses'], 1)
+
+    def test_movement_write_invalidates_only_touched_months(self):
+        march = (date(2024, 3, 1), date(2024, 3, 31))
+        january = (date(2024, 1, 1), date(2024, 1, 31))
+        reports.get_cached_range_report(*march)
+        reports.get_cached_range_report(*january)
+
+        self._create(Movement.MovementType.OUT, '2', '25', date(2024, 3, 20))
+        with self.assertNumQueries(0):
+            reports.get_cached_range_report(*january)
+        refreshed = reports.get_cached_range_report(*march)
+        self.assertEqual(refreshed['ingresos_mxn'], Decimal('150.00'))
+
+    def test_product_write_and_rate_change_miss_the_cache(self):
+        start, end = date(2024, 3, 1), date(2024, 3, 31)
+        reports.get_cached_dashboard_metrics(start, end)
+
+        self.product.avg_cost = Decimal('12')
+        self.product.save(update_fields=['avg_cost'])
+        metrics = reports.get_cached_dashboard_metrics(start, end)
+        # El costo de las ventas ya registradas no cambia; el valor del inventario sí.
+        self.assertEqual(metrics['egresos_mxn'], Decimal('50.00'))
+        self.assertEqual(metrics['inventory_value_mxn'], Decimal('180.00'))
+
+        self.rate.return_value = Decimal('20.00')
+        self.assertEqual(reports.get_cached_dashboard_metrics(start, end)['usd_rate'], Decimal('20.0000'))
+        self.assertEqual(report_cache.get_stats()['hits'], 0)
+
+    def test_live_rate_change_misses_ranges_without_rate_history(self):
+        march = (date(2024, 3, 1), date(2024, 3, 31))
+        self.assertEqual(reports.get_cached_range_report(*march)['ingresos_usd'], Decimal('5.56'))
+        self.rate.return_value = Decimal('20.00')
+        self.assertEqual(reports.get_cached_range_report(*march)['ingresos_usd'], Decimal('5.00'))
+
+        # Con historial desde el inicio del rango la tasa actual ya no entra en la llave.
+        ExchangeRate.record(date(2024, 3, 1), Decimal('16'))
+        self.assertEqual(reports.get_cached_range_report(*march)['ingresos_usd'], Decimal('6.25'))
+        self.rate.return_value = Decimal('22.00')
+        with self.assertNumQueries(0):
+            self.assertEqual(reports.get_cached_range_report(*march)['ingresos_usd'], Decimal('6.25'))
+
+    def test_stats_endpoint(self):
+        client = APIClient()
+        params = {'from': '2024-03-01', 'to': '2024-03-31'}
+        client.get(reverse('reports'), params)
+        client.get(reverse('reports'), params)
+        stats = client.get(reverse('report-cache-stats')).json()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+        self.assertEqual(client.delete(reverse('report-cache-stats')).status_code, 204)
+        self.assertEqual(client.get(reverse('report-cache-stats')).json()['hits'], 0)
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            file_cache = {
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': location,
+                }
+            }
+            with override_settings(CACHES=file_cache):
+                start, end = date(2024, 3, 1), date(2024, 3, 31)
+                reports.get_cached_range_report(start, end)
+                with self.assertNumQueries(0):
+                    reports.get_cached_range_report(start, end)
+                self._create(Movement.MovementType.OUT, '1', '20', date(2024, 3, 7))
+                self.assertEqual(reports.get_cached_range_report(start, end)['ingresos_mxn'], Decimal('120.00'))
+                self.assertEqual(report_cache.get_stats()['backend'], 'FileBasedCache')
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import patch
 
@@ -9,7 +9,7 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 
-from inventory.models import Movement, Product
+from inventory.models import ExchangeRate, Movement, Product
 from services import reports
 
 
@@ -138,3 +138,279 @@ class ReportEndpointsTests(TestCase):
         payload = response.json()
         self.assertIn('series', payload)
         self.assertGreaterEqual(len(payload['series']), 1)
+
+
+class DashboardQueryBudgetTests(TestCase):
+    """Presupuesto de consultas: una pasada sobre movimientos, otra sobre productos y el
+    conteo de bajo stock sobre su índice parcial."""
+
+    DASHBOARD_QUERY_BUDGET = 3
+
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        rate_patcher.start()
+
+        self.product = Product.objects.create(
+            name='Producto Presupuesto',
+            code='BUD1',
+            category=Product.ProductCategory.CONSOLES,
+            stock=Decimal('0'),
+            low_threshold=Decimal('8'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        today = timezone.now().date()
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('10'),
+            unit_price=Decimal('10'),
+            date=today - timedelta(days=1),
+        )
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.OUT,
+            quantity=Decimal('4'),
+            unit_price=Decimal('20'),
+            date=today,
+        )
+
+    def test_dashboard_metrics_query_budget(self):
+        with self.assertNumQueries(self.DASHBOARD_QUERY_BUDGET):
+            metrics = reports.get_dashboard_metrics()
+        self.assertEqual(metrics['ingresos_mxn'], Decimal('80.00'))
+        self.assertEqual(metrics['egresos_mxn'], Decimal('40.00'))
+        self.assertEqual(metrics['balance_mxn'], Decimal('40.00'))
+        self.assertEqual(metrics['purchases_mxn'], Decimal('100.00'))
+        self.assertEqual(metrics['profit_margin'], Decimal('100.00'))
+        self.assertEqual(metrics['low_stock_count'], 1)
+        self.assertEqual(metrics['product_count'], 1)
+        self.assertEqual(metrics['total_stock_units'], Decimal('6.00'))
+        self.assertEqual(metrics['inventory_value_mxn'], Decimal('60.00'))
+
+    def test_dashboard_endpoint_query_budget(self):
+        # Más la lectura de InventoryDataVersion para el ETag.
+        with self.assertNumQueries(self.DASHBOARD_QUERY_BUDGET + 1):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+
+class BatchRangeReportTests(TestCase):
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        rate_patcher.start()
+
+        self.today = timezone.now().date()
+        self.products = []
+        categories = [
+            Product.ProductCategory.PERIPHERALS,
+            Product.ProductCategory.PERIPHERALS,
+            Product.ProductCategory.CONSOLES,
+        ]
+        for index, category in enumerate(categories):
+            product = Product.objects.create(
+                name=f'Producto Lote {index}',
+                code=f'BAT{index}',
+                category=category,
+                stock=Decimal('0'),
+                avg_cost=Decimal('10') + index,
+                suggested_price=Decimal('15'),
+            )
+            self.products.append(product)
+        # El último producto no tiene movimientos en el rango.
+        for offset, product in enumerate(self.products[:2]):
+            Movement.objects.create(
+                product=product,
+                movement_type=Movement.MovementType.IN,
+                quantity=Decimal('20'),
+                unit_price=Decimal('10'),
+                date=self.today - timedelta(days=5),
+            )
+            for day in range(3):
+                Movement.objects.create(
+                    product=product,
+                    movement_type=Movement.MovementType.OUT,
+                    quantity=Decimal('2') + offset,
+                    unit_price=Decimal('19.99'),
+                    date=self.today - timedelta(days=day),
+                )
+        self.start = self.today - timedelta(days=7)
+
+    def test_batch_matches_single_product_reports(self):
+        ids = [product.id for product in self.products]
+        batch = reports.get_batch_range_report(self.start, self.today, product_ids=ids)
+
+        self.assertEqual([entry['product']['id'] for entry in batch['products']], ids)
+        for entry in batch['products']:
+            single = reports.get_range_report(self.start, self.today, product_id=entry['product']['id'])
+            for key in ('ingresos_mxn', 'egresos_mxn', 'balance_mxn', 'ingresos_usd', 'egresos_usd', 'series'):
+                self.assertEqual(entry[key], single[key], key)
+        self.assertEqual(batch['products'][2]['series'], [])
+        self.assertEqual(batch['products'][2]['ingresos_mxn'], Decimal('0.00'))
+
+    def test_batch_query_count_does_not_grow_with_products(self):
+        # Productos, la consulta agrupada por producto y día, y la tasa al cierre.
+        with self.assertNumQueries(3):
+            reports.get_batch_range_report(self.start, self.today, product_ids=[self.products[0].id])
+        with self.assertNumQueries(3):
+            reports.get_batch_range_report(self.start, self.today, categories=['peripherals', 'consoles'])
+
+    def test_batch_endpoint_combines_ids_and_categories(self):
+        response = self.client.get(
+            reverse('reports-batch'),
+            {
+                'from': self.start.isoformat(),
+                'to': self.today.isoformat(),
+                'products': str(self.products[0].id),
+                'categories': 'consoles',
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        returned = [entry['product']['code'] for entry in response.json()['products']]
+        self.assertEqual(returned, ['BAT0', 'BAT2'])
+
+    def test_batch_endpoint_rejects_invalid_selection(self):
+        url = reverse('reports-batch')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'products': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'categories': 'consoles,unknown'}).status_code, 400)
+
+
+class SeriesGranularityTests(TestCase):
+    def setUp(self):
+        rate_patcher = patch('services.reports.get_usd_to_mxn_rate', return_value=Decimal('18.00'))
+        self.addCleanup(rate_patcher.stop)
+        rate_patcher.start()
+
+        self.product = Product.objects.create(
+            name='Producto Serie',
+            code='SER1',
+            category=Product.ProductCategory.COMPONENTS,
+            stock=Decimal('0'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        Movement.objects.create(
+            product=self.product,
+            movement_type=Movement.MovementType.IN,
+            quantity=Decimal('500'),
+            unit_price=Decimal('10'),
+            date=date(2024, 1, 2),
+        )
+        for offset in range(0, 80, 3):
+            Movement.objects.create(
+                product=self.product,
+                movement_type=Movement.MovementType.OUT,
+                quantity=Decimal('2'),
+                unit_price=Decimal('36'),
+                date=date(2024, 1, 10) + timedelta(days=offset),
+            )
+        # Enero queda sin historial (tasa actual, 18); desde febrero se usa 20.
+        ExchangeRate.record(date(2024, 2, 1), Decimal('20'))
+        self.start, self.end = date(2024, 1, 1), date(2024, 3, 31)
+
+    def test_auto_granularity_caps_points(self):
+        self.assertEqual(reports.resolve_granularity(date(2024, 1, 1), date(2024, 1, 31), 'auto'), 'day')
+        self.assertEqual(reports.resolve_granularity(date(2024, 1, 1), date(2024, 12, 31), 'auto'), 'week')
+        self.assertEqual(reports.resolve_granularity(date(2020, 1, 1), date(2024, 12, 31), 'auto'), 'month')
+        self.assertEqual(reports.resolve_granularity(date(2000, 1, 1), date(2024, 12, 31), 'auto'), 'quarter')
+        with self.settings(REPORT_MAX_SERIES_POINTS=13):
+            self.assertEqual(reports.resolve_granularity(date(2024, 1, 1), date(2024, 3, 31), 'auto'), 'week')
+        with self.settings(REPORT_MAX_SERIES_POINTS=3):
+            self.assertEqual(reports.resolve_granularity(date(2024, 1, 1), date(2024, 3, 31), 'auto'), 'month')
+
+    def test_month_buckets_keep_totals_and_per_day_rates(self):
+        daily = reports.get_range_report(self.start, self.end)
+        with self.assertNumQueries(3):
+            monthly = reports.get_range_report(self.start, self.end, granularity='month')
+
+        self.assertEqual(monthly['granularity'], 'month')
+        self.assertEqual([point['date'] for point in monthly['series']], ['2024-01-01', '2024-02-01', '2024-03-01'])
+        for key in ('ingresos_mxn', 'egresos_mxn', 'balance_mxn'):
+            self.assertEqual(monthly[key], daily[key])
+            self.assertEqual(sum(point[key] for point in monthly['series']), daily[key])
+        for key in ('ingresos_usd', 'egresos_usd'):
+            self.assertAlmostEqual(monthly[key], daily[key], delta=Decimal('0.05'))
+
+        january, february, _ = monthly['series']
+        # 8 ventas en enero a 72 MXN convertidas con la tasa actual; febrero con la del historial.
+        self.assertEqual(january['ingresos_mxn'], Decimal('576.00'))
+        self.assertEqual(january['ingresos_usd'], Decimal('32.00'))
+        self.assertEqual(january['usd_rate'], Decimal('18.0000'))
+        self.assertEqual(february['usd_rate'], Decimal('20.0000'))
+
+    def test_granularity_endpoint(self):
+        params = {'from': self.start.isoformat(), 'to': self.end.isoformat()}
+        response = self.client.get(reverse('reports'), {**params, 'granularity': 'week'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['granularity'], 'week')
+        self.assertEqual(len(response.json()['series']), 13)
+        batch = self.client.get(reverse('reports-batch'), {**params, 'granularity': 'auto', 'categories': 'components'})
+        self.assertEqual(batch.json()['granularity'], 'day')
+        self.assertEqual(self.client.get(reverse('reports'), {**params, 'granularity': 'hour'}).status_code, 400)
+
+
+class TopProductsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        # (código, costo promedio, unidades vendidas, precio de venta)
+        for code, avg_cost, units, price in (
+            ('TOP-A', '10', '5', '30'),  # ingresos 150, margen 100
+            ('TOP-B', '50', '2', '60'),  # ingresos 120, margen 20
+            ('TOP-C', '5', '20', '6'),  # ingresos 120, margen 20, más unidades
+            ('TOP-D', '1', '1', '2'),  # ingresos 2, margen 1
+        ):
+            product = Product.objects.create(
+                name=f'Producto {code}',
+                code=code,
+                stock=Decimal('100'),
+                avg_cost=Decimal(avg_cost),
+                suggested_price=Decimal(price),
+            )
+            Movement.objects.create(
+                product=product,
+                movement_type=Movement.MovementType.OUT,
+                quantity=Decimal(units),
+                unit_price=Decimal(price),
+                date=self.today,
+            )
+        # Sin ventas en el rango: no aparece en el ranking.
+        Product.objects.create(name='Producto sin ventas', code='TOP-E', stock=Decimal('1'))
+        self.start = self.today - timedelta(days=7)
+
+    @staticmethod
+    def codes(entries):
+        return [entry['product']['code'] for entry in entries]
+
+    def test_ranks_top_and_bottom_with_one_query_each(self):
+        with self.assertNumQueries(2):
+            ranking = reports.get_top_products(self.start, self.today, metric='ingresos', limit=2)
+        self.assertEqual(self.codes(ranking['top']), ['TOP-A', 'TOP-B'])
+        self.assertEqual(self.codes(ranking['bottom']), ['TOP-D', 'TOP-B'])
+
+        best = ranking['top'][0]
+        self.assertEqual(best['units'], Decimal('5.00'))
+        self.assertEqual(best['ingresos_mxn'], Decimal('150.00'))
+        self.assertEqual(best['egresos_mxn'], Decimal('50.00'))
+        self.assertEqual(best['margin_mxn'], Decimal('100.00'))
+        self.assertEqual(best['margin_pct'], Decimal('200.00'))
+
+    def test_other_metrics(self):
+        self.assertEqual(self.codes(reports.get_top_products(self.start, self.today, 'units', 1)['top']), ['TOP-C'])
+        margin = reports.get_top_products(self.start, self.today, 'margin', 4)
+        self.assertEqual(self.codes(margin['top']), ['TOP-A', 'TOP-B', 'TOP-C', 'TOP-D'])
+        self.assertEqual(self.codes(reports.get_top_products(self.start, self.today, 'egresos', 1)['top']), ['TOP-B'])
+
+    def test_endpoint_validates_and_caches_per_range(self):
+        url = reverse('reports-top-products')
+        params = {'from': self.start.isoformat(), 'to': self.today.isoformat(), 'limit': 1}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.codes(response.json()['top']), ['TOP-A'])
+        # Segunda vez: solo la lectura de la versión para el ETag y la caché.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, params).json(), response.json())
+        self.assertEqual(self.client.get(url, {'metric': 'stock'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 1000}).json()['limit'], 100)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from inventory.models import DailyMovementRollup, Movement, Product
+
+
+class SeedInventoryCommandTests(TestCase):
+    def _seed(self, **options) -> dict:
+        call_command('seed_inventory', stdout=StringIO(), **options)
+        return {
+            'stock': dict(Product.objects.values_list('code', 'stock')),
+            'movements': list(
+                Movement.objects.order_by('id').values_list(
+                    'product__code', 'movement_type', 'quantity', 'unit_price', 'date'
+                )
+            ),
+            'rollups': set(
+                DailyMovementRollup.objects.values_list('product__code', 'date', 'movement_type', 'quantity', 'value')
+            ),
+        }
+
+    def test_bulk_mode_matches_row_by_row_mode(self):
+        classic = self._seed(movements=150)
+        bulk = self._seed(movements=150, bulk=True, batch_size=40)
+        self.assertEqual(len(bulk['movements']), 150)
+        self.assertEqual(classic, bulk)
+
+    def test_products_option_synthesizes_large_catalogs(self):
+        self._seed(movements=300, products=60, bulk=True, batch_size=100)
+        self.assertEqual(Product.objects.count(), 60)
+        self.assertEqual(Product.objects.values('code').distinct().count(), 60)
+        self.assertFalse(Product.objects.filter(stock__lt=0).exists())
+        self.assertEqual(Movement.objects.count(), 300)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from inventory.models import Movement, Product
+from inventory.serializers import MovementSerializer
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Teclado Sparse',
+            code='SPARSE1',
+            category=Product.ProductCategory.PERIPHERALS,
+            stock=Decimal('0'),
+            low_threshold=Decimal('4'),
+            avg_cost=Decimal('799.90'),
+            suggested_price=Decimal('1099.00'),
+        )
+        for quantity in ('3', '2.50'):
+            Movement.objects.create(
+                product=self.product,
+                movement_type=Movement.MovementType.IN,
+                quantity=Decimal(quantity),
+                unit_price=Decimal('812.35'),
+                date=date(2024, 2, 1),
+                note='Compra',
+            )
+
+    def _serializer_output(self, query: str) -> list[dict]:
+        request = Request(APIRequestFactory().get(f'/api/movements/{query}'))
+        queryset = Movement.objects.select_related('product').order_by('-date', '-id')
+        return MovementSerializer(queryset, many=True, context={'request': request}).data
+
+    def test_fast_path_matches_serializer_output(self):
+        for query in ('', '?expand=product', '?fields=id,quantity,created_at', '?fields=id,product_detail&expand=product'):
+            with self.subTest(query=query):
+                response = self.client.get(reverse('movement-list') + query)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                expected = json.loads(JSONRenderer().render(self._serializer_output(query)))
+                self.assertEqual(response.json()['results'], expected)
+
+    def test_product_detail_only_with_expand(self):
+        rows = self.client.get(reverse('movement-list')).json()['results']
+        self.assertNotIn('product_detail', rows[0])
+        rows = self.client.get(reverse('movement-list'), {'expand': 'product'}).json()['results']
+        self.assertEqual(rows[0]['product_detail']['code'], 'SPARSE1')
+        self.assertTrue(rows[0]['product_detail']['is_low_stock'] is False)
+
+    def test_product_fields_param(self):
+        response = self.client.get(reverse('product-list'), {'fields': 'id,name,is_low_stock'})
+        self.assertEqual(set(response.json()[0]), {'id', 'name', 'is_low_stock'})
+        response = self.client.get(reverse('product-detail', args=[self.product.id]), {'fields': 'code'})
+        self.assertEqual(response.json(), {'code': 'SPARSE1'})
+
+    def test_fields_param_does_not_skip_write_validation(self):
+        response = self.client.post(
+            reverse('product-list') + '?fields=id',
+            {'name': 'Sin código'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('code', response.json())
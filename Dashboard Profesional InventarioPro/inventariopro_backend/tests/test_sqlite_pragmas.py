@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from inventory.sqlite import configure_connection, get_pragmas
+
+
+class _Wrapper(SimpleNamespace):
+    """Conexión mínima con la interfaz que usa el receptor (``vendor`` y ``cursor``)."""
+
+    def cursor(self):
+        return _Cursor(self.raw)
+
+
+class _Cursor:
+    def __init__(self, raw):
+        self.raw = raw
+
+    def __enter__(self):
+        return self.raw.cursor()
+
+    def __exit__(self, *exc):
+        return False
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    databases = {'default'}
+
+    def _configured(self, path):
+        raw = sqlite3.connect(path)
+        self.addCleanup(raw.close)
+        configure_connection(sender=None, connection=_Wrapper(vendor='sqlite', raw=raw))
+        return raw
+
+    def test_new_connections_get_the_profile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            raw = self._configured(str(Path(tmpdir) / 'pragmas.sqlite3'))
+            read = lambda name: raw.execute(f'PRAGMA {name}').fetchone()[0]  # noqa: E731
+            self.assertEqual(read('journal_mode'), 'wal')
+            self.assertEqual(read('synchronous'), 1)  # NORMAL
+            self.assertEqual(read('busy_timeout'), 10000)
+            self.assertEqual(read('cache_size'), -65536)
+            self.assertEqual(read('temp_store'), 2)  # MEMORY
+            raw.close()
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': '250', 'mmap_size': ''})
+    def test_values_come_from_settings_and_blank_skips(self):
+        self.assertEqual(get_pragmas(), {'busy_timeout': '250'})
+
+    @override_settings(SQLITE_TUNING=False)
+    def test_tuning_can_be_disabled(self):
+        self.assertEqual(get_pragmas(), {})
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'wal; DROP TABLE x'})
+    def test_rejects_unsafe_values(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_pragmas()
+
+    def test_django_connection_uses_the_profile(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 10000)
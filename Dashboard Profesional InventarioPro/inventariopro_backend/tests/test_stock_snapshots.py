@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import Movement, Product, StockSnapshot
+from services.stock import products_as_of, take_stock_snapshots
+
+
+class StockSnapshotTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Producto Snapshot',
+            code='SNAP1',
+            category=Product.ProductCategory.COMPONENTS,
+            stock=Decimal('0'),
+            low_threshold=Decimal('5'),
+            avg_cost=Decimal('10'),
+            suggested_price=Decimal('15'),
+        )
+        self.today = timezone.localdate()
+        # Día -10: +20, día -6: -5, día -3: +8, día -1: -4  → stock final 19.
+        for days_ago, movement_type, quantity in (
+            (10, Movement.MovementType.IN, '20'),
+            (6, Movement.MovementType.OUT, '5'),
+            (3, Movement.MovementType.IN, '8'),
+            (1, Movement.MovementType.OUT, '4'),
+        ):
+            self._move(days_ago, movement_type, quantity)
+
+    def _move(self, days_ago, movement_type, quantity):
+        return Movement.objects.create(
+            product=self.product,
+            movement_type=movement_type,
+            quantity=Decimal(quantity),
+            unit_price=Decimal('10'),
+            date=self.today - timedelta(days=days_ago),
+        )
+
+    def _replayed_stock(self, as_of):
+        stock = Decimal('0')
+        for movement in Movement.objects.filter(product=self.product, date__lte=as_of):
+            sign = 1 if movement.movement_type == Movement.MovementType.IN else -1
+            stock += sign * movement.quantity
+        return stock
+
+    def _stock_as_of(self, as_of):
+        return products_as_of(as_of).get(pk=self.product.pk).stock_as_of
+
+    def test_take_snapshots_stores_stock_and_value_at_close_of_day(self):
+        day = self.today - timedelta(days=5)
+        self.assertEqual(take_stock_snapshots(day), 1)
+        snapshot = StockSnapshot.objects.get(product=self.product, date=day)
+        self.assertEqual(snapshot.stock, Decimal('15'))
+        self.assertEqual(snapshot.value, Decimal('150.00'))
+
+        # Repetir el mismo día reemplaza el snapshot en lugar de duplicarlo.
+        take_stock_snapshots(day)
+        self.assertEqual(StockSnapshot.objects.filter(date=day).count(), 1)
+
+    def test_stock_as_of_matches_full_replay_with_and_without_snapshots(self):
+        days = [self.today - timedelta(days=n) for n in range(12, -1, -1)]
+        for as_of in days:
+            self.assertEqual(self._stock_as_of(as_of), self._replayed_stock(as_of), as_of)
+
+        take_stock_snapshots(self.today - timedelta(days=8))
+        take_stock_snapshots(self.today - timedelta(days=4))
+        for as_of in days:
+            self.assertEqual(self._stock_as_of(as_of), self._replayed_stock(as_of), as_of)
+
+    def test_backdated_movement_discards_later_snapshots(self):
+        for days_ago in (8, 4, 2):
+            take_stock_snapshots(self.today - timedelta(days=days_ago))
+
+        self._move(5, Movement.MovementType.IN, '3')
+        self.assertEqual(
+            list(StockSnapshot.objects.values_list('date', flat=True)),
+            [self.today - timedelta(days=8)],
+        )
+        self.assertEqual(self._stock_as_of(self.today - timedelta(days=2)), Decimal('26'))
+
+    def test_inventory_endpoint_accepts_as_of(self):
+        as_of = self.today - timedelta(days=5)
+        take_stock_snapshots(self.today - timedelta(days=8))
+        response = self.client.get(reverse('inventory-summary'), {'as_of': as_of.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['as_of'], as_of.isoformat())
+        self.assertEqual(Decimal(str(data['total_stock_units'])), Decimal('15'))
+        self.assertEqual(Decimal(str(data['products'][0]['stock'])), Decimal('15'))
+
+        current = self.client.get(reverse('inventory-summary')).json()
+        self.assertIsNone(current['as_of'])
+        self.assertEqual(Decimal(str(current['total_stock_units'])), Decimal('19'))
+
+    def test_inventory_endpoint_rejects_invalid_as_of(self):
+        response = self.client.get(reverse('inventory-summary'), {'as_of': '2024-13-40'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_command(self):
+        out = StringIO()
+        call_command('snapshot_stock', stdout=out)
+        self.assertTrue(StockSnapshot.objects.filter(date=self.today - timedelta(days=1)).exists())
+        self.assertIn('1 snapshots', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('snapshot_stock', '--date', 'ayer', stdout=StringIO())
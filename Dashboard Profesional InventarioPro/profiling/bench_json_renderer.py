@@ -0,0 +1,124 @@
+"""
+Compara el render de respuestas grandes con ``normalize_payload`` + ``JSONRenderer``
+(la ruta anterior) contra ``FastJSONRenderer`` con ``json`` y con orjson:
+
+    python profiling/bench_json_renderer.py --days 3650 --movements 100000
+
+Los payloads son sintéticos con la misma forma que ``get_range_report`` (``series``
+diaria) y que el listado plano de movimientos, así que no necesita base de datos.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'inventariopro_backend'
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventariopro_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from inventory import renderers  # noqa: E402
+from inventory.renderers import FastJSONRenderer  # noqa: E402
+
+
+def normalize_payload(data):
+    # Copia de la función que usaban las vistas antes de ``FastJSONRenderer``.
+    if isinstance(data, Decimal):
+        return float(data)
+    if isinstance(data, dict):
+        return {key: normalize_payload(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [normalize_payload(item) for item in data]
+    return data
+
+
+def series_payload(days: int) -> dict:
+    start = date(2015, 1, 1)
+    series = []
+    for offset in range(days):
+        ingresos = Decimal(offset % 977) * Decimal('13.75')
+        egresos = Decimal(offset % 613) * Decimal('9.10')
+        series.append(
+            {
+                'date': (start + timedelta(days=offset)).isoformat(),
+                'ingresos_mxn': ingresos,
+                'egresos_mxn': egresos,
+                'balance_mxn': ingresos - egresos,
+            }
+        )
+    return {'range': {'from': start.isoformat()}, 'ingresos_mxn': Decimal('1.00'), 'series': series}
+
+
+def movements_payload(rows: int) -> dict:
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {
+        'next': None,
+        'results': [
+            {
+                'id': index,
+                'product': index % 500,
+                'movement_type': 'IN' if index % 3 else 'OUT',
+                'quantity': Decimal(index % 40 + 1),
+                'unit_price': Decimal('1499.90'),
+                'date': date(2024, 1, 1) + timedelta(days=index % 365),
+                'note': '',
+                'created_at': created,
+            }
+            for index in range(rows)
+        ],
+    }
+
+
+def _best_of(runs: int, func) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(payload: dict, runs: int) -> dict[str, float]:
+    results = {
+        'normalize_payload + JSONRenderer': _best_of(runs, lambda: JSONRenderer().render(normalize_payload(payload))),
+    }
+    with mock.patch.object(renderers, 'orjson', None):
+        results['FastJSONRenderer (json)'] = _best_of(runs, lambda: FastJSONRenderer().render(payload))
+    if renderers.orjson is not None:
+        results['FastJSONRenderer (orjson)'] = _best_of(runs, lambda: FastJSONRenderer().render(payload))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark del renderer JSON')
+    parser.add_argument('--days', type=int, default=3650)
+    parser.add_argument('--movements', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print('| payload | ruta | tiempo (s) | speedup |')
+    print('| --- | --- | ---: | ---: |')
+    for label, payload in (
+        (f'series {args.days} días', series_payload(args.days)),
+        (f'{args.movements} movimientos', movements_payload(args.movements)),
+    ):
+        results = bench(payload, args.runs)
+        baseline = next(iter(results.values()))
+        for name, elapsed in results.items():
+            print(f'| {label} | {name} | {elapsed:.3f} | {baseline / elapsed:.1f}x |')
+
+
+if __name__ == '__main__':
+    main()
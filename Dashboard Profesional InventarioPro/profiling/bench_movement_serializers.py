@@ -0,0 +1,84 @@
+"""
+Compara ``MovementSerializer`` contra la ruta rápida ``FlatMovementSerializer``
+al listar movimientos. Se ejecuta con:
+
+    python profiling/bench_movement_serializers.py --sizes 10000 100000
+
+Usa una base de datos de pruebas en memoria (migrada y sembrada con
+``seed_inventory --bulk``), así que no toca ``db.sqlite3``. Mide consulta +
+serialización con y sin ``expand=product``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from io import StringIO
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'inventariopro_backend'
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventariopro_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from inventory.models import Movement  # noqa: E402
+from inventory.serializers import FlatMovementSerializer, MovementSerializer  # noqa: E402
+
+
+def _best_of(runs: int, func) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(size: int, expand: bool, runs: int) -> tuple[float, float]:
+    query = '?expand=product' if expand else ''
+    request = Request(APIRequestFactory().get(f'/api/movements/{query}'))
+    queryset = Movement.objects.order_by('-date', '-id')[:size]
+
+    def drf():
+        rows = queryset.select_related('product') if expand else queryset
+        return MovementSerializer(rows, many=True, context={'request': request}).data
+
+    def flat():
+        serializer = FlatMovementSerializer(expand_product=expand)
+        return serializer.serialize(serializer.values(queryset))
+
+    return _best_of(runs, drf), _best_of(runs, flat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark de serialización de movimientos')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    call_command('seed_inventory', movements=max(args.sizes), bulk=True, stdout=StringIO())
+
+    print('| filas | expand | MovementSerializer (s) | FlatMovementSerializer (s) | speedup |')
+    print('| ---: | :---: | ---: | ---: | ---: |')
+    for size in args.sizes:
+        for expand in (False, True):
+            drf_time, flat_time = bench(size, expand, args.runs)
+            print(
+                f'| {size} | {"sí" if expand else "no"} | {drf_time:.3f} | {flat_time:.3f} '
+                f'| {drf_time / flat_time:.1f}x |'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Compara el perfil SQLite por defecto contra el perfil ajustado de ``SQLITE_PRAGMAS``
+(WAL, synchronous, busy_timeout, mmap, cache, temp_store):
+
+    python profiling/bench_sqlite_pragmas.py --movements 200000 --threads 8 --writes 200
+
+Para cada perfil crea una base temporal en archivo, la siembra con
+``seed_inventory --bulk`` y mide:
+
+* latencia de reportes (``get_range_report``, ``get_dashboard_metrics`` y el agregado
+  sobre la tabla cruda de movimientos), mejor de ``--runs``;
+* throughput de escrituras concurrentes (``Movement.objects.create`` desde varios
+  hilos) mientras otro hilo lee reportes, y cuántas fallan con "database is locked".
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'inventariopro_backend'
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventariopro_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import OperationalError, connection  # noqa: E402
+
+from inventory.models import Movement, Product  # noqa: E402
+from services import reports  # noqa: E402
+
+RATE = Decimal('18.0')
+START, END = date(2000, 1, 1), date(2100, 1, 1)
+
+
+def _best_of(runs: int, func) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_reports(runs: int) -> dict[str, float]:
+    return {
+        'range_report': _best_of(runs, lambda: reports.get_range_report(START, END, rate=RATE)),
+        'dashboard': _best_of(runs, lambda: reports.get_dashboard_metrics(START, END, rate=RATE)),
+        'raw_totals': _best_of(runs, lambda: reports.calculate_totals(Movement.objects.all())),
+    }
+
+
+def measure_writes(threads: int, writes_per_thread: int) -> dict[str, float]:
+    product_ids = list(Product.objects.values_list('id', flat=True)[:threads])
+    failures = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def writer(product_id: int):
+        for _ in range(writes_per_thread):
+            try:
+                Movement.objects.create(
+                    product_id=product_id,
+                    movement_type=Movement.MovementType.IN,
+                    quantity=Decimal('1'),
+                    unit_price=Decimal('10'),
+                    date=date(2024, 6, 1),
+                )
+            except OperationalError:
+                with lock:
+                    failures[0] += 1
+        connection.close()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                reports.get_range_report(START, END, rate=RATE)
+            except OperationalError:
+                with lock:
+                    failures[0] += 1
+        connection.close()
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    workers = [threading.Thread(target=writer, args=(product_ids[i % len(product_ids)],)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    reader_thread.join()
+
+    total = threads * writes_per_thread
+    return {'writes_per_s': (total - failures[0]) / elapsed, 'locked_errors': failures[0]}
+
+
+def run_profile(tuned: bool, tmpdir: str, args) -> dict[str, float]:
+    settings.SQLITE_TUNING = tuned
+    connection.close()
+    connection.settings_dict['TEST']['NAME'] = str(Path(tmpdir) / f'bench-{"tuned" if tuned else "default"}.sqlite3')
+    connection.creation.create_test_db(verbosity=0)
+    call_command('seed_inventory', movements=args.movements, bulk=True, stdout=StringIO())
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+
+    result = {'journal_mode': journal_mode, **measure_reports(args.runs), **measure_writes(args.threads, args.writes)}
+    connection.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark de PRAGMAs de SQLite')
+    parser.add_argument('--movements', type=int, default=200000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Escrituras por hilo')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    settings.DEBUG = False
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {'por defecto': run_profile(False, tmpdir, args), 'ajustado': run_profile(True, tmpdir, args)}
+
+    print('| perfil | journal | range_report (s) | dashboard (s) | agregado crudo (s) | escrituras/s | "locked" |')
+    print('| --- | --- | ---: | ---: | ---: | ---: | ---: |')
+    for name, row in results.items():
+        print(
+            f'| {name} | {row["journal_mode"]} | {row["range_report"]:.3f} | {row["dashboard"]:.3f} '
+            f'| {row["raw_totals"]:.3f} | {row["writes_per_s"]:.0f} | {row["locked_errors"]} |'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Arnés de carga: muchas salidas concurrentes contra un producto "caliente".
+
+    python profiling/stress_concurrent_sales.py --requests 2000 --threads 16 --stock 500
+
+Cada hilo tiene su propio ``Client`` de Django (y su propia conexión a la base de
+datos) y envía ``POST /api/movements/`` con salidas de una unidad. Se usa una base
+SQLite temporal en archivo, no ``db.sqlite3``. Al final se reporta:
+
+* throughput y latencias (p50/p95/máx.);
+* tiempo esperando el bloqueo de escritura, medido en el UPDATE de stock;
+* respuestas 201/400/errores;
+* el invariante: el stock nunca baja de 0 (muestreado durante la carga y al final)
+  y coincide con el stock inicial menos las salidas aceptadas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'inventariopro_backend'
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventariopro_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from inventory.models import Movement, Product  # noqa: E402
+
+
+class LockWaitTimer:
+    """``execute_wrapper`` que mide cuánto tarda el UPDATE de stock (espera del bloqueo incluida)."""
+
+    def __init__(self):
+        self.waits: list[float] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.startswith('UPDATE "inventory_product"'):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.waits.append(time.perf_counter() - start)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(product_id: int, total_requests: int, threads: int) -> dict:
+    payload = {
+        'product': product_id,
+        'movement_type': Movement.MovementType.OUT,
+        'quantity': '1',
+        'unit_price': '1499.00',
+        'date': '2024-06-01',
+    }
+    statuses: Counter = Counter()
+    latencies: list[float] = []
+    lock_waits: list[float] = []
+    lowest_stock = [None]
+    results_lock = threading.Lock()
+    remaining = [total_requests]
+    stop = threading.Event()
+
+    def next_request() -> bool:
+        with results_lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker():
+        client = Client(raise_request_exception=False)
+        timer = LockWaitTimer()
+        local_statuses: Counter = Counter()
+        local_latencies = []
+        with connection.execute_wrapper(timer):
+            while next_request():
+                start = time.perf_counter()
+                response = client.post('/api/movements/', payload, content_type='application/json')
+                local_latencies.append(time.perf_counter() - start)
+                local_statuses[response.status_code] += 1
+        connection.close()
+        with results_lock:
+            statuses.update(local_statuses)
+            latencies.extend(local_latencies)
+            lock_waits.extend(timer.waits)
+
+    def monitor():
+        while not stop.is_set():
+            stock = Product.objects.filter(pk=product_id).values_list('stock', flat=True).get()
+            if lowest_stock[0] is None or stock < lowest_stock[0]:
+                lowest_stock[0] = stock
+            stop.wait(0.01)
+        connection.close()
+
+    watcher = threading.Thread(target=monitor)
+    watcher.start()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    watcher.join()
+
+    return {
+        'elapsed': elapsed,
+        'statuses': statuses,
+        'latencies': latencies,
+        'lock_waits': lock_waits,
+        'lowest_stock': lowest_stock[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Salidas concurrentes contra un producto')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--stock', type=int, default=500, help='Stock inicial (menor que --requests para agotarlo)')
+    args = parser.parse_args()
+
+    settings.DEBUG = False
+    setup_test_environment(debug=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        connection.settings_dict['TEST']['NAME'] = str(Path(tmpdir) / 'stress.sqlite3')
+        connection.creation.create_test_db(verbosity=0)
+        product = Product.objects.create(name='Producto caliente', code='HOT-1', stock=Decimal(args.stock))
+        connection.close()
+
+        result = run(product.id, args.requests, args.threads)
+
+        final_stock = Product.objects.get(pk=product.id).stock
+        sold = Movement.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or Decimal('0')
+        accepted = result['statuses'][201]
+        latencies = result['latencies']
+        waits = result['lock_waits']
+
+        print(f'Solicitudes: {args.requests} en {args.threads} hilos, stock inicial {args.stock}')
+        print(f'Duración: {result["elapsed"]:.2f} s; throughput {args.requests / result["elapsed"]:.0f} req/s')
+        print(f'Respuestas: {dict(sorted(result["statuses"].items()))}')
+        print(
+            f'Latencia: p50 {_percentile(latencies, 0.5) * 1000:.1f} ms, '
+            f'p95 {_percentile(latencies, 0.95) * 1000:.1f} ms, máx. {max(latencies, default=0) * 1000:.1f} ms'
+        )
+        print(
+            f'Espera de bloqueo (UPDATE de stock): total {sum(waits):.2f} s, '
+            f'media {statistics.mean(waits) * 1000 if waits else 0:.2f} ms, '
+            f'p95 {_percentile(waits, 0.95) * 1000:.2f} ms'
+        )
+        print(f'Stock final: {final_stock}; mínimo observado: {result["lowest_stock"]}; vendidas: {sold}')
+
+        invariant = (
+            final_stock >= 0
+            and (result['lowest_stock'] is None or result['lowest_stock'] >= 0)
+            and final_stock == Decimal(args.stock) - sold
+            and sold == accepted
+        )
+        print('Invariante stock >= 0 y cuadre de salidas: ' + ('OK' if invariant else 'VIOLADO'))
+        connection.close()
+        if not invariant:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -172,9 +172,9 @@ export function Dashboard({ onNavigate }: DashboardProps) {
         const [dashboardResponse, movementResponse, reportResponse, usdRateResponse] = await Promise.all([
           apiFetch<DashboardResponse>(`/api/dashboard/?${params.toString()}`),
           apiFetch<MovementResponse[] | { results: MovementResponse[] }>(
-            `/api/movements/?start=${range.from}&end=${range.to}&limit=10`
+            `/api/movements/?start=${range.from}&end=${range.to}&limit=10&expand=product`
           ),
-          apiFetch<ReportsResponse>(`/api/reports/?${params.toString()}`),
+          apiFetch<ReportsResponse>(`/api/reports/?${params.toString()}&granularity=auto`),
           apiFetch<UsdRateResponse>('/api/usd-rate/')
         ]);
         const movementList = Array.isArray(movementResponse)
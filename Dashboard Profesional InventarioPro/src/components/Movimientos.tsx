@@ -72,7 +72,7 @@ export function Movimientos({ filter }: MovimientosProps) {
         setLoading(true);
         const [productsResponse, movementsResponse] = await Promise.all([
           apiFetch<Product[]>('/api/products/'),
-          apiFetch<Movement[] | { results: Movement[] }>('/api/movements/')
+          apiFetch<Movement[] | { results: Movement[] }>('/api/movements/?page_size=10&expand=product')
         ]);
         const movementList = Array.isArray(movementsResponse)
           ? movementsResponse
@@ -133,7 +133,7 @@ export function Movimientos({ filter }: MovimientosProps) {
         body: JSON.stringify(payload)
       });
       toast.success('Movimiento registrado correctamente');
-      const updatedMovements = await apiFetch<Movement[] | { results: Movement[] }>('/api/movements/');
+      const updatedMovements = await apiFetch<Movement[] | { results: Movement[] }>('/api/movements/?page_size=10&expand=product');
       const movementList = Array.isArray(updatedMovements)
         ? updatedMovements
         : updatedMovements?.results ?? [];
@@ -24,6 +24,17 @@ interface Product {
   suggested_price: number;
   is_low_stock: boolean;
   created_at: string;
+  stats: ProductStats | null;
+}
+
+interface ProductStats {
+  total_in: number;
+  total_out: number;
+  revenue: number;
+  last_movement_date: string | null;
+  units_out_30d: number;
+  velocity_30d: number;
+  window_end: string | null;
 }
 
 interface ProductFormState {
@@ -92,7 +103,7 @@ export function Productos({ filter }: ProductosProps) {
   async function loadProducts() {
     try {
       setLoading(true);
-      const data = await apiFetch<Product[]>('/api/products/');
+      const data = await apiFetch<Product[]>('/api/products/?expand=stats');
       setProducts(data);
     } catch (error) {
       console.error(error);
@@ -313,6 +324,15 @@ export function Productos({ filter }: ProductosProps) {
                 <th className="text-right py-4 px-4" style={{ color: '#A8A8A8', fontSize: '0.875rem', fontWeight: 500 }}>
                   Precio sugerido
                 </th>
+                <th className="text-center py-4 px-4" style={{ color: '#A8A8A8', fontSize: '0.875rem', fontWeight: 500 }}>
+                  Vendidas
+                </th>
+                <th className="text-center py-4 px-4" style={{ color: '#A8A8A8', fontSize: '0.875rem', fontWeight: 500 }}>
+                  Venta/día (30d)
+                </th>
+                <th className="text-center py-4 px-4" style={{ color: '#A8A8A8', fontSize: '0.875rem', fontWeight: 500 }}>
+                  Último movimiento
+                </th>
                 <th className="text-center py-4 px-4" style={{ color: '#A8A8A8', fontSize: '0.875rem', fontWeight: 500 }}>
                   Acciones
                 </th>
@@ -382,6 +402,15 @@ export function Productos({ filter }: ProductosProps) {
                   <td className="py-4 px-4 text-right" style={{ color: '#E0E0E0', fontSize: '0.875rem' }}>
                     {formatCurrency(product.suggested_price)}
                   </td>
+                  <td className="py-4 px-4 text-center" style={{ color: '#E0E0E0', fontSize: '0.875rem' }}>
+                    {product.stats?.total_out ?? 0}
+                  </td>
+                  <td className="py-4 px-4 text-center" style={{ color: '#A8A8A8', fontSize: '0.875rem' }}>
+                    {product.stats?.velocity_30d ?? 0}
+                  </td>
+                  <td className="py-4 px-4 text-center" style={{ color: '#A8A8A8', fontSize: '0.875rem' }}>
+                    {product.stats?.last_movement_date ?? '—'}
+                  </td>
                   <td className="py-4 px-4">
                     <div className="flex items-center justify-center gap-2">
                       <button
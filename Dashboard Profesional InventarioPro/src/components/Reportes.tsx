@@ -2,7 +2,7 @@ import { useEffect, useMemo, useState } from 'react';
 import { Download, Calendar, TrendingUp, DollarSign, ArrowUpDown } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Legend } from 'recharts';
 import { Input } from './ui/input';
-import { apiFetch } from '../lib/api';
+import { API_URL, apiFetch } from '../lib/api';
 
 interface ReportesProps {
   filter?: any;
@@ -31,15 +31,6 @@ interface UsdRateResponse {
   rate: number;
 }
 
-interface MovementExportRow {
-  id: number;
-  movement_type: 'IN' | 'OUT';
-  quantity: number;
-  unit_price: number;
-  date: string;
-  product_detail?: { name?: string };
-}
-
 function formatCurrency(value: number, currency: 'MXN' | 'USD' = 'MXN') {
   if (!Number.isFinite(value)) {
     return currency === 'USD' ? '$0.00 USD' : '$0.00 MXN';
@@ -82,7 +73,8 @@ export function Reportes({ filter }: ReportesProps) {
     try {
       setLoading(true);
       setError(null);
-      const params = new URLSearchParams({ from, to });
+      // El backend agrupa la serie por semana o mes en rangos largos.
+      const params = new URLSearchParams({ from, to, granularity: 'auto' });
       const [data, usdRateResponse] = await Promise.all([
         apiFetch<ReportsResponse>(`/api/reports/?${params.toString()}`),
         apiFetch<UsdRateResponse>('/api/usd-rate/')
@@ -122,41 +114,16 @@ export function Reportes({ filter }: ReportesProps) {
     return value / effectiveUsdRate;
   };
 
-  async function handleExport() {
+  function handleExport() {
     if (!reportData) return;
-    try {
-      const params = new URLSearchParams({ start: appliedRange.from, end: appliedRange.to, limit: '1000' });
-      const movements = await apiFetch<MovementExportRow[] | { results: MovementExportRow[] }>(
-        `/api/movements/?${params.toString()}`
-      );
-      const movementList = Array.isArray(movements) ? movements : movements?.results ?? [];
-      const rows = [
-        ['Fecha', 'Tipo', 'Producto', 'Cantidad', 'Monto'],
-        ...movementList.map((movement) => {
-          const amount = movement.quantity * movement.unit_price;
-          return [
-            movement.date,
-            movement.movement_type === 'IN' ? 'ingreso' : 'egreso',
-            movement.product_detail?.name ?? 'Producto',
-            movement.quantity.toString(),
-            amount.toFixed(2)
-          ];
-        })
-      ];
-      const csvContent = rows.map((row) => row.join(',')).join('\n');
-      const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-      const url = URL.createObjectURL(blob);
-      const link = document.createElement('a');
-      link.href = url;
-      link.setAttribute('download', `reportes_inventario_${appliedRange.from}_a_${appliedRange.to}.csv`);
-      document.body.appendChild(link);
-      link.click();
-      document.body.removeChild(link);
-      URL.revokeObjectURL(url);
-    } catch (err) {
-      console.error(err);
-      setError('No se pudo exportar el CSV');
-    }
+    // El backend genera el CSV en streaming; el navegador lo descarga sin pasar por JSON.
+    const params = new URLSearchParams({ start: appliedRange.from, end: appliedRange.to, output: 'csv' });
+    const link = document.createElement('a');
+    link.href = `${API_URL}/api/movements/export/?${params.toString()}`;
+    link.setAttribute('download', `reportes_inventario_${appliedRange.from}_a_${appliedRange.to}.csv`);
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
   }
 
   const stats = useMemo(() => {